@@ -0,0 +1,89 @@
+"""
+模拟分析API路由
+
+分析数据由引擎逐轮增量维护（直方图、分位数、奖池周期等），查询时不遍历轮次结果。
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict, Optional
+
+from ..core.estimators import RoundDistributions
+
+# 导入模拟相关的存储
+from .simulation import simulation_results, running_simulations
+
+router = APIRouter()
+
+
+def get_analytics(simulation_id: str) -> Dict[str, Any]:
+    """
+    获取模拟的分析数据
+
+    运行中的模拟直接读取引擎的增量统计；已完成的模拟读取结果中保存的分析数据。
+    """
+    engine = running_simulations.get(simulation_id)
+    if engine is not None:
+        return {
+            "simulation_id": simulation_id,
+            "status": "running",
+            "completed_rounds": engine.totals.rounds,
+            "analytics": engine.build_analytics()
+        }
+
+    result = simulation_results.get(simulation_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="模拟结果未找到")
+    if not result.analytics:
+        raise HTTPException(status_code=404, detail="该模拟没有分析数据")
+    return {
+        "simulation_id": simulation_id,
+        "status": result.status,
+        "completed_rounds": len(result.round_results),
+        "analytics": result.analytics
+    }
+
+
+@router.get("/{simulation_id}/distributions")
+async def get_round_distributions(
+    simulation_id: str,
+    metrics: Optional[str] = Query(None, description="指标（逗号分隔）：rtp, payout, jackpot, players")
+):
+    """获取逐轮RTP、派奖金额、奖池金额和玩家数的分布（直方图、分位数、均值和方差）"""
+    selected = RoundDistributions.METRICS
+    if metrics:
+        selected = tuple(m.strip() for m in metrics.split(",") if m.strip())
+        unknown = [m for m in selected if m not in RoundDistributions.METRICS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"不支持的指标: {', '.join(unknown)}")
+
+    data = get_analytics(simulation_id)
+    distributions = data["analytics"].get("distributions")
+    if distributions is None:
+        raise HTTPException(status_code=404, detail="该模拟没有分布统计")
+
+    return {
+        "simulation_id": simulation_id,
+        "status": data["status"],
+        "completed_rounds": data["completed_rounds"],
+        "distributions": {metric: distributions[metric] for metric in selected}
+    }
+
+
+@router.get("/{simulation_id}/jackpot-cycles")
+async def get_jackpot_cycles(simulation_id: str):
+    """
+    获取奖池周期统计
+
+    周期长度分布、各阶段（销售方返还期 / 返还完成后）时长、奖池峰值，以及当前未结束的周期和最近的周期明细。
+    """
+    data = get_analytics(simulation_id)
+    cycles = data["analytics"].get("jackpot_cycles")
+    if cycles is None:
+        raise HTTPException(status_code=404, detail="该模拟没有奖池周期统计")
+
+    return {
+        "simulation_id": simulation_id,
+        "status": data["status"],
+        "completed_rounds": data["completed_rounds"],
+        "jackpot_cycles": cycles
+    }
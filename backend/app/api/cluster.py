@@ -0,0 +1,110 @@
+"""
+分布式模拟API路由
+
+协调者接口：提交分片任务、查询任务进度；
+工作节点接口：领取分片、上报进度、提交部分汇总或报告失败（工作节点见 python -m app.cli worker）。
+任务完成后合并的结果保存到模拟结果中，可通过 /simulation/result 和报告接口查询。
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy.orm import Session
+
+from ..models.cluster import LeaseRequest, ShardHeartbeat, ShardCompletion, ShardFailure
+from ..models.simulation_result import SimulationRequest, SimulationResult
+from ..services.cluster import coordinator, ClusterJob, LeaseLost
+from ..database import get_db
+
+# 导入模拟相关的存储
+from .simulation import simulation_results, resolve_request_config
+
+router = APIRouter()
+
+
+def store_cluster_result(job: ClusterJob, result: SimulationResult):
+    """任务结束：合并结果保存到模拟结果中"""
+    simulation_results[job.simulation_id] = result
+
+
+coordinator.on_finished = store_cluster_result
+
+
+@router.post("/jobs")
+async def submit_job(request: SimulationRequest,
+                     shards: int = Query(..., ge=1, le=10_000, description="分片数"),
+                     db: Session = Depends(get_db)):
+    """
+    提交分布式模拟
+
+    模拟按分片拆分（每个分片是独立模拟，种子由基础种子派生），由工作节点领取运行。
+    参数扫描时为每组参数分别提交任务。
+    """
+    try:
+        game_config = resolve_request_config(request, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"提交任务失败: {str(e)}")
+
+    job = coordinator.submit(game_config, shards)
+    return {
+        "simulation_id": job.simulation_id,
+        "status": job.status,
+        "shards": len(job.shards),
+        "message": "分布式模拟已提交，等待工作节点领取"
+    }
+
+
+@router.get("/jobs")
+async def list_jobs():
+    """列出分布式模拟任务"""
+    return {"jobs": coordinator.list()}
+
+
+@router.get("/jobs/{simulation_id}")
+async def get_job(simulation_id: str):
+    """获取任务进度（各分片状态、已完成轮数）"""
+    job = coordinator.get(simulation_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="分布式模拟任务未找到")
+    return job.to_dict()
+
+
+@router.post("/lease")
+async def lease_shard(request: LeaseRequest):
+    """领取下一个分片任务（没有待运行的分片时返回204）"""
+    task = coordinator.lease(request.worker_id)
+    if task is None:
+        return Response(status_code=204)
+    return task
+
+
+@router.post("/jobs/{simulation_id}/shards/{shard_index}/heartbeat")
+async def shard_heartbeat(simulation_id: str, shard_index: int, request: ShardHeartbeat):
+    """上报分片进度并续租（租约已失效时返回409，工作节点应放弃该分片）"""
+    try:
+        coordinator.heartbeat(simulation_id, shard_index, request.worker_id, request.completed_rounds)
+    except LeaseLost:
+        raise HTTPException(status_code=409, detail="分片租约已失效")
+    return {"status": "ok"}
+
+
+@router.post("/jobs/{simulation_id}/shards/{shard_index}/complete")
+async def complete_shard(simulation_id: str, shard_index: int, request: ShardCompletion):
+    """提交分片的部分汇总"""
+    try:
+        coordinator.complete(simulation_id, shard_index, request.worker_id, request.partial)
+    except LeaseLost:
+        raise HTTPException(status_code=409, detail="分布式模拟任务已结束或分片不存在")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", "job_status": coordinator.get(simulation_id).status}
+
+
+@router.post("/jobs/{simulation_id}/shards/{shard_index}/fail")
+async def fail_shard(simulation_id: str, shard_index: int, request: ShardFailure):
+    """报告分片失败（重新排队，超过重试次数时任务失败）"""
+    try:
+        coordinator.fail(simulation_id, shard_index, request.worker_id, request.error)
+    except LeaseLost:
+        raise HTTPException(status_code=409, detail="分片租约已失效")
+    return {"status": "ok", "job_status": coordinator.get(simulation_id).status}
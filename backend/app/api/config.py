@@ -4,21 +4,66 @@
 
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any, Optional
-import json
 import os
 from datetime import datetime
 from sqlalchemy.orm import Session
 
 from ..models.game_config import GameConfiguration, GameType, PrizeLevel, JackpotConfig
 from ..core.config import settings
-from ..database import get_db, init_database, test_connection
+from ..core.metrics import db_fallbacks
+from ..database import get_db, db_available, init_database, test_connection
+from ..core.compiled_game import parse_game_config
 from ..services.database_service import DatabaseService
+from ..services.config_cache import config_cache, CachedConfig
+from ..services.config_repository import FileConfigRepository
 
 router = APIRouter()
 
 # 配置存储路径
 CONFIG_DIR = os.path.join(settings.UPLOAD_DIR, "configs")
-os.makedirs(CONFIG_DIR, exist_ok=True)
+
+# 文件配置仓库（数据库不可用时的备用存储）
+config_repository = FileConfigRepository(CONFIG_DIR)
+
+
+def resolve_config(config_name: str, db: Session, updated_at: Optional[str] = None) -> CachedConfig:
+    """
+    按名称解析配置：优先命中缓存，其次数据库，最后文件
+
+    Args:
+        config_name: 配置名称
+        db: 数据库会话
+        updated_at: 期望的更新时间（与缓存不一致时重新加载）
+
+    Returns:
+        缓存的配置条目
+
+    Raises:
+        HTTPException: 配置不存在
+    """
+    cached = config_cache.get(config_name, updated_at)
+    if cached:
+        return cached
+
+    # 首先尝试从数据库加载（熔断期间跳过）
+    if db_available():
+        config_record = DatabaseService.get_game_config(db, config_name)
+    else:
+        db_fallbacks.inc("load_config")
+        config_record = None
+
+    if config_record:
+        config_data = config_record.config_data
+        record_updated_at = config_record.updated_at.isoformat() if config_record.updated_at else None
+    else:
+        # 数据库中没有，尝试从文件加载
+        config_data = config_repository.load(config_name)
+
+        if config_data is None:
+            raise HTTPException(status_code=404, detail="配置未找到")
+        record_updated_at = None
+
+    return config_cache.put(config_name, config_data, record_updated_at)
 
 
 @router.get("/templates")
@@ -172,7 +217,7 @@ async def save_config(config: Dict[str, Any], config_name: str, db: Session = De
     """保存配置"""
     try:
         # 验证配置
-        game_config = GameConfiguration(**config)
+        game_config = parse_game_config(config)
 
         # 添加时间戳
         config_data = config.copy()
@@ -180,9 +225,14 @@ async def save_config(config: Dict[str, Any], config_name: str, db: Session = De
         config_data["created_at"] = datetime.now().isoformat()
         config_data["updated_at"] = datetime.now().isoformat()
 
-        # 保存到数据库
+        # 保存到数据库（熔断期间直接回退到文件保存）
         try:
+            if not db_available():
+                raise ConnectionError("数据库暂不可用（熔断中）")
+
             saved_config = DatabaseService.save_game_config(db, config_name, config_data)
+            # 写入成功后再使缓存失效（先失效时并发读取会把旧配置重新缓存）
+            config_cache.invalidate(config_name)
 
             # 记录日志
             DatabaseService.log_system_event(
@@ -199,11 +249,11 @@ async def save_config(config: Dict[str, Any], config_name: str, db: Session = De
         except Exception as db_error:
             # 数据库保存失败，回退到文件保存
             print(f"数据库保存失败，使用文件保存: {db_error}")
+            db_fallbacks.inc("save_config")
 
             # 保存到文件（备用方案）
-            config_file = os.path.join(CONFIG_DIR, f"{config_name}.json")
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
+            config_repository.save(config_name, config_data)
+            config_cache.invalidate(config_name)
 
             return {
                 "success": True,
@@ -220,22 +270,7 @@ async def save_config(config: Dict[str, Any], config_name: str, db: Session = De
 async def load_config(config_name: str, db: Session = Depends(get_db)):
     """加载配置"""
     try:
-        # 首先尝试从数据库加载
-        config_record = DatabaseService.get_game_config(db, config_name)
-
-        if config_record:
-            return {"config": config_record.config_data}
-
-        # 数据库中没有，尝试从文件加载
-        config_file = os.path.join(CONFIG_DIR, f"{config_name}.json")
-
-        if not os.path.exists(config_file):
-            raise HTTPException(status_code=404, detail="配置未找到")
-
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config_data = json.load(f)
-
-        return {"config": config_data}
+        return {"config": resolve_config(config_name, db).config_data}
 
     except HTTPException:
         raise
@@ -249,8 +284,12 @@ async def list_configs(db: Session = Depends(get_db)):
     configs = []
 
     try:
-        # 首先尝试从数据库获取
-        db_configs = DatabaseService.list_game_configs(db)
+        # 首先尝试从数据库获取（熔断期间跳过）
+        if db_available():
+            db_configs = DatabaseService.list_game_configs(db)
+        else:
+            db_fallbacks.inc("list_configs")
+            db_configs = []
 
         for config_record in db_configs:
             configs.append({
@@ -262,54 +301,15 @@ async def list_configs(db: Session = Depends(get_db)):
                 "updated_at": config_record.updated_at.isoformat() if config_record.updated_at else None
             })
 
-        # 如果数据库中没有配置，尝试从文件加载
-        if not configs and os.path.exists(CONFIG_DIR):
-            for filename in os.listdir(CONFIG_DIR):
-                if filename.endswith('.json'):
-                    config_name = filename[:-5]  # 移除.json后缀
-                    config_file = os.path.join(CONFIG_DIR, filename)
-
-                    try:
-                        with open(config_file, 'r', encoding='utf-8') as f:
-                            config_data = json.load(f)
-
-                        configs.append({
-                            "name": config_name,
-                            "display_name": config_data.get("game_rules", {}).get("name", config_name),
-                            "description": config_data.get("game_rules", {}).get("description", ""),
-                            "game_type": config_data.get("game_rules", {}).get("game_type", "unknown"),
-                            "created_at": config_data.get("created_at"),
-                            "updated_at": config_data.get("updated_at")
-                        })
-
-                    except Exception as e:
-                        # 跳过损坏的配置文件
-                        continue
+        # 如果数据库中没有配置，从文件索引加载
+        if not configs:
+            configs = config_repository.list()
 
     except Exception as e:
         print(f"数据库查询失败，使用文件模式: {e}")
         # 数据库查询失败，回退到文件模式
-        if os.path.exists(CONFIG_DIR):
-            for filename in os.listdir(CONFIG_DIR):
-                if filename.endswith('.json'):
-                    config_name = filename[:-5]
-                    config_file = os.path.join(CONFIG_DIR, filename)
-
-                    try:
-                        with open(config_file, 'r', encoding='utf-8') as f:
-                            config_data = json.load(f)
-
-                        configs.append({
-                            "name": config_name,
-                            "display_name": config_data.get("game_rules", {}).get("name", config_name),
-                            "description": config_data.get("game_rules", {}).get("description", ""),
-                            "game_type": config_data.get("game_rules", {}).get("game_type", "unknown"),
-                            "created_at": config_data.get("created_at"),
-                            "updated_at": config_data.get("updated_at")
-                        })
-
-                    except Exception:
-                        continue
+        db_fallbacks.inc("list_configs")
+        configs = config_repository.list()
 
     return {"configs": configs}
 
@@ -321,7 +321,11 @@ async def delete_config(config_name: str, db: Session = Depends(get_db)):
         # 首先尝试从数据库删除
         deleted_from_db = False
         try:
-            config_record = DatabaseService.get_game_config(db, config_name)
+            if db_available():
+                config_record = DatabaseService.get_game_config(db, config_name)
+            else:
+                db_fallbacks.inc("delete_config")
+                config_record = None
             if config_record:
                 DatabaseService.delete_game_config(db, config_name)
                 deleted_from_db = True
@@ -333,16 +337,17 @@ async def delete_config(config_name: str, db: Session = Depends(get_db)):
                 )
         except Exception as db_error:
             print(f"数据库删除失败: {db_error}")
+            db_fallbacks.inc("delete_config")
 
         # 尝试删除文件（如果存在）
-        config_file = os.path.join(CONFIG_DIR, f"{config_name}.json")
         deleted_from_file = False
-        if os.path.exists(config_file):
-            try:
-                os.remove(config_file)
-                deleted_from_file = True
-            except Exception as file_error:
-                print(f"文件删除失败: {file_error}")
+        try:
+            deleted_from_file = config_repository.delete(config_name)
+        except Exception as file_error:
+            print(f"文件删除失败: {file_error}")
+
+        # 删除之后再使缓存失效（先失效时并发读取会把旧配置重新缓存）
+        config_cache.invalidate(config_name)
 
         # 检查是否成功删除
         if deleted_from_db or deleted_from_file:
@@ -370,8 +375,8 @@ async def delete_config(config_name: str, db: Session = Depends(get_db)):
 async def validate_config(config: Dict[str, Any]):
     """验证配置"""
     try:
-        # 尝试解析配置
-        game_config = GameConfiguration(**config)
+        # 尝试解析配置（相同内容复用已验证的对象）
+        game_config = parse_game_config(config)
         
         # 进行额外的业务逻辑验证
         validation_errors = []
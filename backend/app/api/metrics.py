@@ -0,0 +1,112 @@
+"""
+Prometheus 指标端点（/metrics）
+
+状态类指标在抓取时从运行状态计算：
+- 运行中模拟的吞吐（每秒轮数、每秒投注数，来自引擎的阶段计时）
+- 运行中的模拟数、分布式任务数，待运行的分片和报告构建队列长度
+- 内存中保存的模拟结果数、轮次数和估算占用
+事件类指标（请求延迟直方图、数据库回退次数）见 core.metrics。
+"""
+
+import sys
+from typing import Any, Dict, List, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from ..core.metrics import request_latency, db_fallbacks, gauge_lines
+from ..database import db_circuit
+from ..models.simulation_result import SimulationResult
+from ..services.cluster import coordinator
+from ..services.report_store import report_store
+from .simulation import running_simulations, simulation_results
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 结果内存估算缓存：模拟ID -> (结果对象ID, 轮数, 字节数)
+_result_sizes: Dict[str, Tuple[int, int, int]] = {}
+
+
+def deep_sizeof(obj: Any, seen: set) -> int:
+    """对象及其引用的容器、模型字段的内存占用（同一对象只计一次）"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+def estimate_result_bytes(result: SimulationResult) -> int:
+    """
+    估算模拟结果的内存占用
+
+    轮次结果结构相同，按第一轮的占用乘以轮数估算，不遍历全部轮次；
+    结果未变化时复用上次的估算。
+    """
+    rounds = result.round_results
+    cached = _result_sizes.get(result.simulation_id)
+    if cached is not None and cached[0] == id(result) and cached[1] == len(rounds):
+        return cached[2]
+
+    seen = {id(rounds)}
+    size = deep_sizeof(result, seen) + sys.getsizeof(rounds)
+    if rounds:
+        size += deep_sizeof(rounds[0], set()) * len(rounds)
+    _result_sizes[result.simulation_id] = (id(result), len(rounds), size)
+    return size
+
+
+def collect_workload() -> List[str]:
+    """模拟负载相关的状态类指标"""
+    engines = list(running_simulations.values())
+    results = list(simulation_results.values())
+
+    throughput = []
+    for engine in engines:
+        rounds_per_second, tickets_per_second = engine.phase_timings.throughput()
+        labels = [("simulation_id", engine.simulation_id), ("game", engine.game_rules.name)]
+        throughput.append((labels, rounds_per_second, tickets_per_second))
+
+    # 清理已删除结果的估算缓存
+    for simulation_id in set(_result_sizes) - set(simulation_results):
+        _result_sizes.pop(simulation_id, None)
+
+    jobs = coordinator.list()
+    pending_shards = sum(1 for job in jobs if job["status"] == "running"
+                         for shard in job["shards"] if shard["status"] == "pending")
+
+    lines = []
+    lines += gauge_lines("numerical_simulation_rounds_per_second", "运行中模拟的每秒轮数",
+                         [(labels, rate) for labels, rate, _ in throughput])
+    lines += gauge_lines("numerical_simulation_tickets_per_second", "运行中模拟的每秒投注数",
+                         [(labels, rate) for labels, _, rate in throughput])
+    lines += gauge_lines("numerical_active_simulations", "运行中的模拟数", [((), len(engines))])
+    lines += gauge_lines("numerical_active_cluster_jobs", "运行中的分布式模拟任务数",
+                         [((), sum(1 for job in jobs if job["status"] == "running"))])
+    lines += gauge_lines("numerical_queue_depth", "等待处理的任务数", [
+        ((("queue", "cluster_shards"),), pending_shards),
+        ((("queue", "report_builds"),), report_store.queue_depth())
+    ])
+    lines += gauge_lines("numerical_stored_results", "内存中保存的模拟结果数", [((), len(results))])
+    lines += gauge_lines("numerical_stored_rounds", "内存中保存的轮次结果数",
+                         [((), sum(len(result.round_results) for result in results))])
+    lines += gauge_lines("numerical_stored_results_bytes", "内存中保存的模拟结果占用（估算）",
+                         [((), sum(estimate_result_bytes(result) for result in results))])
+    lines += gauge_lines("numerical_db_available", "数据库是否可用（熔断器未打开）",
+                         [((), 1 if db_circuit.snapshot()["available"] else 0)])
+    return lines
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus 文本格式的指标"""
+    lines = collect_workload() + db_fallbacks.collect() + request_latency.collect()
+    return Response(content="\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -2,35 +2,109 @@
 模拟相关API路由
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, Optional
 import asyncio
-import json
 from datetime import datetime
+from sqlalchemy.orm import Session
 
 from ..models.game_config import GameConfiguration
 from ..models.simulation_result import (
     SimulationRequest, SimulationResponse, SimulationResult
 )
-from ..core.simulation_engine import UniversalSimulationEngine
+from ..core.simulation_engine import UniversalSimulationEngine, chart_delta
+from ..core.compiled_game import parse_game_config
+from ..core.config import settings
+from ..core.checkpoint import checkpoint_store, CheckpointError
+from ..core.profiling import StackSampler
+from ..core.events import event_hub, make_event, format_sse, RESYNC, END_OF_STREAM
+from ..services.result_cache import result_cache, result_cache_key
+from ..services import serialization
+from ..services.report_render import report_cache
+from ..services.report_store import report_store
+from ..services.report_compare import compare_cache
+from ..database import get_db
+from .config import resolve_config
 
 router = APIRouter()
 
 # 存储运行中的模拟
 running_simulations: Dict[str, UniversalSimulationEngine] = {}
 simulation_results: Dict[str, SimulationResult] = {}
+# 性能剖析结果（folded 调用栈，options.profile=true 时记录）
+simulation_profiles: Dict[str, str] = {}
+
+
+def resolve_request_config(request: SimulationRequest, db: Session) -> GameConfiguration:
+    """解析模拟请求中的游戏配置（已保存配置优先使用缓存）"""
+    if request.config_name:
+        game_config = resolve_config(request.config_name, db, request.config_updated_at).game_config
+        if request.simulation_config:
+            # 覆盖已保存的模拟配置，游戏规则沿用缓存中已验证的对象
+            game_config = GameConfiguration(
+                id=game_config.id,
+                game_rules=game_config.game_rules,
+                simulation_config=request.simulation_config
+            )
+        return game_config
+
+    if request.game_config is None or request.simulation_config is None:
+        raise ValueError("必须提供 config_name，或同时提供 game_config 和 simulation_config")
+
+    return parse_game_config({
+        "game_rules": request.game_config,
+        "simulation_config": request.simulation_config
+    })
+
+
+def find_cached_simulation(cache_key: str):
+    """查找相同配置和种子的已完成（或正在运行）的模拟，返回 (模拟ID, 状态)"""
+    simulation_id = result_cache.get(cache_key)
+    if simulation_id is None:
+        return None
+
+    if simulation_id in running_simulations:
+        return simulation_id, "running"
+
+    result = simulation_results.get(simulation_id)
+    if result is not None and result.status == "completed":
+        return simulation_id, "completed"
+
+    # 结果已删除、出错或被停止，不再复用
+    result_cache.discard(cache_key)
+    return None
 
 
 @router.post("/start", response_model=SimulationResponse)
-async def start_simulation(request: SimulationRequest, background_tasks: BackgroundTasks):
-    """启动新的模拟"""
+async def start_simulation(request: SimulationRequest, background_tasks: BackgroundTasks,
+                           force: bool = False, db: Session = Depends(get_db)):
+    """
+    启动新的模拟
+
+    固定种子的相同配置已有完成结果时直接返回该结果（force=true 强制重新运行）。
+    options.profile=true 时采样模拟线程的调用栈（总是重新运行），
+    完成后通过 /reports/profile/{simulation_id} 下载 folded 格式的剖析结果。
+    """
     try:
         # 解析配置
-        game_config = GameConfiguration(**{
-            "game_rules": request.game_config,
-            "simulation_config": request.simulation_config
-        })
+        game_config = resolve_request_config(request, db)
+        profile = bool((request.options or {}).get("profile"))
+
+        # 查找可复用的固定种子模拟结果
+        cache_key = result_cache_key(game_config)
+        if cache_key and not force and not profile:
+            cached = find_cached_simulation(cache_key)
+            result_cache.record_lookup(cached is not None)
+            if cached:
+                simulation_id, status = cached
+                return SimulationResponse(
+                    simulation_id=simulation_id,
+                    status=status,
+                    message="相同配置和种子的模拟已存在，直接复用结果",
+                    result=simulation_results.get(simulation_id),
+                    cached=True
+                )
         
         # 创建模拟引擎
         engine = UniversalSimulationEngine(game_config)
@@ -38,42 +112,93 @@ async def start_simulation(request: SimulationRequest, background_tasks: Backgro
         
         # 存储引擎实例
         running_simulations[simulation_id] = engine
+        if cache_key:
+            result_cache.put(cache_key, simulation_id)
         
         # 在后台运行模拟
-        background_tasks.add_task(run_simulation_task, simulation_id, engine)
+        background_tasks.add_task(run_simulation_task, simulation_id, engine, profile)
         
         return SimulationResponse(
             simulation_id=simulation_id,
             status="started",
-            message="模拟已启动"
+            message="模拟已启动（性能剖析已开启）" if profile else "模拟已启动"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"启动模拟失败: {str(e)}")
 
 
-async def run_simulation_task(simulation_id: str, engine: UniversalSimulationEngine):
-    """后台运行模拟任务"""
+def publish_progress_event(engine: UniversalSimulationEngine, since_round: int):
+    """引擎进度事件回调：有订阅者时构建一次增量事件并分发给所有订阅者"""
+    if event_hub.has_subscribers(engine.simulation_id):
+        progress = engine.build_progress(since_round)
+        event_hub.publish(engine.simulation_id, make_event("progress", progress, progress["delta"]["to_round"]))
+
+
+def build_completed_event(simulation_id: str) -> Dict[str, Any]:
+    """模拟结束后的最终状态（与 /progress 完成时的响应一致）"""
+    result = simulation_results.get(simulation_id)
+    if result is None:
+        return {"simulation_id": simulation_id, "status": "unknown", "completed": True}
+    return {
+        "simulation_id": simulation_id,
+        "status": result.status,
+        "completed": True,
+        "progress_percentage": 100.0 if result.status == "completed" else 0.0,
+        "duration": result.duration,
+        "error_message": result.error_message,
+        "final_summary": result.summary.model_dump() if result.summary else None,
+        "phase_timings": result.phase_timings
+    }
+
+
+async def run_simulation_task(simulation_id: str, engine: UniversalSimulationEngine, profile: bool = False):
+    """后台运行模拟任务（profile 为 True 时采样模拟线程的调用栈）"""
     import concurrent.futures
+    import threading
     import time
 
     def run_sync_simulation():
         """在线程池中运行同步模拟"""
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL) if profile else None
+        if sampler is not None:
+            sampler.start()
         try:
-            engine.start_time = datetime.now()
+            # 从检查点恢复时沿用原来的开始时间
+            engine.start_time = engine.start_time or datetime.now()
             engine.is_running = True
             engine.should_stop = False
-
-            for round_num in range(1, min(engine.sim_config.rounds, 100) + 1):
+            engine.set_event_callback(publish_progress_event, settings.PROGRESS_EVENT_INTERVAL)
+            if settings.CHECKPOINT_INTERVAL_ROUNDS or settings.CHECKPOINT_INTERVAL_SECONDS:
+                engine.set_checkpoint_callback(
+                    checkpoint_store.save,
+                    settings.CHECKPOINT_INTERVAL_ROUNDS,
+                    settings.CHECKPOINT_INTERVAL_SECONDS
+                )
+
+            # 从检查点恢复时从下一轮继续
+            for round_num in range(len(engine.round_results) + 1, min(engine.sim_config.rounds, 100) + 1):
                 if engine.should_stop:
                     break
 
                 engine.current_round = round_num
                 round_result = engine.simulate_round(round_num)
-                engine.round_results.append(round_result)
+                engine.record_round(round_result)
+
+                if settings.SIMULATION_PACE_SECONDS and round_num % 10 == 0:
+                    time.sleep(settings.SIMULATION_PACE_SECONDS)
 
-                if round_num % 10 == 0:
-                    time.sleep(0.1)
+            # 推送最后不足一个间隔的轮次
+            engine.flush_events()
+            stopped = engine.should_stop
+            if stopped:
+                # 停止的模拟保存最终检查点，之后可以继续
+                engine.flush_checkpoint()
+            else:
+                # 已完成的模拟不再需要检查点（出错的模拟保留最近的检查点）
+                checkpoint_store.discard(simulation_id)
 
             # 生成结果
             end_time = datetime.now()
@@ -85,11 +210,13 @@ async def run_simulation_task(simulation_id: str, engine: UniversalSimulationEng
                 start_time=engine.start_time,
                 end_time=end_time,
                 duration=duration,
-                status="completed" if not engine.should_stop else "stopped",
+                status="stopped" if stopped else "completed",
                 game_name=engine.game_rules.name,
                 simulation_rounds=len(engine.round_results),
                 round_results=engine.round_results,
-                summary=engine._generate_summary() if engine.round_results else None
+                summary=engine._generate_summary() if engine.round_results else None,
+                analytics=engine.build_analytics(),
+                phase_timings=engine.phase_timings.to_dict()
             )
 
             return result
@@ -106,6 +233,9 @@ async def run_simulation_task(simulation_id: str, engine: UniversalSimulationEng
             )
         finally:
             engine.is_running = False
+            if sampler is not None:
+                sampler.stop()
+                simulation_profiles[simulation_id] = sampler.folded()
 
     try:
         # 在线程池中运行模拟
@@ -119,6 +249,8 @@ async def run_simulation_task(simulation_id: str, engine: UniversalSimulationEng
         if simulation_id in running_simulations:
             del running_simulations[simulation_id]
 
+        event_hub.close(simulation_id, make_event("completed", build_completed_event(simulation_id)))
+
     except Exception as e:
         # 创建错误结果
         error_result = SimulationResult(
@@ -136,6 +268,43 @@ async def run_simulation_task(simulation_id: str, engine: UniversalSimulationEng
         if simulation_id in running_simulations:
             del running_simulations[simulation_id]
 
+        event_hub.close(simulation_id, make_event("completed", build_completed_event(simulation_id)))
+
+
+@router.post("/resume/{simulation_id}", response_model=SimulationResponse)
+async def resume_simulation(simulation_id: str, background_tasks: BackgroundTasks):
+    """
+    从最近的检查点继续模拟
+
+    用于进程重启或模拟被停止后继续运行；恢复资金池、累计金额、随机数生成器状态和增量统计，
+    结果与不中断运行逐位一致。
+    """
+    if simulation_id in running_simulations:
+        raise HTTPException(status_code=409, detail="模拟正在运行")
+    if not checkpoint_store.exists(simulation_id):
+        raise HTTPException(status_code=404, detail="模拟检查点未找到")
+
+    try:
+        engine = checkpoint_store.restore(simulation_id)
+    except CheckpointError as e:
+        raise HTTPException(status_code=409, detail=f"无法从检查点恢复: {str(e)}")
+
+    # 之前停止的结果被继续运行的模拟取代
+    simulation_results.pop(simulation_id, None)
+    simulation_profiles.pop(simulation_id, None)
+    report_cache.discard(simulation_id)
+    report_store.discard(simulation_id)
+    compare_cache.discard_simulation(simulation_id)
+
+    running_simulations[simulation_id] = engine
+    background_tasks.add_task(run_simulation_task, simulation_id, engine)
+
+    return SimulationResponse(
+        simulation_id=simulation_id,
+        status="resumed",
+        message=f"模拟已从第 {len(engine.round_results)} 轮的检查点继续"
+    )
+
 
 @router.get("/status/{simulation_id}")
 async def get_simulation_status(simulation_id: str):
@@ -154,7 +323,8 @@ async def get_simulation_status(simulation_id: str):
                 "total_rounds": engine.sim_config.rounds,
                 "progress_percentage": progress_percentage,
                 "elapsed_time": elapsed_time
-            }
+            },
+            "phase_timings": engine.phase_timings.to_dict()
         }
     
     # 检查是否已完成
@@ -165,20 +335,61 @@ async def get_simulation_status(simulation_id: str):
             "status": result.status,
             "completed": True,
             "duration": result.duration,
-            "error_message": result.error_message
+            "error_message": result.error_message,
+            "phase_timings": result.phase_timings
         }
     
     # 未找到模拟
     raise HTTPException(status_code=404, detail="模拟未找到")
 
 
+def negotiated_response(request: Request, format: Optional[str], data: Optional[Dict[str, Any]] = None,
+                        result: Optional[SimulationResult] = None) -> Response:
+    """
+    按内容协商编码响应（format 参数优先于 Accept 头）
+
+    json 使用 orjson，客户端接受时 gzip 压缩，完整结果的轮次数据流式编码；
+    msgpack / arrow 为二进制格式。
+    """
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    try:
+        fmt = serialization.negotiate_format(request.headers.get("accept"), format)
+        if fmt == "msgpack":
+            body = serialization.result_to_msgpack(result) if result is not None else serialization.data_to_msgpack(data)
+            return Response(body, media_type=serialization.MSGPACK_MEDIA_TYPE, headers=headers)
+        if fmt == "arrow":
+            body = serialization.result_to_arrow(result) if result is not None else serialization.chart_to_arrow(data)
+            return Response(body, media_type=serialization.ARROW_MEDIA_TYPE, headers=headers)
+    except serialization.UnsupportedFormatError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    use_gzip = serialization.accepts_gzip(request.headers.get("accept-encoding"))
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    if result is not None:
+        chunks = serialization.iter_result_json(result)
+        if use_gzip:
+            chunks = serialization.gzip_chunks(chunks)
+        return StreamingResponse(chunks, media_type=serialization.JSON_MEDIA_TYPE, headers=headers)
+
+    body = serialization.dumps(data)
+    if use_gzip:
+        body = serialization.gzip_bytes(body)
+    return Response(body, media_type=serialization.JSON_MEDIA_TYPE, headers=headers)
+
+
 @router.get("/result/{simulation_id}", response_model=SimulationResult)
-async def get_simulation_result(simulation_id: str):
-    """获取模拟结果"""
+async def get_simulation_result(simulation_id: str, request: Request, format: Optional[str] = None):
+    """
+    获取模拟结果
+
+    支持内容协商：JSON（默认，可gzip）、MessagePack、Arrow IPC（轮次结果为列）。
+    """
     if simulation_id not in simulation_results:
         raise HTTPException(status_code=404, detail="模拟结果未找到")
-    
-    return simulation_results[simulation_id]
+
+    return negotiated_response(request, format, result=simulation_results[simulation_id])
 
 
 @router.post("/stop/{simulation_id}")
@@ -208,230 +419,176 @@ async def get_simulation_progress(simulation_id: str):
                 "status": result.status,
                 "completed": True,
                 "progress_percentage": 100.0 if result.status == "completed" else 0.0,
-                "final_summary": result.summary.model_dump() if result.summary else None
+                "final_summary": result.summary.model_dump() if result.summary else None,
+                "phase_timings": result.phase_timings
             }
         raise HTTPException(status_code=404, detail="模拟未找到")
 
-    engine = running_simulations[simulation_id]
-    progress_percentage = (engine.current_round / engine.sim_config.rounds) * 100 if engine.sim_config.rounds > 0 else 0
-    elapsed_time = (datetime.now() - engine.start_time).total_seconds() if engine.start_time else 0
-
-    # 估算剩余时间
-    estimated_remaining = None
-    if engine.current_round > 0 and progress_percentage > 0:
-        time_per_round = elapsed_time / engine.current_round
-        remaining_rounds = engine.sim_config.rounds - engine.current_round
-        estimated_remaining = time_per_round * remaining_rounds
-
-    # 计算实时统计数据
-    real_time_stats = None
-    if engine.round_results:
-        # 计算当前的汇总统计
-        completed_rounds = len(engine.round_results)
-        total_bet_amount = sum(r.total_bet_amount for r in engine.round_results)
-        total_payout = sum(r.total_payout for r in engine.round_results)
-        current_rtp = (total_payout / total_bet_amount) if total_bet_amount > 0 else 0.0
-
-        # 计算中奖和未中奖人数统计
-        total_players = sum(r.players_count for r in engine.round_results)
-        total_winners = sum(r.winners_count or 0 for r in engine.round_results)
-        total_non_winners = sum(r.non_winners_count or 0 for r in engine.round_results)
-        winning_rate = (total_winners / total_players) if total_players > 0 else 0.0
-
-        # 计算各奖级统计
-        prize_stats = {}
-        for prize_level in engine.game_rules.prize_levels:
-            level = prize_level.level
-            total_winners = sum(
-                sum(stat.winners_count for stat in r.prize_stats if stat.level == level)
-                for r in engine.round_results
-            )
-            total_amount = sum(
-                sum(stat.total_amount for stat in r.prize_stats if stat.level == level)
-                for r in engine.round_results
-            )
-            prize_stats[level] = {
-                "name": prize_level.name,
-                "winners_count": total_winners,
-                "total_amount": total_amount
-            }
-
-        # 最近10轮的RTP趋势
-        # 计算最近RTP历史（最近20轮的累积RTP）
-        recent_rtps = []
-        if len(engine.round_results) >= 1:
-            # 计算每轮的累积RTP
-            cumulative_bet = 0
-            cumulative_payout = 0
-            for round_result in engine.round_results:
-                cumulative_bet += round_result.total_bet_amount
-                cumulative_payout += round_result.total_payout
-                if cumulative_bet > 0:
-                    round_rtp = cumulative_payout / cumulative_bet
-                    recent_rtps.append(round_rtp)
-
-            # 只保留最近20轮的RTP数据
-            recent_rtps = recent_rtps[-20:] if len(recent_rtps) > 20 else recent_rtps
-
-        # 获取奖池阶段信息
-        jackpot_phase_info = {}
-        if engine.game_rules.jackpot.enabled:
-            return_phase_completed = engine.total_returned_amount >= engine.initial_jackpot_amount
-            if return_phase_completed:
-                current_contribution_rate = engine.game_rules.jackpot.post_return_contribution_rate
-            else:
-                current_contribution_rate = engine.game_rules.jackpot.contribution_rate
-
-            jackpot_phase_info = {
-                "return_phase_completed": return_phase_completed,
-                "current_contribution_rate": current_contribution_rate,
-                "total_returned_amount": engine.total_returned_amount,
-                "initial_jackpot_amount": engine.initial_jackpot_amount,
-                "phase_1_rate": engine.game_rules.jackpot.contribution_rate,
-                "phase_2_rate": engine.game_rules.jackpot.post_return_contribution_rate
-            }
-
-        real_time_stats = {
-            "completed_rounds": completed_rounds,
-            "total_bet_amount": total_bet_amount,
-            "total_payout": total_payout,
-            "current_rtp": current_rtp,
-            "prize_stats": prize_stats,
-            "recent_rtps": recent_rtps,
-            "current_jackpot": engine.jackpot_pool,
-            "total_sales_amount": engine.total_sales_amount,  # 累计销售金额
-            "jackpot_hits_count": engine.jackpot_hits_count,  # 头奖中出次数
-            "total_players": total_players,  # 总玩家数
-            "total_winners": total_winners,  # 总中奖人数
-            "total_non_winners": total_non_winners,  # 总未中奖人数
-            "winning_rate": winning_rate,  # 中奖率
-            **jackpot_phase_info  # 合并奖池阶段信息
-        }
-
-    return {
-        "simulation_id": simulation_id,
-        "status": "running",
-        "current_round": engine.current_round,
-        "total_rounds": engine.sim_config.rounds,
-        "progress_percentage": progress_percentage,
-        "elapsed_time": elapsed_time,
-        "estimated_remaining": estimated_remaining,
-        "real_time_stats": real_time_stats
-    }
+    # 实时统计由引擎逐轮增量维护，查询开销与已完成轮数无关
+    return running_simulations[simulation_id].build_progress()
 
 
 @router.get("/realtime-data/{simulation_id}")
-async def get_realtime_simulation_data(simulation_id: str):
-    """获取实时模拟数据（用于图表展示）"""
+async def get_realtime_simulation_data(simulation_id: str, request: Request,
+                                       since_round: Optional[int] = Query(None, ge=0),
+                                       format: Optional[str] = None):
+    """
+    获取实时模拟数据（用于图表展示）
+
+    提供 since_round 时只返回该轮之后新增的数据点（chart_data.from_round / to_round）
+    以及最新的汇总数据，前端追加到已有图表即可。支持与 /result 相同的内容协商。
+    """
     if simulation_id not in running_simulations:
         if simulation_id in simulation_results:
             result = simulation_results[simulation_id]
             if result.summary:
-                return {
+                chart_data = {
+                    "rtp_trend": [r.rtp for r in result.round_results] if result.round_results else [],
+                    "jackpot_trend": [r.jackpot_amount for r in result.round_results] if result.round_results else []
+                }
+                if since_round is not None:
+                    chart_data = chart_delta(result.round_results, since_round)
+                chart_data.update({
+                    "prize_distribution": [
+                        {"level": stat.level, "name": stat.name, "count": stat.winners_count, "amount": stat.total_amount}
+                        for stat in result.summary.prize_summary
+                    ] if result.summary.prize_summary else [],
+                    "summary": {
+                        "total_rounds": result.summary.total_rounds,
+                        "average_rtp": result.summary.average_rtp,
+                        "total_bet_amount": result.summary.total_bet_amount,
+                        "total_payout": result.summary.total_payout,
+                        "final_jackpot": result.summary.final_jackpot
+                    }
+                })
+                return negotiated_response(request, format, data={
                     "simulation_id": simulation_id,
                     "status": "completed",
-                    "chart_data": {
-                        "rtp_trend": [r.rtp for r in result.round_results] if result.round_results else [],
-                        "jackpot_trend": [r.jackpot_amount for r in result.round_results] if result.round_results else [],
-                        "prize_distribution": [
-                            {"level": stat.level, "name": stat.name, "count": stat.winners_count, "amount": stat.total_amount}
-                            for stat in result.summary.prize_summary
-                        ] if result.summary.prize_summary else [],
-                        "summary": {
-                            "total_rounds": result.summary.total_rounds,
-                            "average_rtp": result.summary.average_rtp,
-                            "total_bet_amount": result.summary.total_bet_amount,
-                            "total_payout": result.summary.total_payout,
-                            "final_jackpot": result.summary.final_jackpot
-                        }
-                    }
-                }
+                    "chart_data": chart_data
+                })
         raise HTTPException(status_code=404, detail="模拟未找到")
 
     engine = running_simulations[simulation_id]
 
-    # 构建实时图表数据
-    chart_data = {
-        "rtp_trend": [r.rtp for r in engine.round_results],
-        "jackpot_trend": [r.jackpot_amount for r in engine.round_results],
-        "prize_distribution": [],
-        "round_labels": list(range(1, len(engine.round_results) + 1))
-    }
-
-    # 计算奖级分布
-    if engine.round_results:
-        for prize_level in engine.game_rules.prize_levels:
-            level = prize_level.level
-            total_winners = sum(
-                sum(stat.winners_count for stat in r.prize_stats if stat.level == level)
-                for r in engine.round_results
-            )
-            total_amount = sum(
-                sum(stat.total_amount for stat in r.prize_stats if stat.level == level)
-                for r in engine.round_results
-            )
-            if total_winners > 0:  # 只显示有中奖的奖级
-                chart_data["prize_distribution"].append({
-                    "level": level,
-                    "name": prize_level.name,
-                    "count": total_winners,
-                    "amount": total_amount
-                })
+    # 构建实时图表数据（since_round 时只包含新增数据点）
+    chart_data = chart_delta(engine.round_results, since_round or 0)
+    if since_round is None:
+        del chart_data["from_round"], chart_data["to_round"]
+    chart_data["prize_distribution"] = engine.build_prize_distribution()  # 来自引擎的增量统计
 
-    return {
+    return negotiated_response(request, format, data={
         "simulation_id": simulation_id,
         "status": "running",
         "current_round": engine.current_round,
         "chart_data": chart_data
-    }
+    })
+
+
+def progress_snapshot_event(engine: UniversalSimulationEngine, since_round: int):
+    """订阅时的快照事件（delta 包含 since_round 之后的全部数据点）"""
+    progress = engine.build_progress(since_round)
+    return make_event("progress", progress, progress["delta"]["to_round"])
+
+
+async def simulation_events(simulation_id: str, since_round: int = 0):
+    """
+    模拟事件流（SSE 和 WebSocket 共用）
+
+    先发送一次快照（progress 事件，delta 为 since_round 之后的数据点，客户端重连时只补发缺失部分），
+    之后转发引擎按间隔发布的增量事件，模拟结束时发送 completed 事件。
+    长时间没有事件时产生 None，由调用方发送保活消息。
+    """
+    # 先订阅再检查状态，避免错过订阅前刚发生的完成事件
+    subscription = event_hub.subscribe(simulation_id)
+    try:
+        engine = running_simulations.get(simulation_id)
+        if engine is None:
+            yield make_event("completed", build_completed_event(simulation_id))
+            return
+
+        yield progress_snapshot_event(engine, since_round)
+
+        while True:
+            message = await subscription.get(timeout=settings.STREAM_KEEPALIVE_SECONDS)
+            if message is None:
+                if simulation_id not in running_simulations:
+                    yield make_event("completed", build_completed_event(simulation_id))
+                    return
+                yield None
+            elif message is END_OF_STREAM:
+                return
+            elif message is RESYNC:
+                # 消费过慢丢失了部分增量，重新发送完整快照
+                if simulation_id in running_simulations:
+                    yield progress_snapshot_event(running_simulations[simulation_id], 0)
+            else:
+                yield message
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
+def ensure_simulation_exists(simulation_id: str):
+    """模拟不存在时返回404"""
+    if simulation_id not in running_simulations and simulation_id not in simulation_results:
+        raise HTTPException(status_code=404, detail="模拟未找到")
 
 
 @router.get("/stream/{simulation_id}")
-async def stream_simulation_progress(simulation_id: str):
-    """流式获取模拟进度（Server-Sent Events）"""
-    
+async def stream_simulation_progress(simulation_id: str, since_round: Optional[int] = Query(None, ge=0),
+                                     last_event_id: Optional[str] = Header(None)):
+    """
+    流式获取模拟进度（Server-Sent Events）
+
+    事件类型：progress（进度、实时统计和新增图表数据点 delta）、completed（最终状态）。
+    progress 事件ID为已推送到的轮次，浏览器自动重连时通过 Last-Event-ID 只补发之后的数据点。
+    """
+    ensure_simulation_exists(simulation_id)
+
+    if since_round is None:
+        since_round = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
     async def generate_progress():
         """生成进度数据流"""
-        while simulation_id in running_simulations:
-            engine = running_simulations[simulation_id]
-            progress_percentage = (engine.current_round / engine.sim_config.rounds) * 100 if engine.sim_config.rounds > 0 else 0
-            elapsed_time = (datetime.now() - engine.start_time).total_seconds() if engine.start_time else 0
-            
-            progress_data = {
-                "simulation_id": simulation_id,
-                "status": "running",
-                "current_round": engine.current_round,
-                "total_rounds": engine.sim_config.rounds,
-                "progress_percentage": progress_percentage,
-                "elapsed_time": elapsed_time
-            }
-            
-            yield f"data: {json.dumps(progress_data)}\n\n"
-            await asyncio.sleep(1)  # 每秒更新一次
-        
-        # 模拟完成后发送最终状态
-        if simulation_id in simulation_results:
-            result = simulation_results[simulation_id]
-            final_data = {
-                "simulation_id": simulation_id,
-                "status": result.status,
-                "completed": True,
-                "progress_percentage": 100.0 if result.status == "completed" else 0.0,
-                "duration": result.duration
-            }
-            yield f"data: {json.dumps(final_data)}\n\n"
-    
+        async for message in simulation_events(simulation_id, since_round):
+            if message is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_sse(message)
+
     return StreamingResponse(
         generate_progress(),
-        media_type="text/plain",
+        media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
-            "Content-Type": "text/event-stream"
+            "X-Accel-Buffering": "no"
         }
     )
 
 
+@router.websocket("/ws/{simulation_id}")
+async def websocket_simulation_progress(websocket: WebSocket, simulation_id: str, since_round: int = 0):
+    """
+    WebSocket 推送模拟进度
+
+    消息为JSON：{"event": 事件类型, "data": 事件数据}，与SSE事件一致；since_round 含义同 /stream。
+    """
+    await websocket.accept()
+    if simulation_id not in running_simulations and simulation_id not in simulation_results:
+        await websocket.close(code=4404, reason="模拟未找到")
+        return
+
+    try:
+        async for message in simulation_events(simulation_id, max(0, since_round)):
+            if message is None:
+                await websocket.send_text('{"event":"keep-alive"}')
+            else:
+                await websocket.send_text(f'{{"event":"{message.event}","data":{message.data}}}')
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 @router.get("/list")
 async def list_simulations():
     """列出所有模拟"""
@@ -468,6 +625,12 @@ async def delete_simulation_result(simulation_id: str):
     """删除模拟结果"""
     if simulation_id in simulation_results:
         del simulation_results[simulation_id]
+        simulation_profiles.pop(simulation_id, None)
+        result_cache.discard_simulation(simulation_id)
+        report_cache.discard(simulation_id)
+        report_store.discard(simulation_id)
+        compare_cache.discard_simulation(simulation_id)
+        checkpoint_store.discard(simulation_id)
         return {"message": "模拟结果已删除"}
     
     raise HTTPException(status_code=404, detail="模拟结果未找到")
@@ -477,8 +640,8 @@ async def delete_simulation_result(simulation_id: str):
 async def validate_game_config(config: Dict[str, Any]):
     """验证游戏配置"""
     try:
-        # 尝试解析配置
-        game_config = GameConfiguration(**config)
+        # 尝试解析配置（相同内容复用已验证的对象）
+        game_config = parse_game_config(config)
         return {
             "valid": True,
             "message": "配置验证通过",
@@ -0,0 +1,350 @@
+"""
+命令行批量模拟
+
+不经过 HTTP 和后台任务，直接在本进程（或多个工作进程）中同步运行模拟引擎，
+供夜间批处理等场景使用：
+
+    cd backend
+    python -m app.cli simulate config.json --rounds 1000000 --workers 4 --out result.parquet
+
+配置文件可以是完整游戏配置（game_rules + simulation_config），也可以是
+/api/v1/simulation/start 的请求体（game_config + simulation_config）。
+进度输出到 stderr，汇总统计以JSON输出到 stdout，轮次明细按列写入 --out
+（按扩展名：.parquet / .csv / .arrow）。
+
+模拟过程中不保存轮次结果：每个分片把轮次明细按列分块写入临时文件（RoundSpool），
+全部分片完成后按分片顺序逐块写入 --out，内存占用与轮数无关；汇总来自分片汇总累计的合并。
+
+多个工作进程时模拟按分片运行（见 core.sharding）：每个分片是独立的模拟，
+种子由基础种子派生；--workers 1 的结果与同一种子的单次模拟完全一致。
+
+分布式工作节点（向协调者领取分片，见 /api/v1/cluster）：
+
+    python -m app.cli worker --coordinator http://api-node:8000
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .core.compiled_game import parse_game_config
+from .core.sharding import plan_shards, run_shard, merge_shards
+from .models.simulation_result import RoundResult, SimulationResult
+
+
+OUTPUT_FORMATS = (".parquet", ".csv", ".arrow")
+
+# 进度输出间隔（秒）
+PROGRESS_INTERVAL = 0.5
+
+# 轮次明细临时文件每块的轮数（也是写入 --out 的批大小）
+SPOOL_CHUNK_ROWS = 50_000
+
+
+def load_config(path: str, rounds: Optional[int], seed: Optional[int]) -> Dict[str, Any]:
+    """读取配置文件并验证，返回 GameConfiguration 的JSON形式"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    game_rules = data.get("game_rules") or data.get("game_config")
+    simulation_config = dict(data.get("simulation_config") or {})
+    if game_rules is None:
+        raise ValueError("配置文件缺少 game_rules（或 game_config）")
+    if rounds is not None:
+        simulation_config["rounds"] = rounds
+    if seed is not None:
+        simulation_config["seed"] = seed
+
+    game_config = parse_game_config({"game_rules": game_rules, "simulation_config": simulation_config})
+    return game_config.model_dump(mode="json")
+
+
+class ProgressReporter:
+    """把进度写到 stderr（终端中原地刷新，否则按间隔逐行输出）"""
+
+    def __init__(self, total_rounds: int, stream=None, enabled: bool = True):
+        self.total_rounds = total_rounds
+        self.stream = stream or sys.stderr
+        self.enabled = enabled
+        self.interactive = self.stream.isatty()
+        self.completed = 0
+        self.started = time.monotonic()
+        self._last_output = 0.0
+
+    def advance(self, rounds: int):
+        self.completed += rounds
+        now = time.monotonic()
+        if now - self._last_output >= (PROGRESS_INTERVAL if self.interactive else PROGRESS_INTERVAL * 10):
+            self._last_output = now
+            self._write()
+
+    def _write(self, final: bool = False):
+        if not self.enabled:
+            return
+        elapsed = time.monotonic() - self.started
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        percentage = self.completed / self.total_rounds * 100 if self.total_rounds else 100.0
+        line = f"模拟进度 {self.completed}/{self.total_rounds} 轮 ({percentage:.1f}%) {rate:,.0f} 轮/秒"
+        if not final and rate > 0:
+            line += f" 预计剩余 {(self.total_rounds - self.completed) / rate:.0f} 秒"
+        if self.interactive:
+            self.stream.write("\r" + line + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def finish(self):
+        self._write(final=True)
+
+
+class RoundSpool:
+    """
+    分片的轮次明细临时文件
+
+    轮次结果逐轮转换为明细行，按列累积 SPOOL_CHUNK_ROWS 轮后写出一块（pickle），
+    不保留轮次结果对象。文件依次为列名列表和各块的列数据。
+    """
+
+    def __init__(self, path: str, chunk_rows: Optional[int] = None):
+        self.path = path
+        self.chunk_rows = chunk_rows or SPOOL_CHUNK_ROWS
+        self._file = open(path, "wb")
+        self._columns: Optional[List[list]] = None
+
+    def add(self, round_result: RoundResult):
+        from .services.report_export import round_column_spec, round_row
+
+        if self._columns is None:
+            names = [name for name, _ in round_column_spec([round_result])]
+            pickle.dump(names, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._columns = [[] for _ in names]
+        for values, value in zip(self._columns, round_row(round_result, numbers_as_text=False)):
+            values.append(value)
+        if len(self._columns[0]) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self):
+        pickle.dump(self._columns, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._columns = [[] for _ in self._columns]
+
+    def close(self):
+        if self._columns and self._columns[0]:
+            self._flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_spools(paths: List[str]) -> Iterator[Tuple[List[str], List[list]]]:
+    """按分片顺序逐块读取轮次明细临时文件：(列名, 列数据)，轮次号连续编号"""
+    offset = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            try:
+                names = pickle.load(f)
+            except EOFError:
+                continue
+            round_numbers = names.index("round_number")
+            last_round = 0
+            while True:
+                try:
+                    columns = pickle.load(f)
+                except EOFError:
+                    break
+                if offset:
+                    columns[round_numbers] = [number + offset for number in columns[round_numbers]]
+                last_round = columns[round_numbers][-1]
+                yield names, columns
+            offset = last_round or offset
+
+
+def run_shard_spooled(config: Dict[str, Any], rounds: int, seed: int, spool_path: Optional[str],
+                      progress=None) -> Dict[str, Any]:
+    """运行一个分片，spool_path 不为空时轮次明细写入临时文件"""
+    if spool_path is None:
+        return run_shard(config, rounds, seed, progress=progress)
+    with RoundSpool(spool_path) as spool:
+        return run_shard(config, rounds, seed, progress=progress, on_round=spool.add)
+
+
+# 工作进程的进度队列（由进程池初始化函数设置）
+_progress_queue = None
+
+
+def _init_worker(queue):
+    global _progress_queue
+    _progress_queue = queue
+
+
+def _run_shard_in_worker(config: Dict[str, Any], rounds: int, seed: int, spool_path: Optional[str]) -> Dict[str, Any]:
+    return run_shard_spooled(config, rounds, seed, spool_path, progress=_progress_queue.put)
+
+
+def run_simulation(config: Dict[str, Any], workers: int, reporter: ProgressReporter,
+                   spool_dir: Optional[str] = None) -> Tuple[SimulationResult, List[str]]:
+    """
+    按分片运行模拟并合并汇总
+
+    Args:
+        spool_dir: 轮次明细临时文件目录（为空时不输出明细）
+
+    Returns:
+        (不含轮次结果的模拟结果, 按分片顺序的轮次明细临时文件)
+    """
+    start_time = datetime.now()
+    shards = plan_shards(config["simulation_config"]["rounds"], workers, config["simulation_config"].get("seed"))
+    spools = [os.path.join(spool_dir, f"shard-{shard['index']}.spool") for shard in shards] if spool_dir else []
+    spool_for = (lambda index: spools[index]) if spools else (lambda index: None)
+
+    if len(shards) == 1:
+        shard = shards[0]
+        results = [run_shard_spooled(config, shard["rounds"], shard["seed"], spool_for(0), progress=reporter.advance)]
+    else:
+        queue = multiprocessing.Queue()
+        with ProcessPoolExecutor(max_workers=len(shards), initializer=_init_worker, initargs=(queue,)) as executor:
+            futures = [
+                executor.submit(_run_shard_in_worker, config, shard["rounds"], shard["seed"], spool_for(shard["index"]))
+                for shard in shards
+            ]
+            while not all(future.done() for future in futures):
+                while not queue.empty():
+                    reporter.advance(queue.get())
+                time.sleep(0.05)
+            results = [future.result() for future in futures]
+        while not queue.empty():
+            reporter.advance(queue.get())
+
+    return merge_shards(config, results, str(uuid.uuid4()), start_time), spools
+
+
+def write_output(result: SimulationResult, chunks: Iterator[Tuple[List[str], List[list]]], path: str):
+    """
+    按扩展名逐块写入轮次明细
+
+    Parquet 的汇总统计保存在文件元数据的 "summary" 键中，
+    Arrow 的结果（不含轮次结果）保存在 schema 元数据的 "metadata" 键中。
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f"不支持的输出格式: {extension}（支持 {', '.join(OUTPUT_FORMATS)}）")
+
+    if extension == ".csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            header_written = False
+            for names, columns in chunks:
+                if not header_written:
+                    writer.writerow(names)
+                    header_written = True
+                numbers = names.index("winning_numbers")
+                columns[numbers] = [" ".join(str(n) for n in values) for values in columns[numbers]]
+                writer.writerows(zip(*columns))
+        return
+
+    import pyarrow as pa
+
+    from .services.report_export import round_schema
+    from .services.serialization import dumps, result_header
+
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    names = first[0] if first else []
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        summary = result.summary.model_dump(mode="json") if result.summary else None
+        schema = round_schema(names, {"summary": dumps(summary)})
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        schema = round_schema(names, {"metadata": dumps(result_header(result))})
+        writer = pa.ipc.new_stream(path, schema)
+
+    with writer:
+        if first is not None:
+            writer.write_batch(pa.record_batch(first[1], schema=schema))
+        for _, columns in chunks:
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+
+
+def simulate_command(args) -> int:
+    if args.out and os.path.splitext(args.out)[1].lower() not in OUTPUT_FORMATS:
+        print(f"❌ 不支持的输出格式: {args.out}（支持 {', '.join(OUTPUT_FORMATS)}）", file=sys.stderr)
+        return 1
+    try:
+        config = load_config(args.config, args.rounds, args.seed)
+    except Exception as e:
+        print(f"❌ 配置无效: {e}", file=sys.stderr)
+        return 1
+
+    reporter = ProgressReporter(config["simulation_config"]["rounds"], enabled=not args.quiet)
+    with tempfile.TemporaryDirectory(prefix="numerical-cli-") as spool_dir:
+        result, spools = run_simulation(config, args.workers, reporter, spool_dir if args.out else None)
+        reporter.finish()
+
+        if args.out:
+            write_output(result, read_spools(spools), args.out)
+            if not args.quiet:
+                print(f"✅ 轮次明细已写入 {args.out}", file=sys.stderr)
+
+    print(json.dumps(result.summary.model_dump(mode="json"), ensure_ascii=False, indent=2))
+    return 0
+
+
+def worker_command(args) -> int:
+    import httpx
+    from .services.cluster_worker import ClusterWorker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stderr)
+    with httpx.Client(base_url=args.coordinator, timeout=args.timeout) as client:
+        worker = ClusterWorker(client, worker_id=args.worker_id, poll_interval=args.poll_interval,
+                               max_idle=args.max_idle)
+        completed = worker.run()
+    print(f"✅ 工作节点 {worker.worker_id} 完成 {completed} 个分片", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="@numericalTools 命令行工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    simulate = subparsers.add_parser("simulate", help="运行模拟并输出结果")
+    simulate.add_argument("config", help="配置文件（JSON）")
+    simulate.add_argument("--rounds", type=int, help="模拟轮数（覆盖配置文件）")
+    simulate.add_argument("--seed", type=int, help="随机种子（覆盖配置文件）")
+    simulate.add_argument("--workers", type=int, default=1, help="工作进程数（每个进程运行一个分片）")
+    simulate.add_argument("--out", help="轮次明细输出文件（.parquet / .csv / .arrow）")
+    simulate.add_argument("--quiet", action="store_true", help="不输出进度")
+    simulate.set_defaults(handler=simulate_command)
+
+    worker = subparsers.add_parser("worker", help="作为分布式模拟的工作节点运行")
+    worker.add_argument("--coordinator", required=True, help="协调者地址，如 http://api-node:8000")
+    worker.add_argument("--worker-id", help="工作节点ID（默认为主机名加随机后缀）")
+    worker.add_argument("--poll-interval", type=float, default=1.0, help="没有任务时的轮询间隔（秒）")
+    worker.add_argument("--max-idle", type=float, help="连续空闲超过该秒数时退出（默认一直运行）")
+    worker.add_argument("--timeout", type=float, default=30.0, help="HTTP 请求超时（秒）")
+    worker.set_defaults(handler=worker_command)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
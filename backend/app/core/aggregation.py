@@ -0,0 +1,236 @@
+"""
+轮次结果聚合
+
+单次遍历轮次结果即可得到全部全局和各奖级统计，
+引擎汇总、进度查询、各格式报告（HTML / JSON / Excel）以及分片 / 分布式模拟
+共用同一个可合并的汇总累计（SummaryAccumulator），不再为每个奖级重新遍历全部轮次。
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models.simulation_result import RoundResult, SimulationSummary, PrizeStatistics
+from .estimators import FixedHistogram, RTP_HISTOGRAM_RANGE, RTP_HISTOGRAM_BINS
+
+
+class SummaryAccumulator:
+    """
+    可合并的汇总累计
+
+    逐轮增量累计计数、金额、逐轮RTP的矩（Welford）、各奖级合计和逐轮RTP直方图，
+    进度查询、推送和最终汇总都不再遍历全部轮次结果。
+    merge 满足结合律（不满足交换律：最终奖池取后一段的值），按轮次顺序合并
+    各分片 / 工作节点的累计即可得到整次模拟的汇总；to_dict / from_dict 用于在进程和主机之间传递。
+    """
+
+    __slots__ = ("rounds", "players", "bets", "bet_amount", "payout",
+                 "winners", "non_winners", "level_winners", "level_amounts",
+                 "level_probability_sums", "level_rounds",
+                 "rtp_mean", "rtp_m2", "rtp_histogram", "final_jackpot", "jackpot_hits")
+
+    def __init__(self):
+        self.rounds = 0
+        self.players = 0
+        self.bets = 0
+        self.bet_amount = 0.0
+        self.payout = 0.0
+        self.winners = 0
+        self.non_winners = 0
+        self.level_winners: Dict[int, int] = defaultdict(int)
+        self.level_amounts: Dict[int, float] = defaultdict(float)
+        # 各奖级逐轮理论概率之和及出现轮数（用于平均概率）
+        self.level_probability_sums: Dict[int, float] = defaultdict(float)
+        self.level_rounds: Dict[int, int] = defaultdict(int)
+        # 逐轮RTP的均值和离差平方和
+        self.rtp_mean = 0.0
+        self.rtp_m2 = 0.0
+        self.rtp_histogram = FixedHistogram(*RTP_HISTOGRAM_RANGE, RTP_HISTOGRAM_BINS)
+        # 奖池（由模拟引擎在每轮记录后更新）
+        self.final_jackpot: Optional[float] = None
+        self.jackpot_hits = 0
+
+    def add(self, round_result: RoundResult):
+        """累加一轮结果"""
+        rounds = self.rounds = self.rounds + 1
+        self.players += round_result.players_count
+        self.bets += round_result.total_bets
+        self.bet_amount += round_result.total_bet_amount
+        self.payout += round_result.total_payout
+        self.winners += round_result.winners_count or 0
+        self.non_winners += round_result.non_winners_count or 0
+        for stat in round_result.prize_stats:
+            level = stat.level
+            self.level_winners[level] += stat.winners_count
+            self.level_amounts[level] += stat.total_amount
+            self.level_probability_sums[level] += stat.probability
+            self.level_rounds[level] += 1
+
+        rtp = round_result.rtp
+        delta = rtp - self.rtp_mean
+        self.rtp_mean += delta / rounds
+        self.rtp_m2 += delta * (rtp - self.rtp_mean)
+        self.rtp_histogram.add(rtp)
+
+    def merge(self, other: "SummaryAccumulator") -> "SummaryAccumulator":
+        """合并紧接在本段之后的另一段累计（原地修改并返回自身）"""
+        if other.rounds:
+            if self.rounds == 0:
+                self.rtp_mean, self.rtp_m2 = other.rtp_mean, other.rtp_m2
+            else:
+                # Chan 等的并行方差公式
+                count = self.rounds + other.rounds
+                delta = other.rtp_mean - self.rtp_mean
+                self.rtp_mean += delta * other.rounds / count
+                self.rtp_m2 += other.rtp_m2 + delta * delta * self.rounds * other.rounds / count
+            self.final_jackpot = other.final_jackpot
+
+        self.rounds += other.rounds
+        self.players += other.players
+        self.bets += other.bets
+        self.bet_amount += other.bet_amount
+        self.payout += other.payout
+        self.winners += other.winners
+        self.non_winners += other.non_winners
+        for level, count in other.level_winners.items():
+            self.level_winners[level] += count
+        for level, amount in other.level_amounts.items():
+            self.level_amounts[level] += amount
+        for level, probability in other.level_probability_sums.items():
+            self.level_probability_sums[level] += probability
+        for level, rounds in other.level_rounds.items():
+            self.level_rounds[level] += rounds
+        self.rtp_histogram.merge(other.rtp_histogram)
+        self.jackpot_hits += other.jackpot_hits
+        return self
+
+    @property
+    def rtp_variance(self) -> float:
+        """逐轮RTP的总体方差"""
+        return self.rtp_m2 / self.rounds if self.rounds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON形式（奖级为字符串键）"""
+        histogram = self.rtp_histogram
+        return {
+            "rounds": self.rounds,
+            "players": self.players,
+            "bets": self.bets,
+            "bet_amount": self.bet_amount,
+            "payout": self.payout,
+            "winners": self.winners,
+            "non_winners": self.non_winners,
+            "levels": {
+                str(level): [self.level_winners.get(level, 0), self.level_amounts.get(level, 0.0),
+                             self.level_probability_sums.get(level, 0.0), rounds]
+                for level, rounds in self.level_rounds.items()
+            },
+            "rtp": [self.rtp_mean, self.rtp_m2],
+            "rtp_histogram": [list(histogram.counts), histogram.underflow, histogram.overflow],
+            "final_jackpot": self.final_jackpot,
+            "jackpot_hits": self.jackpot_hits
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SummaryAccumulator":
+        """
+        从JSON形式恢复
+
+        Raises:
+            ValueError: 结构无效
+        """
+        accumulator = cls()
+        try:
+            for name in ("rounds", "players", "bets", "winners", "non_winners", "jackpot_hits"):
+                setattr(accumulator, name, int(data[name]))
+            for name in ("bet_amount", "payout"):
+                setattr(accumulator, name, float(data[name]))
+            for level, (winners, amount, probability, rounds) in data["levels"].items():
+                level = int(level)
+                accumulator.level_winners[level] = int(winners)
+                accumulator.level_amounts[level] = float(amount)
+                accumulator.level_probability_sums[level] = float(probability)
+                accumulator.level_rounds[level] = int(rounds)
+            accumulator.rtp_mean, accumulator.rtp_m2 = (float(v) for v in data["rtp"])
+            counts, underflow, overflow = data["rtp_histogram"]
+            if len(counts) != accumulator.rtp_histogram.bins:
+                raise ValueError("RTP直方图分箱数不一致")
+            accumulator.rtp_histogram.counts = [int(c) for c in counts]
+            accumulator.rtp_histogram.underflow = int(underflow)
+            accumulator.rtp_histogram.overflow = int(overflow)
+            final_jackpot = data["final_jackpot"]
+            accumulator.final_jackpot = float(final_jackpot) if final_jackpot is not None else None
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"汇总累计结构无效: {e}")
+        return accumulator
+
+    def average_probability(self, level: int) -> float:
+        """奖级的平均理论中奖概率"""
+        rounds = self.level_rounds.get(level, 0)
+        return self.level_probability_sums[level] / rounds if rounds else 0.0
+
+    def prize_statistics(self, levels: Iterable[Tuple[int, str]]) -> List[PrizeStatistics]:
+        """按给定的 (奖级, 名称) 顺序生成各奖级汇总"""
+        return [
+            PrizeStatistics(
+                level=level,
+                name=name,
+                winners_count=self.level_winners.get(level, 0),
+                total_amount=self.level_amounts.get(level, 0.0),
+                probability=self.average_probability(level)
+            )
+            for level, name in levels
+        ]
+
+
+class RoundColumns:
+    """报告和图表使用的逐轮序列列"""
+
+    __slots__ = ("round_numbers", "rtps", "jackpots")
+
+    def __init__(self):
+        self.round_numbers: List[int] = []
+        self.rtps: List[float] = []
+        self.jackpots: List[float] = []
+
+    def add(self, round_result: RoundResult):
+        self.round_numbers.append(round_result.round_number)
+        self.rtps.append(round_result.rtp)
+        self.jackpots.append(round_result.jackpot_amount)
+
+
+def reduce_rounds(round_results: Sequence[RoundResult]) -> Tuple[SummaryAccumulator, RoundColumns]:
+    """单次遍历轮次结果，得到汇总累计和序列列（最终奖池取最后一轮的奖池金额）"""
+    totals = SummaryAccumulator()
+    columns = RoundColumns()
+    add_totals = totals.add
+    add_columns = columns.add
+    for round_result in round_results:
+        add_totals(round_result)
+        add_columns(round_result)
+    if round_results:
+        totals.final_jackpot = round_results[-1].jackpot_amount
+    return totals, columns
+
+
+def build_summary(totals: SummaryAccumulator, levels: Iterable[Tuple[int, str]],
+                  initial_jackpot: float) -> Optional[SimulationSummary]:
+    """根据汇总累计构建模拟汇总（无轮次时返回None）"""
+    if totals.rounds == 0:
+        return None
+
+    return SimulationSummary(
+        total_rounds=totals.rounds,
+        total_players=totals.players,
+        total_bets=totals.bets,
+        total_bet_amount=totals.bet_amount,
+        total_payout=totals.payout,
+        average_rtp=totals.rtp_mean,
+        rtp_variance=totals.rtp_variance,
+        total_winners=totals.winners,
+        total_non_winners=totals.non_winners,
+        winning_rate=(totals.winners / totals.players) if totals.players > 0 else 0.0,
+        initial_jackpot=initial_jackpot,
+        final_jackpot=totals.final_jackpot,
+        jackpot_hits=totals.jackpot_hits,
+        prize_summary=totals.prize_statistics(levels)
+    )
@@ -0,0 +1,216 @@
+"""
+模拟检查点
+
+长时间模拟定期把引擎的完整状态写入磁盘，进程重启后可以从最近的检查点继续，
+结果与不中断运行逐位一致。每个模拟一个目录：
+- state.pkl：引擎状态（资金池、累计金额、随机数生成器状态、增量统计、轮次游标等），
+  先写临时文件再原子替换，不会留下写了一半的状态
+- rounds.log：追加写入的轮次结果（每次检查点追加上次之后新增的轮次，紧凑元组格式）；
+  state.pkl 记录对应的日志长度，恢复时截掉最后一次状态之后写入的残留部分
+"""
+
+import logging
+import os
+import pickle
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.game_config import GameConfiguration
+from ..models.simulation_result import RoundResult, PrizeStatistics
+from .compiled_game import compile_game
+from .config import settings
+from .simulation_engine import UniversalSimulationEngine
+
+logger = logging.getLogger(__name__)
+
+
+# 检查点格式版本：状态字段或轮次编码变化时递增
+CHECKPOINT_FORMAT = 1
+
+STATE_FILE = "state.pkl"
+ROUNDS_FILE = "rounds.log"
+
+
+class CheckpointError(Exception):
+    """检查点不存在、损坏或与当前引擎不兼容"""
+
+
+def encode_round(round_result: RoundResult) -> tuple:
+    """把轮次结果编码为紧凑元组（奖级名称和概率由配置恢复）"""
+    return (
+        round_result.round_number,
+        round_result.players_count,
+        round_result.total_bets,
+        round_result.total_bet_amount,
+        round_result.total_payout,
+        round_result.rtp,
+        round_result.jackpot_amount,
+        round_result.winning_numbers,
+        round_result.winners_count,
+        round_result.non_winners_count,
+        tuple((stat.winners_count, stat.total_amount) for stat in round_result.prize_stats),
+    )
+
+
+def decode_round(data: tuple, prize_levels) -> RoundResult:
+    """从紧凑元组恢复轮次结果（prize_levels 为编译后游戏配置的奖级，顺序与引擎一致）"""
+    (round_number, players_count, total_bets, total_bet_amount, total_payout, rtp,
+     jackpot_amount, winning_numbers, winners_count, non_winners_count, stats) = data
+    return RoundResult(
+        round_number=round_number,
+        players_count=players_count,
+        total_bets=total_bets,
+        total_bet_amount=total_bet_amount,
+        total_payout=total_payout,
+        rtp=rtp,
+        jackpot_amount=jackpot_amount,
+        prize_stats=[
+            PrizeStatistics(
+                level=level.level,
+                name=level.name,
+                winners_count=stat_winners,
+                total_amount=stat_amount,
+                probability=level.probability
+            )
+            for level, (stat_winners, stat_amount) in zip(prize_levels, stats)
+        ],
+        winning_numbers=winning_numbers,
+        winners_count=winners_count,
+        non_winners_count=non_winners_count
+    )
+
+
+class CheckpointStore:
+    """按模拟ID保存检查点"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, simulation_id: str, name: str) -> str:
+        return os.path.join(self.root, simulation_id, name)
+
+    def exists(self, simulation_id: str) -> bool:
+        return os.path.exists(self._path(simulation_id, STATE_FILE))
+
+    def save(self, engine) -> Dict[str, Any]:
+        """
+        保存引擎检查点（在引擎线程中调用，状态是一致的快照）
+
+        先追加上次检查点之后的轮次，再原子替换状态文件。
+        保存失败只记录日志，不中断模拟（上一个检查点仍然有效）。
+        """
+        with self._lock:
+            try:
+                return self._save(engine)
+            except Exception as e:
+                logger.warning(f"保存模拟 {engine.simulation_id} 的检查点失败: {e}")
+                return None
+
+    def _save(self, engine) -> Dict[str, Any]:
+        simulation_id = engine.simulation_id
+        directory = os.path.join(self.root, simulation_id)
+        os.makedirs(directory, exist_ok=True)
+
+        state = engine.checkpoint_state()
+        rounds_path = os.path.join(directory, ROUNDS_FILE)
+        previous = self._read_state(simulation_id) if engine.checkpoint_rounds else None
+        logged_rounds = previous["logged_rounds"] if previous else 0
+        log_size = previous["log_size"] if previous else 0
+
+        with open(rounds_path, "ab") as f:
+            # 截掉上次状态之后写入的残留（上次保存中途失败时）
+            f.truncate(log_size)
+            new_rounds = engine.round_results[logged_rounds:]
+            if new_rounds:
+                pickle.dump([encode_round(r) for r in new_rounds], f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+            log_size = f.tell()
+
+        state["format"] = CHECKPOINT_FORMAT
+        state["logged_rounds"] = logged_rounds + len(new_rounds)
+        state["log_size"] = log_size
+
+        state_path = os.path.join(directory, STATE_FILE)
+        temp_path = f"{state_path}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, state_path)
+        engine.checkpoint_rounds = state["logged_rounds"]
+        return state
+
+    def _read_state(self, simulation_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(simulation_id, STATE_FILE), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            raise CheckpointError(f"检查点状态损坏: {e}")
+
+    def load(self, simulation_id: str) -> Tuple[Dict[str, Any], List[tuple]]:
+        """
+        读取检查点
+
+        Returns:
+            (引擎状态, 编码后的轮次结果)
+
+        Raises:
+            CheckpointError: 检查点不存在或损坏
+        """
+        state = self._read_state(simulation_id)
+        if state is None:
+            raise CheckpointError("检查点不存在")
+        if state.get("format") != CHECKPOINT_FORMAT:
+            raise CheckpointError("检查点格式不兼容")
+
+        rounds: List[tuple] = []
+        try:
+            with open(self._path(simulation_id, ROUNDS_FILE), "rb") as f:
+                while f.tell() < state["log_size"]:
+                    try:
+                        rounds.extend(pickle.load(f))
+                    except Exception as e:
+                        raise CheckpointError(f"轮次日志损坏: {e}")
+        except FileNotFoundError:
+            raise CheckpointError("轮次日志不存在")
+        except OSError as e:
+            raise CheckpointError(f"轮次日志无法读取: {e}")
+        if len(rounds) != state["logged_rounds"]:
+            raise CheckpointError("轮次日志与检查点状态不一致")
+        return state, rounds
+
+    def restore(self, simulation_id: str) -> UniversalSimulationEngine:
+        """
+        从检查点恢复引擎
+
+        Raises:
+            CheckpointError: 检查点不存在、损坏，或由不同版本的引擎生成
+        """
+        state, encoded_rounds = self.load(simulation_id)
+        try:
+            prize_levels = compile_game(GameConfiguration.model_validate(state["game_config"])).prize_levels
+            return UniversalSimulationEngine.from_checkpoint(
+                state, [decode_round(data, prize_levels) for data in encoded_rounds]
+            )
+        except ValueError as e:
+            raise CheckpointError(str(e))
+
+    def list(self) -> List[str]:
+        """有检查点的模拟ID"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if self.exists(name))
+
+    def discard(self, simulation_id: str):
+        """删除模拟的检查点"""
+        with self._lock:
+            shutil.rmtree(os.path.join(self.root, simulation_id), ignore_errors=True)
+
+
+# 全局检查点存储实例
+checkpoint_store = CheckpointStore(settings.CHECKPOINT_DIR)
@@ -0,0 +1,152 @@
+"""
+熔断器：在依赖服务（数据库）不可用时快速失败
+"""
+
+import threading
+import time
+import logging
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+    CLOSED = "closed"        # 正常：允许访问
+    OPEN = "open"            # 熔断：冷却期内跳过访问
+    HALF_OPEN = "half_open"  # 半开：冷却期结束，允许一次试探访问
+
+
+class CircuitBreaker:
+    """
+    简单的线程安全熔断器
+
+    连续失败次数达到阈值后进入熔断状态，冷却期内 allow_request() 直接返回 False，
+    调用方应立即走备用方案（文件存储），而不是再等待一次连接超时。
+    冷却期结束后放行一次试探请求，成功则恢复，失败则重新熔断。
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3,
+                 cooldown_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化熔断器
+
+        Args:
+            name: 熔断器名称（用于日志和健康检查）
+            failure_threshold: 触发熔断的连续失败次数
+            cooldown_seconds: 熔断冷却时间（秒）
+            clock: 单调时钟函数（便于测试注入）
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_trial_in_flight = False
+
+        # 统计信息
+        self._total_failures = 0
+        self._total_short_circuits = 0
+        self._last_error: Optional[str] = None
+        self._last_failure_at: Optional[float] = None
+        self._last_success_at: Optional[float] = None
+
+    @property
+    def state(self) -> CircuitState:
+        """当前状态（会根据冷却时间自动从OPEN转为HALF_OPEN）"""
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def _refresh_state(self):
+        """冷却期结束后转为半开状态（调用方需持有锁）"""
+        if self._state == CircuitState.OPEN and self._opened_at is not None:
+            if self._clock() - self._opened_at >= self.cooldown_seconds:
+                self._state = CircuitState.HALF_OPEN
+                self._half_open_trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """是否允许访问依赖服务"""
+        with self._lock:
+            self._refresh_state()
+
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.HALF_OPEN and not self._half_open_trial_in_flight:
+                # 半开状态只放行一次试探请求
+                self._half_open_trial_in_flight = True
+                return True
+
+            self._total_short_circuits += 1
+            return False
+
+    def record_success(self):
+        """记录一次成功访问"""
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(f"熔断器 '{self.name}' 恢复: {self._state.value} -> closed")
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._half_open_trial_in_flight = False
+            self._last_success_at = self._clock()
+
+    def record_failure(self, error: Any = None):
+        """记录一次失败访问"""
+        with self._lock:
+            self._refresh_state()
+            self._consecutive_failures += 1
+            self._total_failures += 1
+            self._last_failure_at = self._clock()
+            if error is not None:
+                self._last_error = str(error)
+
+            if self._state == CircuitState.HALF_OPEN or \
+                    self._consecutive_failures >= self.failure_threshold:
+                if self._state != CircuitState.OPEN:
+                    logger.warning(
+                        f"熔断器 '{self.name}' 打开: 连续失败 {self._consecutive_failures} 次，"
+                        f"{self.cooldown_seconds:.0f} 秒内跳过访问"
+                    )
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._half_open_trial_in_flight = False
+
+    def reset(self):
+        """重置为初始状态"""
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._half_open_trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取状态快照（用于健康检查）"""
+        with self._lock:
+            self._refresh_state()
+            now = self._clock()
+            retry_in = None
+            if self._state == CircuitState.OPEN and self._opened_at is not None:
+                retry_in = max(0.0, self.cooldown_seconds - (now - self._opened_at))
+
+            return {
+                "name": self.name,
+                "state": self._state.value,
+                "available": self._state == CircuitState.CLOSED,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "cooldown_seconds": self.cooldown_seconds,
+                "retry_in_seconds": retry_in,
+                "total_failures": self._total_failures,
+                "total_short_circuits": self._total_short_circuits,
+                "last_error": self._last_error,
+                "seconds_since_last_failure": (now - self._last_failure_at) if self._last_failure_at is not None else None,
+                "seconds_since_last_success": (now - self._last_success_at) if self._last_success_at is not None else None
+            }
@@ -0,0 +1,174 @@
+"""
+编译后的游戏配置
+
+将 pydantic 配置模型一次性转换为纯 Python 数值和按匹配数索引的奖级元组，
+供模拟引擎热循环直接使用，避免逐注访问 pydantic 属性。
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.game_config import GameConfiguration
+
+
+class CompiledPrizeLevel:
+    """编译后的奖级"""
+
+    __slots__ = ("level", "name", "match_condition", "fixed_prize", "prize_percentage", "probability")
+
+    def __init__(self, level: int, name: str, match_condition: int,
+                 fixed_prize: Optional[float], prize_percentage: Optional[float]):
+        self.level = level
+        self.name = name
+        self.match_condition = match_condition
+        self.fixed_prize = fixed_prize
+        self.prize_percentage = prize_percentage
+        # 简化概率估算（与引擎原有逻辑一致）
+        self.probability = 1.0 / (2 ** match_condition) if match_condition > 0 else 0.0
+
+
+class CompiledGame:
+    """
+    编译后的游戏配置（按内容哈希在多个引擎间共享，构建后不应修改）
+
+    所有字段均为纯 Python 数值/元组。prize_level_by_match 按匹配数索引，
+    与引擎原有语义一致：同一匹配数配置多个奖级时取第一个。
+    """
+
+    __slots__ = (
+        "content_hash", "name", "game_type",
+        "min_number", "max_number", "number_pool", "selection_count", "ticket_price",
+        "rounds", "players_range", "bets_range", "seed",
+        "jackpot_enabled", "initial_jackpot", "contribution_rate", "post_return_contribution_rate",
+        "return_rate", "min_jackpot", "jackpot_fixed_prize",
+        "prize_levels", "prize_level_by_match", "prize_map"
+    )
+
+    def __init__(self, game_config: GameConfiguration, content_hash: str):
+        rules = game_config.game_rules
+        sim = game_config.simulation_config
+        jackpot = rules.jackpot
+
+        self.content_hash = content_hash
+        self.name = rules.name
+        self.game_type = rules.game_type.value
+
+        # 号码与投注
+        self.min_number, self.max_number = int(rules.number_range[0]), int(rules.number_range[1])
+        self.number_pool = tuple(range(self.min_number, self.max_number + 1))
+        self.selection_count = int(rules.selection_count)
+        self.ticket_price = float(rules.ticket_price)
+
+        # 模拟参数
+        self.rounds = int(sim.rounds)
+        self.players_range = (int(sim.players_range[0]), int(sim.players_range[1]))
+        self.bets_range = (int(sim.bets_range[0]), int(sim.bets_range[1]))
+        self.seed = sim.seed
+
+        # 奖池参数
+        self.jackpot_enabled = bool(jackpot.enabled)
+        self.initial_jackpot = float(jackpot.initial_amount)
+        self.contribution_rate = float(jackpot.contribution_rate)
+        self.post_return_contribution_rate = float(jackpot.post_return_contribution_rate)
+        self.return_rate = float(jackpot.return_rate)
+        self.min_jackpot = float(jackpot.min_jackpot)
+        self.jackpot_fixed_prize = float(jackpot.jackpot_fixed_prize) if jackpot.jackpot_fixed_prize is not None else None
+
+        # 奖级
+        self.prize_levels: Tuple[CompiledPrizeLevel, ...] = tuple(
+            CompiledPrizeLevel(
+                level=level.level,
+                name=level.name,
+                match_condition=level.match_condition,
+                fixed_prize=float(level.fixed_prize) if level.fixed_prize is not None else None,
+                prize_percentage=float(level.prize_percentage) if level.prize_percentage is not None else None
+            )
+            for level in rules.prize_levels
+        )
+
+        max_match = max([self.selection_count] + [level.match_condition for level in self.prize_levels])
+        by_match: List[Optional[CompiledPrizeLevel]] = [None] * (max_match + 1)
+        for level in self.prize_levels:
+            if by_match[level.match_condition] is None:
+                by_match[level.match_condition] = level
+        self.prize_level_by_match = tuple(by_match)
+
+        # 与引擎原有 prize_map 一致：固定奖金或0（奖池分配类型运行时计算）
+        self.prize_map: Dict[int, float] = {}
+        for level in self.prize_levels:
+            self.prize_map[level.match_condition] = level.fixed_prize if level.fixed_prize is not None else 0.0
+
+    def __repr__(self):
+        return f"<CompiledGame(name='{self.name}', hash='{self.content_hash[:12]}')>"
+
+
+def content_hash(data: Any) -> str:
+    """计算数据的规范化内容哈希（键排序的紧凑JSON的SHA-256）"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def game_content_hash(game_config: GameConfiguration) -> str:
+    """游戏配置的内容哈希（只包含规则和模拟参数，不含ID和时间戳）"""
+    return content_hash(game_config.model_dump(mode="json", include={"game_rules", "simulation_config"}))
+
+
+class _HashCache:
+    """按内容哈希缓存的小型LRU"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_compiled_games = _HashCache()
+_parsed_configs = _HashCache()
+
+
+def compile_game(game_config: GameConfiguration) -> CompiledGame:
+    """编译游戏配置（相同内容只编译一次）"""
+    key = game_content_hash(game_config)
+    compiled = _compiled_games.get(key)
+    if compiled is None:
+        compiled = CompiledGame(game_config, key)
+        _compiled_games.put(key, compiled)
+    return compiled
+
+
+def parse_game_config(config: Dict[str, Any]) -> GameConfiguration:
+    """
+    解析并验证配置字典（相同内容只验证一次）
+
+    返回的对象在多个调用方之间共享，调用方不应修改。
+
+    Raises:
+        ValidationError: 配置无效
+    """
+    key = content_hash(config)
+    game_config = _parsed_configs.get(key)
+    if game_config is None:
+        game_config = GameConfiguration(**config)
+        _parsed_configs.put(key, game_config)
+    return game_config
@@ -4,7 +4,6 @@
 
 from pydantic_settings import BaseSettings
 from typing import Optional
-import os
 
 
 class Settings(BaseSettings):
@@ -22,16 +21,46 @@ class Settings(BaseSettings):
     
     # 数据库配置（可选）
     DATABASE_URL: Optional[str] = None
-    
+    DB_CONNECT_TIMEOUT: int = 3  # 数据库连接超时（秒）
+    DB_CIRCUIT_FAILURE_THRESHOLD: int = 2  # 连续失败多少次后熔断
+    DB_CIRCUIT_COOLDOWN: float = 30.0  # 熔断冷却时间（秒）
+    DB_CIRCUIT_PROBE_INTERVAL: float = 10.0  # 熔断期间后台探测间隔（秒）
+
     # 模拟配置
     MAX_SIMULATION_ROUNDS: int = 10_000_000
     MAX_CONCURRENT_SIMULATIONS: int = 5
     DEFAULT_TIMEOUT: int = 300  # 5分钟
+    SIMULATION_PACE_SECONDS: float = 0.1  # API 模拟每10轮暂停的时间（秒），便于观察实时进度；0表示不暂停
+    PROFILE_SAMPLE_INTERVAL: float = 0.005  # 性能剖析（options.profile=true）的调用栈采样间隔（秒）
+
+    # 进度推送（SSE / WebSocket）
+    PROGRESS_EVENT_INTERVAL: int = 10  # 每多少轮推送一次增量进度
+    PROGRESS_EVENT_QUEUE_SIZE: int = 256  # 每个订阅者的事件队列长度，溢出后重新发送快照
+    STREAM_KEEPALIVE_SECONDS: float = 15.0  # 无事件时的保活间隔（秒）
+
+    # 检查点（两个间隔都为0时不保存检查点）
+    CHECKPOINT_INTERVAL_ROUNDS: int = 10_000  # 每多少轮保存一次
+    CHECKPOINT_INTERVAL_SECONDS: float = 30.0  # 距上次保存超过多少秒时保存
+
+    # 分布式模拟
+    CLUSTER_LEASE_SECONDS: float = 120.0  # 分片租约时长（秒），工作节点上报进度时续租
+    CLUSTER_MAX_ATTEMPTS: int = 3  # 单个分片的最大运行次数
+
+    # 配置缓存
+    CONFIG_CACHE_MAX_ENTRIES: int = 256
+    CONFIG_CACHE_TTL: float = 300.0  # 秒，兜底其他节点对数据库配置的修改
     
+    # 报告
+    REPORT_MAX_POINTS: int = 2000  # 报告中每条趋势线的最大点数（超出时降采样）
+    REPORT_CACHE_MAX_ENTRIES: int = 16  # 内存中缓存的渲染报告数
+    REPORT_WORKERS: int = 2  # 报告构建线程数
+    TEMP_FILE_MAX_AGE: float = 3600.0  # 临时导出文件保留时间（秒），超时后清理
+
     # 文件存储
     UPLOAD_DIR: str = "uploads"
     REPORTS_DIR: str = "reports"
     TEMP_DIR: str = "temp"
+    CHECKPOINT_DIR: str = "checkpoints"
     
     # 安全配置
     SECRET_KEY: str = "numerical-tools-secret-key-2025"
@@ -48,6 +77,4 @@ class Settings(BaseSettings):
 # 创建全局设置实例
 settings = Settings()
 
-# 确保必要的目录存在
-for directory in [settings.UPLOAD_DIR, settings.REPORTS_DIR, settings.TEMP_DIR]:
-    os.makedirs(directory, exist_ok=True)
+# 上传、报告、临时文件和检查点目录不在导入时创建，由各自的存储在首次写入时创建
@@ -0,0 +1,240 @@
+"""
+流式分布估计
+
+逐轮更新、内存固定的分布统计，不保留也不重新遍历轮次结果：
+- FixedHistogram：固定分箱直方图（线性或对数刻度，超出范围的值计入下溢/上溢）
+- P2Quantile：P² 算法（Jain & Chlamtac）估计单个分位数，只保存5个标记点
+- DistributionEstimator：计数、均值/方差（Welford）、极值、直方图和一组分位数
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..models.simulation_result import RoundResult
+
+
+# 估计的分位数
+QUANTILES: Tuple[float, ...] = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# 逐轮RTP直方图范围（0% ~ 500%，每箱5%）
+RTP_HISTOGRAM_RANGE = (0.0, 5.0)
+RTP_HISTOGRAM_BINS = 100
+
+# 金额直方图（对数刻度，1 ~ 1e12，每十倍10箱）
+AMOUNT_HISTOGRAM_RANGE = (1.0, 1e12)
+AMOUNT_HISTOGRAM_BINS = 120
+
+# 玩家数直方图的最大箱数
+PLAYERS_HISTOGRAM_MAX_BINS = 50
+
+
+class FixedHistogram:
+    """固定分箱直方图"""
+
+    __slots__ = ("low", "high", "bins", "log", "counts", "underflow", "overflow",
+                 "_start", "_scale")
+
+    def __init__(self, low: float, high: float, bins: int, log: bool = False):
+        if bins < 1 or high <= low or (log and low <= 0):
+            raise ValueError("直方图范围或分箱数无效")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.log = log
+        self.counts: List[int] = [0] * bins
+        self.underflow = 0
+        self.overflow = 0
+        if log:
+            self._start = math.log10(low)
+            self._scale = bins / (math.log10(high) - self._start)
+        else:
+            self._start = low
+            self._scale = bins / (high - low)
+
+    def add(self, value: float):
+        if value < self.low:
+            self.underflow += 1
+            return
+        if value >= self.high:
+            self.overflow += 1
+            return
+        position = math.log10(value) if self.log else value
+        index = int((position - self._start) * self._scale)
+        # 浮点误差可能使接近上界的值落到 bins
+        self.counts[index if index < self.bins else self.bins - 1] += 1
+
+    def edges(self) -> List[float]:
+        """分箱边界（bins + 1 个）"""
+        if self.log:
+            step = 1.0 / self._scale
+            return [10 ** (self._start + i * step) for i in range(self.bins + 1)]
+        step = (self.high - self.low) / self.bins
+        return [self.low + i * step for i in range(self.bins + 1)]
+
+    def merge(self, other: "FixedHistogram"):
+        """合并分箱相同的直方图"""
+        if (self.low, self.high, self.bins, self.log) != (other.low, other.high, other.bins, other.log):
+            raise ValueError("只能合并分箱相同的直方图")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scale": "log" if self.log else "linear",
+            "edges": self.edges(),
+            "counts": list(self.counts),
+            "underflow": self.underflow,
+            "overflow": self.overflow
+        }
+
+
+class P2Quantile:
+    """
+    P² 分位数估计
+
+    前5个值精确保存，之后用5个标记点的分段抛物线插值跟踪分位数。
+    标记点的理想位置由样本数直接算出（1 + (n - 1) * 增量），不需要逐个累加。
+    """
+
+    __slots__ = ("p", "count", "heights", "positions", "increments")
+
+    def __init__(self, p: float):
+        if not 0.0 < p < 1.0:
+            raise ValueError("分位数必须在 (0, 1) 之间")
+        self.p = p
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.increments = (0.0, p / 2, p, (1.0 + p) / 2, 1.0)
+
+    def add(self, value: float):
+        count = self.count = self.count + 1
+        heights = self.heights
+        if count <= 5:
+            heights.append(value)
+            if count == 5:
+                heights.sort()
+            return
+
+        # 找到值所在的区间，更新其右侧标记点的位置
+        positions = self.positions
+        if value < heights[0]:
+            heights[0] = value
+            k = 1
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 4
+        elif value < heights[2]:
+            k = 1 if value < heights[1] else 2
+        else:
+            k = 3 if value < heights[3] else 4
+        for i in range(k, 5):
+            positions[i] += 1
+
+        # 调整中间三个标记点
+        increments = self.increments
+        for i in (1, 2, 3):
+            n = positions[i]
+            d = 1.0 + (count - 1) * increments[i] - n
+            if (d >= 1.0 and positions[i + 1] - n > 1) or (d <= -1.0 and positions[i - 1] - n < -1):
+                step = 1 if d > 0 else -1
+                q = heights[i]
+                n_prev = positions[i - 1]
+                n_next = positions[i + 1]
+                candidate = q + step / (n_next - n_prev) * (
+                    (n - n_prev + step) * (heights[i + 1] - q) / (n_next - n)
+                    + (n_next - n - step) * (q - heights[i - 1]) / (n - n_prev)
+                )
+                if heights[i - 1] < candidate < heights[i + 1]:
+                    heights[i] = candidate
+                else:
+                    heights[i] = q + step * (heights[i + step] - q) / (positions[i + step] - n)
+                positions[i] = n + step
+
+    def value(self) -> Optional[float]:
+        """当前分位数估计（样本不超过5个时为精确值）"""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            ordered = sorted(self.heights)
+            position = self.p * (len(ordered) - 1)
+            lower = int(position)
+            upper = min(lower + 1, len(ordered) - 1)
+            return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+        return self.heights[2]
+
+
+def quantile_label(p: float) -> str:
+    """分位数标签，如 0.5 -> "p50"、0.995 -> "p99.5" """
+    return f"p{p * 100:g}"
+
+
+class DistributionEstimator:
+    """单个指标的流式分布统计"""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "histogram", "quantiles")
+
+    def __init__(self, histogram: FixedHistogram, quantiles: Sequence[float] = QUANTILES):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.histogram = histogram
+        self.quantiles = [P2Quantile(p) for p in quantiles]
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.histogram.add(value)
+        for estimator in self.quantiles:
+            estimator.add(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        variance = self.m2 / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "variance": variance,
+            "std": math.sqrt(variance),
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {quantile_label(q.p): q.value() for q in self.quantiles},
+            "histogram": self.histogram.to_dict()
+        }
+
+
+class RoundDistributions:
+    """逐轮RTP、派奖金额、奖池金额和玩家数的分布统计"""
+
+    METRICS = ("rtp", "payout", "jackpot", "players")
+
+    __slots__ = METRICS
+
+    def __init__(self, players_range: Tuple[int, int]):
+        self.rtp = DistributionEstimator(FixedHistogram(*RTP_HISTOGRAM_RANGE, RTP_HISTOGRAM_BINS))
+        self.payout = DistributionEstimator(FixedHistogram(*AMOUNT_HISTOGRAM_RANGE, AMOUNT_HISTOGRAM_BINS, log=True))
+        self.jackpot = DistributionEstimator(FixedHistogram(*AMOUNT_HISTOGRAM_RANGE, AMOUNT_HISTOGRAM_BINS, log=True))
+
+        # 玩家数为整数：范围不大时每个取值一箱
+        low, high = players_range
+        span = high - low + 1
+        self.players = DistributionEstimator(
+            FixedHistogram(low, high + 1, span if span <= PLAYERS_HISTOGRAM_MAX_BINS else PLAYERS_HISTOGRAM_MAX_BINS)
+        )
+
+    def add(self, round_result: RoundResult):
+        self.rtp.add(round_result.rtp)
+        self.payout.add(round_result.total_payout)
+        self.jackpot.add(round_result.jackpot_amount)
+        self.players.add(round_result.players_count)
+
+    def to_dict(self, metrics: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        return {metric: getattr(self, metric).to_dict() for metric in (metrics or self.METRICS)}
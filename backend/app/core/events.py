@@ -0,0 +1,134 @@
+"""
+模拟进度事件推送
+
+模拟线程每隔若干轮发布一次增量进度事件，事件只序列化一次，
+再分发给该模拟的所有订阅者（SSE / WebSocket），多个观看者不增加计算量。
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Dict, NamedTuple, Optional, Set
+
+from .config import settings
+
+
+class ServerEvent(NamedTuple):
+    """已序列化的事件（event: 事件类型，data: JSON字符串，id: 事件ID，进度事件为已推送到的轮次）"""
+    event: str
+    data: str
+    id: Optional[str] = None
+
+
+def make_event(event: str, data: Dict[str, Any], event_id: Optional[Any] = None) -> ServerEvent:
+    """构建事件（序列化为JSON）"""
+    return ServerEvent(event, json.dumps(data, ensure_ascii=False, default=str),
+                       str(event_id) if event_id is not None else None)
+
+
+def format_sse(message: ServerEvent) -> str:
+    """格式化为 Server-Sent Events 文本（带ID时浏览器重连会通过 Last-Event-ID 带回）"""
+    if message.id is not None:
+        return f"id: {message.id}\nevent: {message.event}\ndata: {message.data}\n\n"
+    return f"event: {message.event}\ndata: {message.data}\n\n"
+
+
+# 订阅者队列溢出后放入的标记：消费者应重新发送一次完整快照
+RESYNC = ServerEvent("resync", "{}")
+# 事件流结束标记
+END_OF_STREAM = ServerEvent("end", "{}")
+
+
+class Subscription:
+    """单个订阅者（绑定到订阅时所在的事件循环）"""
+
+    __slots__ = ("simulation_id", "loop", "queue", "max_queue")
+
+    def __init__(self, simulation_id: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.simulation_id = simulation_id
+        self.loop = loop
+        self.max_queue = max_queue
+        # 队列本身不限长，由 _put 控制积压（结束标记不能被丢弃）
+        self.queue: "asyncio.Queue[ServerEvent]" = asyncio.Queue()
+
+    def push(self, message: ServerEvent) -> bool:
+        """从任意线程投递事件，事件循环已关闭时返回False"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+            return True
+        except RuntimeError:
+            return False
+
+    def _put(self, message: ServerEvent):
+        # 消费过慢时丢弃积压的事件，改为通知消费者重新同步
+        if message is not END_OF_STREAM and self.queue.qsize() >= self.max_queue:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ServerEvent]:
+        """等待下一个事件，超时返回None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SimulationEventHub:
+    """按模拟ID分发事件的发布/订阅中心（线程安全）"""
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, simulation_id: str) -> Subscription:
+        """订阅模拟事件（需在事件循环中调用）"""
+        subscription = Subscription(simulation_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers[simulation_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """取消订阅"""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.simulation_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.simulation_id]
+
+    def has_subscribers(self, simulation_id: str) -> bool:
+        """是否有订阅者（没有订阅者时发布方可跳过构建事件）"""
+        with self._lock:
+            return bool(self._subscribers.get(simulation_id))
+
+    def subscriber_count(self, simulation_id: Optional[str] = None) -> int:
+        """订阅者数量"""
+        with self._lock:
+            if simulation_id is not None:
+                return len(self._subscribers.get(simulation_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, simulation_id: str, message: ServerEvent):
+        """发布已序列化的事件"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(simulation_id, ()))
+        for subscription in subscribers:
+            if not subscription.push(message):
+                self.unsubscribe(subscription)
+
+    def close(self, simulation_id: str, message: Optional[ServerEvent] = None):
+        """发布最终事件并结束该模拟的所有订阅"""
+        with self._lock:
+            subscribers = self._subscribers.pop(simulation_id, set())
+        for subscription in subscribers:
+            if message is not None:
+                subscription.push(message)
+            subscription.push(END_OF_STREAM)
+
+
+# 全局事件中心实例
+event_hub = SimulationEventHub(settings.PROGRESS_EVENT_QUEUE_SIZE)
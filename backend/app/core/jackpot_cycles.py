@@ -0,0 +1,176 @@
+"""
+奖池周期追踪
+
+一个奖池周期从奖池重置（或模拟开始）的那一轮开始，到头奖中出的那一轮结束：
+- 第一阶段：销售方返还期间，直到累计返还达到初始奖池（见 _apply_ticket 的分阶段逻辑）
+- 第二阶段：返还完成后直到头奖中出
+每个已结束的周期只记录四个数（开始轮次、中出轮次、返还完成轮次、奖池峰值），
+保存在紧凑数组中，统计时不需要轮次结果。
+NumPy 只在生成统计时导入。
+"""
+
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .estimators import quantile_label
+
+
+# 周期长度直方图的最大箱数
+CYCLE_HISTOGRAM_MAX_BINS = 50
+# 分析结果中保留的最近周期数
+RECENT_CYCLES = 100
+# 周期长度分位数
+CYCLE_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+class JackpotCycleTracker:
+    """
+    奖池周期记录
+
+    奖池峰值为周期内各轮结束时和头奖派奖前奖池金额的最大值。
+    返还完成轮次为 -1 表示周期结束时返还尚未完成；初始奖池为0时没有返还阶段，
+    记为周期开始的前一轮（第一阶段时长为0）。
+    """
+
+    __slots__ = ("initial_pool", "starts", "hits", "return_rounds", "peaks",
+                 "current_start", "current_return_round", "current_peak")
+
+    def __init__(self, initial_pool: float):
+        self.initial_pool = initial_pool
+        self.starts = array("q")
+        self.hits = array("q")
+        self.return_rounds = array("q")
+        self.peaks = array("d")
+        self._start_cycle(1)
+
+    def return_completed(self, round_number: int):
+        """销售方返还在本轮完成"""
+        if self.current_return_round < 0:
+            self.current_return_round = round_number
+
+    def observe_pool(self, pool: float):
+        """记录一轮结束时的奖池金额"""
+        if pool > self.current_peak:
+            self.current_peak = pool
+
+    def hit(self, round_number: int, pool: float):
+        """头奖在本轮中出（pool 为派奖前的奖池金额），结束当前周期"""
+        self.observe_pool(pool)
+        self.starts.append(self.current_start)
+        self.hits.append(round_number)
+        self.return_rounds.append(self.current_return_round)
+        self.peaks.append(self.current_peak)
+
+        self._start_cycle(round_number + 1)
+
+    def _start_cycle(self, start_round: int):
+        self.current_start = start_round
+        self.current_return_round = -1 if self.initial_pool > 0 else start_round - 1
+        self.current_peak = self.initial_pool
+
+    @property
+    def completed_cycles(self) -> int:
+        return len(self.hits)
+
+    def _cycle(self, index: int) -> Dict[str, Any]:
+        return_round = self.return_rounds[index]
+        return {
+            "start_round": self.starts[index],
+            "hit_round": self.hits[index],
+            "length": self.hits[index] - self.starts[index] + 1,
+            "return_completed_round": return_round if return_round >= 0 else None,
+            "peak_pool": self.peaks[index]
+        }
+
+    def summary(self, current_round: int) -> Dict[str, Any]:
+        """
+        周期统计
+
+        Args:
+            current_round: 已完成的轮数（用于未结束周期的阶段时长）
+        """
+        import numpy as np
+
+        starts = np.frombuffer(self.starts, dtype=np.int64) if len(self.starts) else np.zeros(0, dtype=np.int64)
+        hits = np.frombuffer(self.hits, dtype=np.int64) if len(self.hits) else np.zeros(0, dtype=np.int64)
+        returns = np.frombuffer(self.return_rounds, dtype=np.int64) if len(self.return_rounds) else np.zeros(0, dtype=np.int64)
+        peaks = np.frombuffer(self.peaks, dtype=np.float64) if len(self.peaks) else np.zeros(0)
+
+        lengths = hits - starts + 1
+        # 第一阶段时长：返还完成前（含完成那一轮）；未完成时整个周期都在第一阶段
+        phase_1 = np.where(returns >= 0, returns - starts + 1, lengths)
+        phase_2 = lengths - phase_1
+
+        # 未结束的周期
+        open_rounds = max(0, current_round - self.current_start + 1)
+        if self.current_return_round >= 0:
+            open_phase_1 = self.current_return_round - self.current_start + 1
+        else:
+            open_phase_1 = open_rounds
+        open_phase_2 = open_rounds - open_phase_1
+
+        total_phase_1 = int(phase_1.sum()) + open_phase_1
+        total_phase_2 = int(phase_2.sum()) + open_phase_2
+        tracked_rounds = total_phase_1 + total_phase_2
+
+        return {
+            "completed_cycles": int(len(lengths)),
+            "cycle_length": _length_distribution(lengths),
+            "peak_pool": {
+                "mean": float(peaks.mean()) if len(peaks) else None,
+                "max": float(peaks.max()) if len(peaks) else None,
+                "quantiles": _quantiles(peaks)
+            },
+            "time_in_phase": {
+                "return_phase_rounds": total_phase_1,
+                "post_return_rounds": total_phase_2,
+                "return_phase_fraction": (total_phase_1 / tracked_rounds) if tracked_rounds else None,
+                "mean_return_phase_rounds": float(phase_1.mean()) if len(phase_1) else None,
+                "mean_post_return_rounds": float(phase_2.mean()) if len(phase_2) else None,
+                "cycles_without_return_completion": int((returns < 0).sum())
+            },
+            "current_cycle": {
+                "start_round": self.current_start,
+                "rounds": open_rounds,
+                "return_completed_round": self.current_return_round if self.current_return_round >= 0 else None,
+                "peak_pool": self.current_peak
+            },
+            "recent_cycles": [
+                self._cycle(i) for i in range(max(0, len(self.hits) - RECENT_CYCLES), len(self.hits))
+            ]
+        }
+
+
+def _quantiles(values: "np.ndarray") -> Dict[str, Optional[float]]:
+    if not len(values):
+        return {quantile_label(p): None for p in CYCLE_QUANTILES}
+    import numpy as np
+
+    computed = np.quantile(values, CYCLE_QUANTILES)
+    return {quantile_label(p): float(v) for p, v in zip(CYCLE_QUANTILES, computed)}
+
+
+def _length_distribution(lengths: "np.ndarray") -> Dict[str, Any]:
+    """周期长度分布（整数分箱直方图 + 分位数）"""
+    if not len(lengths):
+        return {"mean": None, "min": None, "max": None, "quantiles": _quantiles(lengths),
+                "histogram": {"edges": [], "counts": []}}
+
+    longest = int(lengths.max())
+    bins = min(longest, CYCLE_HISTOGRAM_MAX_BINS)
+    # 整数边界：每箱宽度相同，覆盖 1 ~ 最长周期
+    width = -(-longest // bins)
+    edges: List[int] = [1 + i * width for i in range(bins + 1)]
+    import numpy as np
+
+    counts = np.bincount((lengths - 1) // width, minlength=bins)[:bins]
+    return {
+        "mean": float(lengths.mean()),
+        "min": int(lengths.min()),
+        "max": longest,
+        "quantiles": _quantiles(lengths),
+        "histogram": {"edges": edges, "counts": counts.tolist()}
+    }
@@ -0,0 +1,166 @@
+"""
+Prometheus 指标
+
+只实现 /metrics 需要的最小子集（计数器、直方图和文本格式输出），不依赖 prometheus_client：
+- 计数器和直方图在事件发生时更新（一次加锁的加法）
+- 模拟吞吐、运行数、结果内存等状态类指标在抓取时从运行状态计算（见 api.metrics），
+  不在模拟热循环中增加任何开销
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# 请求延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 未匹配到路由的请求使用的路由标签（避免按原始路径产生大量标签值）
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels) + "}"
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """按标签值累计的计数器"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{format_labels(list(zip(self.labelnames, labelvalues)))} {format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """按标签值分组的直方图（桶计数不累积存储，输出时再累加）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # 标签值 -> [各桶计数..., 超出计数, 总和]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return sum(series[:-1]) if series else 0
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labelvalues, list(series)) for labelvalues, series in self._series.items())
+        for labelvalues, series in snapshot:
+            labels = list(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(labels + [('le', format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(series[-1])}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+def gauge_lines(name: str, documentation: str,
+                samples: Iterable[Tuple[Sequence[Tuple[str, str]], float]]) -> List[str]:
+    """抓取时计算的仪表盘指标"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+    return lines
+
+
+# 事件类指标（全局）
+request_latency = Histogram(
+    "numerical_http_request_duration_seconds", "HTTP请求处理耗时（按路由模板）",
+    ("method", "route")
+)
+db_fallbacks = Counter(
+    "numerical_db_fallback_total", "数据库不可用或出错时回退到文件存储的次数",
+    ("operation",)
+)
+
+
+def route_template(scope) -> str:
+    """
+    请求匹配到的路由模板（如 /api/v1/simulation/progress/{simulation_id}）
+
+    取匹配路由的 path_format；包含的路由器中的路由只有相对于路由器前缀的 path_format，
+    前缀为请求路径中最短的、其余部分能被该路由完整匹配的开头几段。
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    path_regex = getattr(route, "path_regex", None)
+    if path_format is None or path_regex is None:
+        return UNMATCHED_ROUTE
+
+    path = scope["path"]
+    splits = [0] + [index for index, char in enumerate(path) if char == "/" and index] + [len(path)]
+    for split in splits:
+        if path_regex.match(path[split:]):
+            return path[:split] + path_format
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    记录每个HTTP请求的耗时（纯 ASGI 中间件，不包装请求和响应对象）
+
+    路由标签取匹配到的路由模板（见 route_template），流式响应按整个响应发送完成的时间计。
+    """
+
+    def __init__(self, app, histogram: Optional[Histogram] = None):
+        self.app = app
+        self.histogram = histogram or request_latency
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.histogram.observe(time.perf_counter() - started, scope["method"], route_template(scope))
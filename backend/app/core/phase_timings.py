@@ -0,0 +1,107 @@
+"""
+引擎各阶段耗时
+
+simulate_round 逐个玩家、逐注流式处理，各阶段交替执行。每隔 sample_interval 轮
+（含第一轮）改用逐注计时的循环，在循环内累计各阶段耗时；其余轮次不做逐注计时：
+- ticket_generation: 随机数（玩家数、投注数、开奖号码、玩家选号）
+- match_counting: 选号与开奖号码的匹配和中奖人数统计
+- fund_flow: 每注的奖池注入、销售方返还和销售金额
+- prize_resolution: 各奖级奖金计算（含头奖奖池分配）
+- result_construction: 奖级统计和轮次结果对象
+用于判断一个游戏的模拟时间主要花在随机数生成还是统计记账上。
+逐注计时本身有开销，各阶段耗时按采样轮次统计，看占比和每注耗时，而不是绝对时长。
+"""
+
+from typing import Any, Dict
+
+
+PHASES = ("ticket_generation", "match_counting", "fund_flow", "prize_resolution", "result_construction")
+
+# 每多少轮采样一轮做逐注计时
+SAMPLE_INTERVAL = 16
+
+
+class PhaseTimings:
+    """各阶段累计耗时（秒，time.perf_counter）"""
+
+    __slots__ = ("sample_interval", "rounds", "tickets", "started", "updated",
+                 "sampled_rounds", "sampled_tickets") + PHASES
+
+    def __init__(self, sample_interval: int = SAMPLE_INTERVAL):
+        self.sample_interval = max(1, int(sample_interval))
+        self.rounds = 0
+        self.tickets = 0
+        self.started = 0.0  # 第一轮开始和最近一轮结束的时刻，用于计算吞吐
+        self.updated = 0.0
+        self.sampled_rounds = 0
+        self.sampled_tickets = 0
+        self.ticket_generation = 0.0
+        self.match_counting = 0.0
+        self.fund_flow = 0.0
+        self.prize_resolution = 0.0
+        self.result_construction = 0.0
+
+    def should_sample(self) -> bool:
+        """下一轮是否做逐注计时"""
+        return self.rounds % self.sample_interval == 0
+
+    def add_round(self, tickets: int, started: float, ended: float):
+        """记录一轮（每轮调用，用于吞吐）"""
+        if not self.rounds:
+            self.started = started
+        self.updated = ended
+        self.rounds += 1
+        self.tickets += tickets
+
+    def add_sample(self, tickets: int, ticket_generation: float, match_counting: float,
+                   fund_flow: float, prize_resolution: float, result_construction: float):
+        """记录一个采样轮次的各阶段耗时"""
+        self.sampled_rounds += 1
+        self.sampled_tickets += tickets
+        self.ticket_generation += ticket_generation
+        self.match_counting += match_counting
+        self.fund_flow += fund_flow
+        self.prize_resolution += prize_resolution
+        self.result_construction += result_construction
+
+    @property
+    def total(self) -> float:
+        return sum(getattr(self, phase) for phase in PHASES)
+
+    @property
+    def wall_seconds(self) -> float:
+        """第一轮开始到最近一轮结束的时间（包含轮次之间的记录和暂停）"""
+        return self.updated - self.started
+
+    def throughput(self):
+        """(每秒轮数, 每秒投注数)，按 wall_seconds 计算"""
+        wall = self.wall_seconds
+        if wall <= 0:
+            return 0.0, 0.0
+        return self.rounds / wall, self.tickets / wall
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        各阶段耗时、占比和每注耗时（纳秒），按采样轮次统计
+
+        rng_share 为随机数生成的占比：大于0.5说明受随机数生成限制，否则主要是统计记账开销。
+        """
+        total = self.total
+        phases = {}
+        for phase in PHASES:
+            seconds = getattr(self, phase)
+            phases[phase] = {
+                "seconds": seconds,
+                "share": seconds / total if total > 0 else 0.0,
+                "ns_per_ticket": seconds * 1e9 / self.sampled_tickets if self.sampled_tickets else 0.0
+            }
+        return {
+            "rounds": self.rounds,
+            "tickets": self.tickets,
+            "sampled_rounds": self.sampled_rounds,
+            "sampled_tickets": self.sampled_tickets,
+            "total_seconds": total,
+            "wall_seconds": self.wall_seconds,
+            "phases": phases,
+            "rng_share": phases["ticket_generation"]["share"]
+        }
@@ -0,0 +1,156 @@
+"""
+分片模拟
+
+把一次模拟拆成若干个独立分片并行运行，再合并为一个结果：
+- 每个分片是一次完整的独立模拟（奖池从初始金额开始），随机种子由基础种子和分片序号派生
+- 只有一个分片时直接使用基础种子，结果与单次模拟（API 启动的模拟）完全一致
+- 合并时汇总由各分片的汇总累计（SummaryAccumulator）按顺序合并：
+  头奖中出次数为各分片之和，最终奖池为最后一个分片的奖池；轮次明细由调用方按分片顺序连续编号
+- 分片运行不保存轮次结果（引擎的 keep_round_results=False），需要明细时通过 on_round 回调逐轮流式处理；
+  分片的内存占用与轮数无关
+- 分布式运行时分片只返回汇总累计的JSON形式，不传输轮次结果
+"""
+
+import hashlib
+import random
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..models.game_config import GameConfiguration
+from ..models.simulation_result import RoundResult, SimulationResult, SimulationSummary
+from .aggregation import SummaryAccumulator, build_summary
+from .compiled_game import parse_game_config
+from .simulation_engine import UniversalSimulationEngine
+
+
+# 分片运行时每多少轮回调一次进度
+SHARD_PROGRESS_INTERVAL = 1000
+
+
+def derive_seed(base_seed: int, shard_index: int) -> int:
+    """由基础种子和分片序号派生分片种子（64位，与运行平台无关）"""
+    digest = hashlib.sha256(f"{base_seed}:{shard_index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def plan_shards(rounds: int, shards: int, seed: Optional[int]) -> List[Dict[str, int]]:
+    """
+    拆分轮数并分配种子
+
+    Returns:
+        每个分片的 {"index", "rounds", "seed"}（轮数尽量平均，不产生空分片）
+    """
+    shards = max(1, min(int(shards), rounds))
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 63)
+    size, remainder = divmod(rounds, shards)
+    return [
+        {
+            "index": index,
+            "rounds": size + (1 if index < remainder else 0),
+            "seed": seed if shards == 1 else derive_seed(seed, index)
+        }
+        for index in range(shards)
+    ]
+
+
+def shard_config(config: Dict[str, Any], rounds: int, seed: int) -> GameConfiguration:
+    """分片的游戏配置（覆盖轮数和种子）"""
+    simulation_config = dict(config["simulation_config"], rounds=rounds, seed=seed)
+    return parse_game_config({"game_rules": config["game_rules"], "simulation_config": simulation_config})
+
+
+def _run_engine(config: Dict[str, Any], rounds: int, seed: int,
+                progress: Optional[Callable[[int], None]],
+                on_round: Optional[Callable[[RoundResult], None]] = None) -> UniversalSimulationEngine:
+    engine = UniversalSimulationEngine(shard_config(config, rounds, seed), keep_round_results=False)
+    simulate_round = engine.simulate_round
+    record_round = engine.record_round
+    for round_num in range(1, rounds + 1):
+        engine.current_round = round_num
+        round_result = simulate_round(round_num)
+        record_round(round_result)
+        if on_round is not None:
+            on_round(round_result)
+        if progress is not None and round_num % SHARD_PROGRESS_INTERVAL == 0:
+            progress(SHARD_PROGRESS_INTERVAL)
+    if progress is not None and rounds % SHARD_PROGRESS_INTERVAL:
+        progress(rounds % SHARD_PROGRESS_INTERVAL)
+    return engine
+
+
+def run_shard(config: Dict[str, Any], rounds: int, seed: int,
+              progress: Optional[Callable[[int], None]] = None,
+              on_round: Optional[Callable[[RoundResult], None]] = None) -> Dict[str, Any]:
+    """
+    同步运行一个分片
+
+    Args:
+        config: 游戏配置（GameConfiguration 的JSON形式，可在进程和主机之间传递）
+        progress: progress(本次新完成的轮数)，每 SHARD_PROGRESS_INTERVAL 轮回调一次
+        on_round: on_round(轮次结果)，每轮回调一次（轮次号从1开始，合并时由调用方加偏移）
+
+    Returns:
+        {"rounds": 分片轮数, "summary": 分片的汇总累计}
+    """
+    engine = _run_engine(config, rounds, seed, progress, on_round)
+    return {"rounds": rounds, "summary": engine.totals}
+
+
+def _build_summary(game_config: GameConfiguration, accumulators: Sequence[SummaryAccumulator]) -> Optional[SimulationSummary]:
+    merged = SummaryAccumulator()
+    for accumulator in accumulators:
+        merged.merge(accumulator)
+    return build_summary(
+        merged,
+        [(level.level, level.name) for level in game_config.game_rules.prize_levels],
+        initial_jackpot=game_config.game_rules.jackpot.initial_amount
+    )
+
+
+def merge_shards(config: Dict[str, Any], shard_results: Sequence[Dict[str, Any]],
+                 simulation_id: str, start_time: datetime) -> SimulationResult:
+    """
+    按分片顺序合并分片结果
+
+    汇总由各分片的汇总累计合并；结果不包含轮次结果（明细由 run_shard 的 on_round 流式输出）。
+    """
+    game_config = GameConfiguration.model_validate(config)
+    end_time = datetime.now()
+    return SimulationResult(
+        simulation_id=simulation_id,
+        game_config_id=game_config.id,
+        start_time=start_time,
+        end_time=end_time,
+        duration=(end_time - start_time).total_seconds(),
+        status="completed",
+        game_name=game_config.game_rules.name,
+        simulation_rounds=sum(shard["rounds"] for shard in shard_results),
+        round_results=[],
+        summary=_build_summary(game_config, [shard["summary"] for shard in shard_results])
+    )
+
+
+def run_partial_shard(config: Dict[str, Any], rounds: int, seed: int,
+                      progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+    """运行一个分片，只返回汇总累计的JSON形式（可合并的部分汇总）"""
+    return _run_engine(config, rounds, seed, progress).totals.to_dict()
+
+
+def merge_partials(config: Dict[str, Any], partials: Sequence[Dict[str, Any]]) -> Optional[SimulationSummary]:
+    """按分片顺序合并部分汇总为模拟汇总"""
+    return _build_summary(
+        GameConfiguration.model_validate(config),
+        [SummaryAccumulator.from_dict(partial) for partial in partials]
+    )
+
+
+def validate_partial(partial: Dict[str, Any], rounds: int):
+    """
+    检查部分汇总的结构和轮数
+
+    Raises:
+        ValueError: 结构无效或轮数与分片不一致
+    """
+    if SummaryAccumulator.from_dict(partial).rounds != rounds:
+        raise ValueError("部分汇总的轮数与分片不一致")
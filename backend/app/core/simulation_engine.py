@@ -1,33 +1,63 @@
 """通用数值模拟引擎"""
 
 import random
-import numpy as np
 import asyncio
-from typing import Dict, Set
+import time
+from typing import Any, Dict, List, Set
 from collections import deque, defaultdict
 import uuid
 from datetime import datetime
 
 from ..models.game_config import GameConfiguration
+from .compiled_game import compile_game
+from .aggregation import SummaryAccumulator, reduce_rounds, build_summary
+from .estimators import RoundDistributions
+from .jackpot_cycles import JackpotCycleTracker
+from .phase_timings import PhaseTimings
 from ..models.simulation_result import (
     SimulationResult, SimulationSummary, RoundResult,
     PrizeStatistics, SimulationProgress
 )
 
 
+# 引擎版本：改变模拟结果的逻辑调整时需要递增（用于结果缓存失效）
+ENGINE_VERSION = "1.2.0"
+
+# 实时统计中保留的最近累积RTP点数
+RECENT_RTP_POINTS = 20
+
+
+def chart_delta(round_results, since_round: int) -> Dict[str, list]:
+    """第 since_round 轮之后新增的图表数据点（from_round / to_round 为新增轮次范围）"""
+    since_round = max(0, min(since_round, len(round_results)))
+    new_rounds = round_results[since_round:]
+    to_round = since_round + len(new_rounds)
+    return {
+        "from_round": since_round + 1,
+        "to_round": to_round,
+        "rtp_trend": [r.rtp for r in new_rounds],
+        "jackpot_trend": [r.jackpot_amount for r in new_rounds],
+        "round_labels": list(range(since_round + 1, to_round + 1))
+    }
+
+
 class UniversalSimulationEngine:
     """通用模拟引擎"""
     
-    def __init__(self, game_config: GameConfiguration):
+    def __init__(self, game_config: GameConfiguration, keep_round_results: bool = True):
         """
         初始化模拟引擎
         
         Args:
             game_config: 游戏配置
+            keep_round_results: 是否保存轮次结果（分片运行只需要汇总累计，轮次结果由调用方流式处理）
         """
         self.game_config = game_config
         self.game_rules = game_config.game_rules
         self.sim_config = game_config.simulation_config
+
+        # 编译后的配置（热循环只访问纯Python数值）
+        self.compiled = compile_game(game_config)
         
         # 模拟状态
         self.simulation_id = str(uuid.uuid4())
@@ -37,12 +67,12 @@ class UniversalSimulationEngine:
         self.should_stop = False
         
         # 奖池和资金池
-        self.jackpot_pool = self.game_rules.jackpot.initial_amount
+        self.jackpot_pool = self.compiled.initial_jackpot
         self.funding_pool = 0.0
 
         # 新增：累计返还金额追踪
         self.total_returned_amount = 0.0  # 累计返还给销售方的金额（补偿垫付的初始奖池）
-        self.initial_jackpot_amount = self.game_rules.jackpot.initial_amount  # 保存初始奖池金额
+        self.initial_jackpot_amount = self.compiled.initial_jackpot  # 保存初始奖池金额
 
         # 新增：销售金额统计
         self.total_sales_amount = 0.0  # 累计销售金额（除去奖池注入和销售方返还的部分）
@@ -54,87 +84,77 @@ class UniversalSimulationEngine:
         self.prize_map = self._build_prize_map()
         
         # 结果存储
+        self.keep_round_results = keep_round_results
         self.round_results = []
         self.detailed_records = deque(maxlen=10000)  # 限制内存使用
         
         # 进度回调
         self.progress_callback = None
+
+        # 增量统计与进度事件（每 event_interval 轮调用一次 event_callback）
+        self.totals = SummaryAccumulator()
+        self.recent_rtps = deque(maxlen=RECENT_RTP_POINTS)
+        self.distributions = RoundDistributions(self.compiled.players_range)
+        self.jackpot_cycles = JackpotCycleTracker(self.compiled.initial_jackpot)
+        self.phase_timings = PhaseTimings()  # 各阶段耗时（只统计本进程运行的轮次）
+        self.event_callback = None
+        self.event_interval = 0
+        self._last_event_round = 0
+
+        # 检查点（见 set_checkpoint_callback）
+        self.checkpoint_callback = None
+        self.checkpoint_interval = 0
+        self.checkpoint_seconds = 0.0
+        self.checkpoint_rounds = 0  # 已写入检查点的轮数
+        self._last_checkpoint_time = 0.0
         
-        # 设置随机种子
-        if self.sim_config.seed:
-            random.seed(self.sim_config.seed)
-            np.random.seed(self.sim_config.seed)
+        # 引擎独立的随机数生成器（并发模拟互不干扰，相同种子结果可复现）
+        self.rng = random.Random(self.sim_config.seed)
     
     def _build_prize_map(self) -> Dict[int, float]:
-        """构建奖级映射"""
-        prize_map = {}
-        for prize_level in self.game_rules.prize_levels:
-            if prize_level.fixed_prize is not None:
-                prize_map[prize_level.match_condition] = prize_level.fixed_prize
-            else:
-                # 奖池分配类型，运行时计算
-                prize_map[prize_level.match_condition] = 0.0
-        return prize_map
+        """构建奖级映射（固定奖金，奖池分配类型为0，运行时计算）"""
+        return dict(self.compiled.prize_map)
     
     def generate_winning_numbers(self) -> Set[int]:
         """生成开奖号码"""
-        min_num, max_num = self.game_rules.number_range
-        return set(random.sample(range(min_num, max_num + 1), self.game_rules.selection_count))
+        return set(self.rng.sample(self.compiled.number_pool, self.compiled.selection_count))
     
     def generate_player_numbers(self) -> Set[int]:
         """生成玩家选号"""
-        min_num, max_num = self.game_rules.number_range
-        return set(random.sample(range(min_num, max_num + 1), self.game_rules.selection_count))
+        return set(self.rng.sample(self.compiled.number_pool, self.compiled.selection_count))
     
     def check_matches(self, player_numbers: Set[int], winning_numbers: Set[int]) -> int:
         """检查匹配数量"""
         return len(player_numbers & winning_numbers)
     
-    def process_ticket_contribution(self, ticket_price: float) -> Dict[str, float]:
+    def _apply_ticket(self, ticket_price: float):
         """
-        处理单注投注的资金分配
-        返回资金分配详情
+        处理单注投注的资金分配（热循环使用，不构建字典）
 
-        资金分配逻辑：
-        第一阶段：总下注金额 = 奖池注入 + 销售方返还 + 销售金额
-        第二阶段：总下注金额 = 奖池注入 + 销售金额
+        Returns:
+            (奖池注入, 销售方返还, 销售金额, 当前注入比例)
         """
-        if not self.game_rules.jackpot.enabled:
+        compiled = self.compiled
+        if not compiled.jackpot_enabled:
             # 如果未启用奖池，全部作为销售金额
-            sales_amount = ticket_price
-            self.total_sales_amount += sales_amount
-            return {
-                'jackpot_contribution': 0.0,
-                'seller_return': 0.0,
-                'sales_amount': sales_amount,
-                'total_returned': self.total_returned_amount,
-                'total_sales': self.total_sales_amount,
-                'current_contribution_rate': 0.0,
-                'return_phase_completed': True
-            }
-
-        return_rate = self.game_rules.jackpot.return_rate
+            self.total_sales_amount += ticket_price
+            return 0.0, 0.0, ticket_price, 0.0
 
         # 根据当前阶段选择奖池注入比例
         if self.total_returned_amount < self.initial_jackpot_amount:
-            # 第一阶段：销售方返还期间
-            contribution_rate = self.game_rules.jackpot.contribution_rate
-        else:
-            # 第二阶段：销售方返还完成后
-            contribution_rate = self.game_rules.jackpot.post_return_contribution_rate
-
-        # 计算奖池注入金额
-        jackpot_contribution = ticket_price * contribution_rate
-
-        # 计算销售方返还金额
-        if self.total_returned_amount < self.initial_jackpot_amount:
-            # 第一阶段：还需要返还给销售方
-            potential_return = ticket_price * return_rate
+            # 第一阶段：销售方返还期间，还需要返还给销售方
+            contribution_rate = compiled.contribution_rate
+            jackpot_contribution = ticket_price * contribution_rate
+            potential_return = ticket_price * compiled.return_rate
             remaining_to_return = self.initial_jackpot_amount - self.total_returned_amount
             actual_return = min(potential_return, remaining_to_return)
             self.total_returned_amount += actual_return
+            if self.total_returned_amount >= self.initial_jackpot_amount:
+                self.jackpot_cycles.return_completed(self.current_round)
         else:
-            # 第二阶段：不再返还给销售方
+            # 第二阶段：销售方返还完成后，不再返还给销售方
+            contribution_rate = compiled.post_return_contribution_rate
+            jackpot_contribution = ticket_price * contribution_rate
             actual_return = 0.0
 
         # 计算销售金额（剩余部分）
@@ -144,6 +164,19 @@ class UniversalSimulationEngine:
         # 奖池注入
         self.jackpot_pool += jackpot_contribution
 
+        return jackpot_contribution, actual_return, sales_amount, contribution_rate
+
+    def process_ticket_contribution(self, ticket_price: float) -> Dict[str, float]:
+        """
+        处理单注投注的资金分配
+        返回资金分配详情
+
+        资金分配逻辑：
+        第一阶段：总下注金额 = 奖池注入 + 销售方返还 + 销售金额
+        第二阶段：总下注金额 = 奖池注入 + 销售金额
+        """
+        jackpot_contribution, actual_return, sales_amount, contribution_rate = self._apply_ticket(ticket_price)
+
         return {
             'jackpot_contribution': jackpot_contribution,
             'seller_return': actual_return,
@@ -151,7 +184,8 @@ class UniversalSimulationEngine:
             'total_returned': self.total_returned_amount,
             'total_sales': self.total_sales_amount,
             'current_contribution_rate': contribution_rate,
-            'return_phase_completed': self.total_returned_amount >= self.initial_jackpot_amount
+            'return_phase_completed': (not self.compiled.jackpot_enabled) or
+                                      self.total_returned_amount >= self.initial_jackpot_amount
         }
     
     def calculate_prize(self, matches: int, winners_count: Dict[int, int]) -> float:
@@ -159,12 +193,9 @@ class UniversalSimulationEngine:
         if matches not in self.prize_map:
             return 0.0
 
-        # 查找对应的奖级配置
-        prize_level = None
-        for level in self.game_rules.prize_levels:
-            if level.match_condition == matches:
-                prize_level = level
-                break
+        # 查找对应的奖级配置（同一匹配数取第一个奖级）
+        by_match = self.compiled.prize_level_by_match
+        prize_level = by_match[matches] if 0 <= matches < len(by_match) else None
 
         if not prize_level:
             return 0.0
@@ -176,7 +207,7 @@ class UniversalSimulationEngine:
         # 头奖分配逻辑
         if prize_level.level == 1 and winners_count[matches] > 0:
             # 获取头奖固定奖金配置
-            jackpot_fixed_prize = self.game_rules.jackpot.jackpot_fixed_prize
+            jackpot_fixed_prize = self.compiled.jackpot_fixed_prize
 
             # 计算奖池分配部分
             if prize_level.prize_percentage is not None:
@@ -197,6 +228,9 @@ class UniversalSimulationEngine:
                 # 无固定奖金：只有奖池分配
                 final_prize = jackpot_share_per_winner
 
+            # 记录奖池周期（派奖前的奖池金额为周期峰值候选）
+            self.jackpot_cycles.hit(self.current_round, self.jackpot_pool)
+
             # 🎊 重要：头奖中出后，奖池重置为初始金额
             self.jackpot_pool = self.initial_jackpot_amount
 
@@ -224,57 +258,153 @@ class UniversalSimulationEngine:
 
         return 0.0
     
-    def simulate_round(self, round_number: int) -> RoundResult:
-        """模拟单轮游戏"""
-        # 生成本轮参数
-        players_count = random.randint(*self.sim_config.players_range)
-        
-        # 生成开奖号码
-        winning_numbers = self.generate_winning_numbers()
-        winning_list = sorted(list(winning_numbers))
-        
-        # 初始化统计
+    def _play_tickets(self, players_count: int, winning_numbers: Set[int]):
+        """
+        逐个玩家、逐注处理资金分配、生成选号并统计中奖（热循环，选号用完即弃）
+
+        Returns:
+            (总注数, 总投注金额, 各匹配数的中奖注数, 中奖玩家数)
+        """
+        compiled = self.compiled
+        randint = self.rng.randint
+        sample = self.rng.sample
+        number_pool = compiled.number_pool
+        selection_count = compiled.selection_count
+        min_bets, max_bets = compiled.bets_range
+        bet_amount = compiled.ticket_price
+        apply_ticket = self._apply_ticket
+        intersection = winning_numbers.intersection
+
         total_bets = 0
         total_bet_amount = 0.0
-        total_payout = 0.0
         total_seller_returns = 0.0  # 销售方返还总额
         total_sales_amount = 0.0    # 销售金额总额
         total_jackpot_contributions = 0.0  # 奖池注入总额
         winners_count = defaultdict(int)
-        winners_amount = defaultdict(float)
-
-        # 模拟每个玩家
-        round_winners_set = set()  # 记录本轮中奖的玩家ID，避免重复计算
+        round_winners_count = 0  # 本轮中奖玩家数（每个玩家只计一次）
 
         for player_id in range(players_count):
-            bets_count = random.randint(*self.sim_config.bets_range)
+            bets_count = randint(min_bets, max_bets)
             total_bets += bets_count
 
             player_won = False  # 标记该玩家是否中奖
 
             for bet_id in range(bets_count):
-                bet_amount = self.game_rules.ticket_price
                 total_bet_amount += bet_amount
 
                 # 处理资金分配
-                contribution_info = self.process_ticket_contribution(bet_amount)
-                total_seller_returns += contribution_info['seller_return']
-                total_sales_amount += contribution_info['sales_amount']
-                total_jackpot_contributions += contribution_info['jackpot_contribution']
+                jackpot_contribution, seller_return, sales_amount, _ = apply_ticket(bet_amount)
+                total_seller_returns += seller_return
+                total_sales_amount += sales_amount
+                total_jackpot_contributions += jackpot_contribution
 
-                # 生成玩家选号
-                player_numbers = self.generate_player_numbers()
-                matches = self.check_matches(player_numbers, winning_numbers)
+                # 生成玩家选号并检查匹配
+                matches = len(intersection(sample(number_pool, selection_count)))
 
                 # 统计中奖
                 if matches >= 2:  # 假设2个匹配以上才有奖
                     winners_count[matches] += 1
                     if not player_won:
                         player_won = True
-                        round_winners_set.add(player_id)
+                        round_winners_count += 1
+
+        return total_bets, total_bet_amount, winners_count, round_winners_count
+
+    def _play_tickets_timed(self, players_count: int, winning_numbers: Set[int]):
+        """
+        与 _play_tickets 相同，另外逐注累计各阶段耗时（只用于采样轮次）
+
+        Returns:
+            (总注数, 总投注金额, 各匹配数的中奖注数, 中奖玩家数,
+             (选号生成秒数, 匹配统计秒数, 资金分配秒数))
+        """
+        compiled = self.compiled
+        randint = self.rng.randint
+        sample = self.rng.sample
+        number_pool = compiled.number_pool
+        selection_count = compiled.selection_count
+        min_bets, max_bets = compiled.bets_range
+        bet_amount = compiled.ticket_price
+        apply_ticket = self._apply_ticket
+        intersection = winning_numbers.intersection
+        perf_counter = time.perf_counter
+
+        total_bets = 0
+        total_bet_amount = 0.0
+        total_seller_returns = 0.0
+        total_sales_amount = 0.0
+        total_jackpot_contributions = 0.0
+        winners_count = defaultdict(int)
+        round_winners_count = 0
+        ticket_generation = match_counting = fund_flow = 0.0
+
+        for player_id in range(players_count):
+            ta = perf_counter()
+            bets_count = randint(min_bets, max_bets)
+            total_bets += bets_count
+            player_won = False
+            tb = perf_counter()
+            ticket_generation += tb - ta
+
+            for bet_id in range(bets_count):
+                total_bet_amount += bet_amount
+                jackpot_contribution, seller_return, sales_amount, _ = apply_ticket(bet_amount)
+                total_seller_returns += seller_return
+                total_sales_amount += sales_amount
+                total_jackpot_contributions += jackpot_contribution
+                tc = perf_counter()
+                fund_flow += tc - tb
+
+                ticket = sample(number_pool, selection_count)
+                td = perf_counter()
+                ticket_generation += td - tc
+
+                matches = len(intersection(ticket))
+                if matches >= 2:
+                    winners_count[matches] += 1
+                    if not player_won:
+                        player_won = True
+                        round_winners_count += 1
+                tb = perf_counter()
+                match_counting += tb - td
+
+        return (total_bets, total_bet_amount, winners_count, round_winners_count,
+                (ticket_generation, match_counting, fund_flow))
+
+    def simulate_round(self, round_number: int) -> RoundResult:
+        """
+        模拟单轮游戏
+
+        逐个玩家、逐注生成选号并统计（不保存选号）。每隔 phase_timings.sample_interval 轮
+        改用逐注计时的循环记录各阶段耗时（见 phase_timings），两种循环的结果完全相同。
+        """
+        compiled = self.compiled
+        perf_counter = time.perf_counter
+        timings = self.phase_timings
+        timed = timings.should_sample()
 
-            # 这里不需要累计统计，因为会在汇总时计算
+        self.current_round = round_number
+        t0 = perf_counter()
+
+        # 生成本轮参数
+        players_count = self.rng.randint(*compiled.players_range)
         
+        # 生成开奖号码
+        winning_numbers = self.generate_winning_numbers()
+        winning_list = sorted(list(winning_numbers))
+
+        # 模拟每个玩家
+        if timed:
+            t1 = perf_counter()
+            total_bets, total_bet_amount, winners_count, round_winners_count, loop_phases = \
+                self._play_tickets_timed(players_count, winning_numbers)
+        else:
+            total_bets, total_bet_amount, winners_count, round_winners_count = \
+                self._play_tickets(players_count, winning_numbers)
+        total_payout = 0.0
+        winners_amount = defaultdict(float)
+        t2 = perf_counter()
+
         # 计算奖金
         for matches, count in winners_count.items():
             if count > 0:
@@ -282,33 +412,29 @@ class UniversalSimulationEngine:
                 total_prize = prize_per_winner * count
                 winners_amount[matches] = total_prize
                 total_payout += total_prize
+        t3 = perf_counter()
 
         # 计算RTP（只包含中奖奖金，销售方返还不计入RTP）
         rtp = (total_payout / total_bet_amount) if total_bet_amount > 0 else 0.0
         
         # 构建奖级统计
         prize_stats = []
-        for prize_level in self.game_rules.prize_levels:
+        for prize_level in compiled.prize_levels:
             matches = prize_level.match_condition
-            count = winners_count.get(matches, 0)
-            amount = winners_amount.get(matches, 0.0)
-            
-            # 简化概率计算，避免复杂的组合数计算导致卡顿
-            probability = 1.0 / (2 ** matches) if matches > 0 else 0.0  # 简化概率估算
             
+            # 简化概率估算（编译时预先计算），避免复杂的组合数计算导致卡顿
             prize_stats.append(PrizeStatistics(
                 level=prize_level.level,
                 name=prize_level.name,
-                winners_count=count,
-                total_amount=amount,
-                probability=probability
+                winners_count=winners_count.get(matches, 0),
+                total_amount=winners_amount.get(matches, 0.0),
+                probability=prize_level.probability
             ))
         
-        # 计算本轮中奖和未中奖人数
-        round_winners_count = len(round_winners_set)
+        # 计算本轮未中奖人数
         round_non_winners_count = players_count - round_winners_count
 
-        return RoundResult(
+        round_result = RoundResult(
             round_number=round_number,
             players_count=players_count,
             total_bets=total_bets,
@@ -321,6 +447,12 @@ class UniversalSimulationEngine:
             winners_count=round_winners_count,
             non_winners_count=round_non_winners_count
         )
+        t4 = perf_counter()
+        timings.add_round(total_bets, t0, t4)
+        if timed:
+            ticket_generation, match_counting, fund_flow = loop_phases
+            timings.add_sample(total_bets, t1 - t0 + ticket_generation, match_counting, fund_flow, t3 - t2, t4 - t3)
+        return round_result
     
     def _calculate_combinations(self, n: int, r: int) -> int:
         """计算组合数 C(n,r)"""
@@ -339,6 +471,237 @@ class UniversalSimulationEngine:
     def set_progress_callback(self, callback):
         """设置进度回调函数"""
         self.progress_callback = callback
+
+    def set_event_callback(self, callback, interval: int):
+        """
+        设置进度事件回调
+
+        Args:
+            callback: callback(engine, since_round)，since_round 为上次回调时已完成的轮数
+            interval: 每多少轮回调一次
+        """
+        self.event_callback = callback
+        self.event_interval = max(1, int(interval))
+
+    def record_round(self, round_result: RoundResult):
+        """保存一轮结果并更新增量统计，按间隔触发进度事件"""
+        if self.keep_round_results:
+            self.round_results.append(round_result)
+        totals = self.totals
+        totals.add(round_result)
+        totals.final_jackpot = self.jackpot_pool
+        totals.jackpot_hits = self.jackpot_hits_count
+        self.distributions.add(round_result)
+        self.jackpot_cycles.observe_pool(round_result.jackpot_amount)
+        if totals.bet_amount > 0:
+            self.recent_rtps.append(totals.payout / totals.bet_amount)
+
+        if self.event_callback is not None and totals.rounds % self.event_interval == 0:
+            self.flush_events()
+
+        if self.checkpoint_callback is not None and (
+            (self.checkpoint_interval and totals.rounds % self.checkpoint_interval == 0)
+            or (self.checkpoint_seconds and time.monotonic() - self._last_checkpoint_time >= self.checkpoint_seconds)
+        ):
+            self.flush_checkpoint()
+
+    def flush_events(self):
+        """立即为上次回调之后完成的轮次触发进度事件"""
+        since_round = self._last_event_round
+        completed_rounds = len(self.round_results)
+        if self.event_callback is None or completed_rounds <= since_round:
+            return
+        self._last_event_round = completed_rounds
+        self.event_callback(self, since_round)
+
+    def set_checkpoint_callback(self, callback, interval_rounds: int, interval_seconds: float = 0.0):
+        """
+        设置检查点回调
+
+        Args:
+            callback: callback(engine)，在引擎线程中调用，此时引擎状态是一致的
+            interval_rounds: 每多少轮保存一次（0 表示不按轮数）
+            interval_seconds: 距上次保存超过多少秒时保存（0 表示不按时间）
+        """
+        self.checkpoint_callback = callback
+        self.checkpoint_interval = max(0, int(interval_rounds))
+        self.checkpoint_seconds = max(0.0, float(interval_seconds))
+        self._last_checkpoint_time = time.monotonic()
+
+    def flush_checkpoint(self):
+        """上次检查点之后有新完成的轮次时立即保存检查点"""
+        if self.checkpoint_callback is None or len(self.round_results) <= self.checkpoint_rounds:
+            return
+        self._last_checkpoint_time = time.monotonic()
+        self.checkpoint_callback(self)
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        引擎的完整状态（不含轮次结果，轮次结果由检查点存储单独追加保存）
+
+        资金池、累计金额、随机数生成器状态和增量统计原样保存，
+        从检查点恢复后继续模拟的结果与不中断运行逐位一致。
+        """
+        return {
+            "engine_version": ENGINE_VERSION,
+            "simulation_id": self.simulation_id,
+            "game_config": self.game_config.model_dump(mode="json"),
+            "rounds": len(self.round_results),
+            "current_round": self.current_round,
+            "start_time": self.start_time,
+            "rng_state": self.rng.getstate(),
+            "jackpot_pool": self.jackpot_pool,
+            "funding_pool": self.funding_pool,
+            "total_returned_amount": self.total_returned_amount,
+            "total_sales_amount": self.total_sales_amount,
+            "jackpot_hits_count": self.jackpot_hits_count,
+            "totals": self.totals,
+            "recent_rtps": self.recent_rtps,
+            "distributions": self.distributions,
+            "jackpot_cycles": self.jackpot_cycles
+        }
+
+    @classmethod
+    def from_checkpoint(cls, state: Dict[str, Any], round_results: List[RoundResult]) -> "UniversalSimulationEngine":
+        """
+        从检查点恢复引擎
+
+        Raises:
+            ValueError: 检查点由不同版本的引擎生成，或轮次结果与状态不一致
+        """
+        if state["engine_version"] != ENGINE_VERSION:
+            raise ValueError(f"检查点由引擎版本 {state['engine_version']} 生成，当前版本为 {ENGINE_VERSION}")
+        if len(round_results) != state["rounds"]:
+            raise ValueError("检查点的轮次结果与引擎状态不一致")
+
+        engine = cls(GameConfiguration.model_validate(state["game_config"]))
+        engine.simulation_id = state["simulation_id"]
+        engine.current_round = state["current_round"]
+        engine.start_time = state["start_time"]
+        engine.rng.setstate(state["rng_state"])
+        engine.jackpot_pool = state["jackpot_pool"]
+        engine.funding_pool = state["funding_pool"]
+        engine.total_returned_amount = state["total_returned_amount"]
+        engine.total_sales_amount = state["total_sales_amount"]
+        engine.jackpot_hits_count = state["jackpot_hits_count"]
+        engine.totals = state["totals"]
+        engine.recent_rtps = state["recent_rtps"]
+        engine.distributions = state["distributions"]
+        engine.jackpot_cycles = state["jackpot_cycles"]
+        engine.round_results = list(round_results)
+        engine.checkpoint_rounds = len(round_results)
+        engine._last_event_round = len(round_results)
+        return engine
+
+    def build_realtime_stats(self):
+        """根据增量统计构建实时统计数据（无结果时返回None）"""
+        totals = self.totals
+        if totals.rounds == 0:
+            return None
+
+        prize_stats = {}
+        for prize_level in self.compiled.prize_levels:
+            prize_stats[prize_level.level] = {
+                "name": prize_level.name,
+                "winners_count": totals.level_winners.get(prize_level.level, 0),
+                "total_amount": totals.level_amounts.get(prize_level.level, 0.0)
+            }
+
+        # 获取奖池阶段信息
+        jackpot_phase_info = {}
+        if self.compiled.jackpot_enabled:
+            return_phase_completed = self.total_returned_amount >= self.initial_jackpot_amount
+            if return_phase_completed:
+                current_contribution_rate = self.compiled.post_return_contribution_rate
+            else:
+                current_contribution_rate = self.compiled.contribution_rate
+
+            jackpot_phase_info = {
+                "return_phase_completed": return_phase_completed,
+                "current_contribution_rate": current_contribution_rate,
+                "total_returned_amount": self.total_returned_amount,
+                "initial_jackpot_amount": self.initial_jackpot_amount,
+                "phase_1_rate": self.compiled.contribution_rate,
+                "phase_2_rate": self.compiled.post_return_contribution_rate
+            }
+
+        return {
+            "completed_rounds": totals.rounds,
+            "total_bet_amount": totals.bet_amount,
+            "total_payout": totals.payout,
+            "current_rtp": (totals.payout / totals.bet_amount) if totals.bet_amount > 0 else 0.0,
+            "prize_stats": prize_stats,
+            "recent_rtps": list(self.recent_rtps),  # 最近20轮的累积RTP
+            "current_jackpot": self.jackpot_pool,
+            "total_sales_amount": self.total_sales_amount,  # 累计销售金额
+            "jackpot_hits_count": self.jackpot_hits_count,  # 头奖中出次数
+            "total_players": totals.players,  # 总玩家数
+            "total_winners": totals.winners,  # 总中奖人数
+            "total_non_winners": totals.non_winners,  # 总未中奖人数
+            "winning_rate": (totals.winners / totals.players) if totals.players > 0 else 0.0,  # 中奖率
+            **jackpot_phase_info  # 合并奖池阶段信息
+        }
+
+    def build_prize_distribution(self):
+        """各奖级累计分布（只包含有中奖的奖级）"""
+        totals = self.totals
+        distribution = []
+        for prize_level in self.compiled.prize_levels:
+            count = totals.level_winners.get(prize_level.level, 0)
+            if count > 0:
+                distribution.append({
+                    "level": prize_level.level,
+                    "name": prize_level.name,
+                    "count": count,
+                    "amount": totals.level_amounts.get(prize_level.level, 0.0)
+                })
+        return distribution
+
+    def build_analytics(self):
+        """分析数据（逐轮分布和奖池周期，均为增量维护）"""
+        return {
+            "distributions": self.distributions.to_dict(),
+            "jackpot_cycles": {
+                "enabled": self.compiled.jackpot_enabled,
+                **self.jackpot_cycles.summary(self.totals.rounds)
+            }
+        }
+
+    def build_progress(self, since_round=None):
+        """
+        构建进度数据
+
+        Args:
+            since_round: 提供时附带该轮之后新增的图表数据点（delta）
+        """
+        total_rounds = self.sim_config.rounds
+        progress_percentage = (self.current_round / total_rounds) * 100 if total_rounds > 0 else 0
+        elapsed_time = (datetime.now() - self.start_time).total_seconds() if self.start_time else 0
+
+        # 估算剩余时间
+        estimated_remaining = None
+        if self.current_round > 0 and progress_percentage > 0:
+            time_per_round = elapsed_time / self.current_round
+            estimated_remaining = time_per_round * (total_rounds - self.current_round)
+
+        progress = {
+            "simulation_id": self.simulation_id,
+            "status": "running",
+            "current_round": self.current_round,
+            "total_rounds": total_rounds,
+            "progress_percentage": progress_percentage,
+            "elapsed_time": elapsed_time,
+            "estimated_remaining": estimated_remaining,
+            "real_time_stats": self.build_realtime_stats(),
+            "phase_timings": self.phase_timings.to_dict()
+        }
+
+        if since_round is not None:
+            delta = chart_delta(self.round_results, since_round)
+            delta["prize_distribution"] = self.build_prize_distribution()
+            progress["delta"] = delta
+
+        return progress
     
     def stop_simulation(self):
         """停止模拟"""
@@ -346,7 +709,8 @@ class UniversalSimulationEngine:
     
     async def run_simulation(self) -> SimulationResult:
         """运行完整模拟"""
-        self.start_time = datetime.now()
+        # 从检查点恢复时沿用原来的开始时间
+        self.start_time = self.start_time or datetime.now()
         self.is_running = True
         self.should_stop = False
         
@@ -361,14 +725,14 @@ class UniversalSimulationEngine:
                 simulation_rounds=self.sim_config.rounds
             )
             
-            # 运行模拟
-            for round_num in range(1, self.sim_config.rounds + 1):
+            # 运行模拟（从检查点恢复时从下一轮继续）
+            for round_num in range(len(self.round_results) + 1, self.sim_config.rounds + 1):
                 if self.should_stop:
                     break
 
                 self.current_round = round_num
                 round_result = self.simulate_round(round_num)
-                self.round_results.append(round_result)
+                self.record_round(round_result)
 
                 # 更新进度
                 if self.progress_callback:
@@ -384,6 +748,8 @@ class UniversalSimulationEngine:
                 # 每10轮让出控制权，允许其他协程运行
                 if round_num % 10 == 0:
                     await asyncio.sleep(0.01)  # 让出控制权，允许进度查询
+
+            self.flush_checkpoint()
             
             # 生成汇总统计
             summary = self._generate_summary()
@@ -397,6 +763,8 @@ class UniversalSimulationEngine:
             result.status = "completed" if not self.should_stop else "stopped"
             result.summary = summary
             result.round_results = self.round_results
+            result.analytics = self.build_analytics()
+            result.phase_timings = self.phase_timings.to_dict()
             
             return result
             
@@ -411,74 +779,19 @@ class UniversalSimulationEngine:
             self.is_running = False
     
     def _generate_summary(self) -> SimulationSummary:
-        """生成汇总统计"""
+        """生成汇总统计（直接使用增量累计的汇总，不再遍历轮次结果）"""
         if not self.round_results:
             return None
-        
-        # 计算汇总数据
-        total_rounds = len(self.round_results)
-        total_players = sum(r.players_count for r in self.round_results)
-        total_bets = sum(r.total_bets for r in self.round_results)
-        total_bet_amount = sum(r.total_bet_amount for r in self.round_results)
-        total_payout = sum(r.total_payout for r in self.round_results)
-
-        # 计算中奖和未中奖人数统计
-        total_winners = sum(r.winners_count or 0 for r in self.round_results)
-        total_non_winners = sum(r.non_winners_count or 0 for r in self.round_results)
-        winning_rate = (total_winners / total_players) if total_players > 0 else 0.0
-        
-        # 计算平均RTP和方差
-        rtps = [r.rtp for r in self.round_results]
-        average_rtp = np.mean(rtps)
-        rtp_variance = np.var(rtps)
-        
-        # 奖池统计
-        initial_jackpot = self.game_rules.jackpot.initial_amount
-        final_jackpot = self.jackpot_pool
-        
-        # 使用实际统计的头奖中出次数
-        jackpot_hits = self.jackpot_hits_count
-        
-        # 各奖级汇总
-        prize_summary = []
-        for prize_level in self.game_rules.prize_levels:
-            level_winners = sum(
-                sum(stat.winners_count for stat in r.prize_stats if stat.level == prize_level.level)
-                for r in self.round_results
-            )
-            level_amount = sum(
-                sum(stat.total_amount for stat in r.prize_stats if stat.level == prize_level.level)
-                for r in self.round_results
-            )
-            
-            # 计算平均概率
-            probabilities = [
-                stat.probability for r in self.round_results 
-                for stat in r.prize_stats if stat.level == prize_level.level
-            ]
-            avg_probability = np.mean(probabilities) if probabilities else 0.0
-            
-            prize_summary.append(PrizeStatistics(
-                level=prize_level.level,
-                name=prize_level.name,
-                winners_count=level_winners,
-                total_amount=level_amount,
-                probability=avg_probability
-            ))
-        
-        return SimulationSummary(
-            total_rounds=total_rounds,
-            total_players=total_players,
-            total_bets=total_bets,
-            total_bet_amount=total_bet_amount,
-            total_payout=total_payout,
-            average_rtp=average_rtp,
-            rtp_variance=rtp_variance,
-            total_winners=total_winners,
-            total_non_winners=total_non_winners,
-            winning_rate=winning_rate,
-            initial_jackpot=initial_jackpot,
-            final_jackpot=final_jackpot,
-            jackpot_hits=jackpot_hits,
-            prize_summary=prize_summary
+
+        totals = self.totals
+        if totals.rounds != len(self.round_results):
+            # 轮次结果未经 record_round 记录时重新单次聚合
+            totals, _ = reduce_rounds(self.round_results)
+            totals.final_jackpot = self.jackpot_pool
+            totals.jackpot_hits = self.jackpot_hits_count
+
+        return build_summary(
+            totals,
+            [(prize_level.level, prize_level.name) for prize_level in self.game_rules.prize_levels],
+            initial_jackpot=self.game_rules.jackpot.initial_amount
         )
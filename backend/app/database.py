@@ -1,12 +1,21 @@
 """
 数据库配置和连接管理
+
+引擎在首次访问数据库时才创建（创建引擎会加载 MySQL 驱动），
+启动时的连接测试和建表在后台执行（见 init_database_in_background），
+数据库不可达不会阻塞服务启动。
 """
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
+import asyncio
 import logging
+import threading
+
+from .core.config import settings
+from .core.circuit_breaker import CircuitBreaker, CircuitState
 
 logger = logging.getLogger(__name__)
 
@@ -22,19 +31,58 @@ DATABASE_CONFIG = {
 # 构建数据库URL
 DATABASE_URL = f"mysql+pymysql://{DATABASE_CONFIG['username']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}?charset=utf8mb4"
 
-# 创建数据库引擎
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False  # 设置为True可以看到SQL语句
+# 数据库熔断器：数据库不可达时快速回退到文件存储
+db_circuit = CircuitBreaker(
+    "mysql",
+    failure_threshold=settings.DB_CIRCUIT_FAILURE_THRESHOLD,
+    cooldown_seconds=settings.DB_CIRCUIT_COOLDOWN
 )
 
-# 创建会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """数据库引擎（首次调用时创建）"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    DATABASE_URL,
+                    poolclass=QueuePool,
+                    pool_size=10,
+                    max_overflow=20,
+                    pool_pre_ping=True,
+                    pool_recycle=3600,
+                    connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT},
+                    echo=False  # 设置为True可以看到SQL语句
+                )
+                event.listen(engine, "engine_connect", _on_engine_connect)
+                event.listen(engine, "handle_error", _on_engine_error)
+                _engine = engine
+    return _engine
+
+
+def __getattr__(name):
+    """兼容 `from app.database import engine`"""
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _on_engine_connect(connection):
+    """成功获取连接，记录熔断器成功"""
+    db_circuit.record_success()
+
+
+def _on_engine_error(context):
+    """连接失败或连接断开，记录熔断器失败（普通SQL错误不计入）"""
+    if context.connection is None or context.is_disconnect:
+        db_circuit.record_failure(context.original_exception)
+
+# 创建会话工厂（会话在创建时绑定引擎）
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 # 创建基础模型类
 Base = declarative_base()
@@ -42,9 +90,13 @@ Base = declarative_base()
 # 元数据
 metadata = MetaData()
 
+def db_available() -> bool:
+    """数据库当前是否可尝试访问（熔断期间返回False，调用方应直接使用文件存储）"""
+    return db_circuit.allow_request()
+
 def get_db():
     """获取数据库会话"""
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
@@ -58,7 +110,7 @@ def init_database():
         
         # 连接到MySQL服务器（不指定数据库）
         server_url = f"mysql+pymysql://{DATABASE_CONFIG['username']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}"
-        server_engine = create_engine(server_url)
+        server_engine = create_engine(server_url, connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT})
         
         with server_engine.connect() as conn:
             # 创建数据库
@@ -68,7 +120,7 @@ def init_database():
         server_engine.dispose()
         
         # 创建所有表
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         
         logger.info("数据库初始化成功")
         return True
@@ -81,9 +133,50 @@ def test_connection():
     """测试数据库连接"""
     try:
         from sqlalchemy import text
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             result = conn.execute(text("SELECT 1"))
             return result.fetchone() is not None
     except Exception as e:
         logger.error(f"数据库连接测试失败: {e}")
         return False
+
+async def run_db_probe_loop(interval: float = None):
+    """
+    后台探测任务：熔断期间定期探测数据库，恢复后自动关闭熔断器
+
+    探测在线程池中执行，避免阻塞事件循环。
+    """
+    interval = interval or settings.DB_CIRCUIT_PROBE_INTERVAL
+    loop = asyncio.get_running_loop()
+
+    while True:
+        await asyncio.sleep(interval)
+        if db_circuit.state == CircuitState.CLOSED:
+            continue
+        try:
+            # test_connection 通过引擎事件自动记录成功/失败
+            if await loop.run_in_executor(None, test_connection):
+                logger.info("数据库探测成功，恢复数据库访问")
+        except Exception as e:
+            logger.debug(f"数据库探测异常: {e}")
+
+
+async def init_database_in_background():
+    """
+    启动时的数据库连接测试和初始化（在线程池中执行，不阻塞服务启动）
+
+    数据库不可达时连接失败会记录到熔断器，之后由 run_db_probe_loop 探测恢复。
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        if await loop.run_in_executor(None, test_connection):
+            logger.info("数据库连接测试成功")
+            if await loop.run_in_executor(None, init_database):
+                logger.info("数据库初始化成功")
+            else:
+                logger.warning("数据库初始化失败，将使用文件存储")
+        else:
+            logger.warning("数据库连接失败，将使用文件存储")
+    except Exception as e:
+        logger.error(f"数据库初始化异常: {e}")
+        logger.warning("将使用文件存储作为备用方案")
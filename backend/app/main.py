@@ -8,12 +8,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 import os
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from .api import simulation, config, reports
+from .api import simulation, config, reports, analytics, cluster, metrics
 from .core.config import settings
-from .database import init_database, test_connection
+from .core.metrics import MetricsMiddleware
+from .services.report_store import report_store
+from .database import db_circuit, init_database_in_background, run_db_probe_loop
 
 # 配置日志
 logging.basicConfig(
@@ -28,22 +31,19 @@ async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     logger.info("🚀 @numericalTools 启动中...")
 
-    # 初始化数据库
-    try:
-        if test_connection():
-            logger.info("数据库连接测试成功")
-            if init_database():
-                logger.info("数据库初始化成功")
-            else:
-                logger.warning("数据库初始化失败，将使用文件存储")
-        else:
-            logger.warning("数据库连接失败，将使用文件存储")
-    except Exception as e:
-        logger.error(f"数据库初始化异常: {e}")
-        logger.warning("将使用文件存储作为备用方案")
+    # 数据库连接测试和初始化在后台执行，数据库不可达不阻塞启动（期间按可用处理，失败后由熔断器回退）
+    db_init_task = asyncio.create_task(init_database_in_background())
+
+    # 在报告线程池中清理上次运行遗留的过期临时文件（不阻塞启动）
+    report_store.maybe_reap()
+
+    # 后台探测数据库，熔断期间恢复后自动切回数据库存储
+    probe_task = asyncio.create_task(run_db_probe_loop())
 
     yield
     logger.info("🛑 @numericalTools 关闭中...")
+    db_init_task.cancel()
+    probe_task.cancel()
 
 
 # 创建FastAPI应用
@@ -63,19 +63,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 按路由记录请求耗时（/metrics）
+app.add_middleware(MetricsMiddleware)
+
 # 注册API路由
 app.include_router(simulation.router, prefix="/api/v1/simulation", tags=["simulation"])
 app.include_router(config.router, prefix="/api/v1/config", tags=["config"])
 app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
+app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+app.include_router(cluster.router, prefix="/api/v1/cluster", tags=["cluster"])
+app.include_router(metrics.router, tags=["metrics"])
 
 # 健康检查端点
 @app.get("/health")
 async def health_check():
     """健康检查"""
+    database_state = db_circuit.snapshot()
     return {
         "status": "healthy",
         "service": "@numericalTools",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "storage": "database" if database_state["available"] else "file",
+        "database": database_state
     }
 
 # 根路径
@@ -0,0 +1,29 @@
+"""
+分布式模拟的请求模型（工作节点与协调者之间）
+"""
+
+from pydantic import BaseModel, Field
+from typing import Dict, Any
+
+
+class LeaseRequest(BaseModel):
+    """领取分片任务"""
+    worker_id: str = Field(..., description="工作节点ID")
+
+
+class ShardHeartbeat(BaseModel):
+    """分片进度上报（同时续租）"""
+    worker_id: str = Field(..., description="工作节点ID")
+    completed_rounds: int = Field(0, ge=0, description="分片已完成的轮数")
+
+
+class ShardCompletion(BaseModel):
+    """分片完成"""
+    worker_id: str = Field(..., description="工作节点ID")
+    partial: Dict[str, Any] = Field(..., description="可合并的部分汇总（见 core.sharding.run_partial_shard）")
+
+
+class ShardFailure(BaseModel):
+    """分片失败"""
+    worker_id: str = Field(..., description="工作节点ID")
+    error: str = Field(..., description="错误信息")
@@ -95,6 +95,12 @@ class SimulationResult(BaseModel):
     # 结果数据
     summary: Optional[SimulationSummary] = Field(None, description="汇总统计")
     round_results: List[RoundResult] = Field(default_factory=list, description="各轮结果")
+
+    # 分析数据（逐轮分布等，模拟过程中增量统计）
+    analytics: Optional[Dict[str, Any]] = Field(None, description="分析数据")
+
+    # 引擎各阶段耗时（见 core.phase_timings）
+    phase_timings: Optional[Dict[str, Any]] = Field(None, description="各阶段耗时")
     
     # 可视化数据
     charts: List[ChartData] = Field(default_factory=list, description="图表数据")
@@ -105,8 +111,10 @@ class SimulationResult(BaseModel):
 
 class SimulationRequest(BaseModel):
     """模拟请求"""
-    game_config: Dict[str, Any] = Field(..., description="游戏配置")
-    simulation_config: Dict[str, Any] = Field(..., description="模拟配置")
+    game_config: Optional[Dict[str, Any]] = Field(None, description="游戏配置（未提供config_name时必填）")
+    simulation_config: Optional[Dict[str, Any]] = Field(None, description="模拟配置（使用config_name时可选，用于覆盖已保存的模拟配置）")
+    config_name: Optional[str] = Field(None, description="已保存的配置名称（直接使用缓存的已验证配置）")
+    config_updated_at: Optional[str] = Field(None, description="配置更新时间（与缓存不一致时重新加载）")
     options: Optional[Dict[str, Any]] = Field(None, description="额外选项")
 
 
@@ -116,3 +124,4 @@ class SimulationResponse(BaseModel):
     status: str = Field(..., description="状态")
     message: str = Field(..., description="消息")
     result: Optional[SimulationResult] = Field(None, description="结果数据")
+    cached: bool = Field(False, description="是否命中结果缓存（相同配置和种子的已有模拟）")
@@ -0,0 +1,250 @@
+"""
+分布式模拟协调
+
+API 节点作为协调者把模拟拆成分片任务（见 core.sharding），其他主机上的工作节点
+通过 HTTP 领取任务、运行分片并提交部分汇总，全部分片完成后合并为一个模拟结果：
+- 领取任务时获得租约，工作节点定期上报进度续租；租约过期（节点退出或失联）的分片重新排队
+- 分片的种子在创建任务时确定，重新运行的结果相同，重复提交只保留第一次
+- 同一分片失败或租约过期达到 CLUSTER_MAX_ATTEMPTS 次时整个任务失败
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.sharding import plan_shards, merge_partials, validate_partial
+from ..models.game_config import GameConfiguration
+from ..models.simulation_result import SimulationResult
+
+
+class ShardTask:
+    """一个分片任务"""
+
+    __slots__ = ("index", "rounds", "seed", "status", "worker_id", "lease_expires",
+                 "completed_rounds", "attempts", "partial", "error")
+
+    def __init__(self, index: int, rounds: int, seed: int):
+        self.index = index
+        self.rounds = rounds
+        self.seed = seed
+        self.status = "pending"  # pending / leased / completed
+        self.worker_id: Optional[str] = None
+        self.lease_expires = 0.0
+        self.completed_rounds = 0
+        self.attempts = 0
+        self.partial: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "rounds": self.rounds,
+            "status": self.status,
+            "worker_id": self.worker_id,
+            "completed_rounds": self.completed_rounds,
+            "attempts": self.attempts,
+            "error": self.error
+        }
+
+
+class ClusterJob:
+    """分布式模拟任务"""
+
+    def __init__(self, game_config: GameConfiguration, shards: int):
+        self.simulation_id = str(uuid.uuid4())
+        self.config = game_config.model_dump(mode="json")
+        self.game_config_id = game_config.id
+        self.game_name = game_config.game_rules.name
+        self.total_rounds = game_config.simulation_config.rounds
+        self.start_time = datetime.now()
+        self.status = "running"  # running / completed / error
+        self.error_message: Optional[str] = None
+        self.shards = [
+            ShardTask(plan["index"], plan["rounds"], plan["seed"])
+            for plan in plan_shards(self.total_rounds, shards, game_config.simulation_config.seed)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed_rounds = sum(shard.completed_rounds for shard in self.shards)
+        return {
+            "simulation_id": self.simulation_id,
+            "status": self.status,
+            "game_name": self.game_name,
+            "start_time": self.start_time.isoformat(),
+            "total_rounds": self.total_rounds,
+            "completed_rounds": completed_rounds,
+            "progress_percentage": completed_rounds / self.total_rounds * 100 if self.total_rounds else 100.0,
+            "completed_shards": sum(1 for shard in self.shards if shard.status == "completed"),
+            "error_message": self.error_message,
+            "shards": [shard.to_dict() for shard in self.shards]
+        }
+
+
+class LeaseLost(Exception):
+    """分片不存在，或已不属于该工作节点（租约过期后被重新分配、任务已结束）"""
+
+
+class ClusterCoordinator:
+    """
+    分片任务队列
+
+    on_finished(job, result) 在任务完成或失败时调用一次（result 为合并后的模拟结果）。
+    """
+
+    def __init__(self, lease_seconds: float, max_attempts: int,
+                 on_finished: Optional[Callable[[ClusterJob, SimulationResult], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.on_finished = on_finished
+        self.clock = clock
+        self.jobs: Dict[str, ClusterJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, game_config: GameConfiguration, shards: int) -> ClusterJob:
+        job = ClusterJob(game_config, shards)
+        with self._lock:
+            self.jobs[job.simulation_id] = job
+        return job
+
+    def get(self, simulation_id: str) -> Optional[ClusterJob]:
+        return self.jobs.get(simulation_id)
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        为工作节点分配下一个待运行的分片（按任务提交顺序），没有时返回None
+
+        租约过期的分片重新排队；已达到重试次数的分片不再分配，整个任务失败。
+        """
+        now = self.clock()
+        failed_jobs = []
+        task = None
+        with self._lock:
+            for job in self.jobs.values():
+                if job.status != "running":
+                    continue
+                for shard in job.shards:
+                    if shard.status == "leased" and shard.lease_expires <= now:
+                        # 租约过期：工作节点退出或失联
+                        shard.completed_rounds = 0
+                        if shard.attempts >= self.max_attempts:
+                            shard.error = "租约过期"
+                            job.status = "error"
+                            job.error_message = f"分片 {shard.index} 租约过期 {shard.attempts} 次（工作节点退出或失联）"
+                            failed_jobs.append(job)
+                            break
+                        shard.status = "pending"
+                    if shard.status == "pending":
+                        shard.status = "leased"
+                        shard.worker_id = worker_id
+                        shard.lease_expires = now + self.lease_seconds
+                        shard.attempts += 1
+                        task = {
+                            "simulation_id": job.simulation_id,
+                            "shard_index": shard.index,
+                            "rounds": shard.rounds,
+                            "seed": shard.seed,
+                            "config": job.config,
+                            "lease_seconds": self.lease_seconds
+                        }
+                        break
+                if task is not None:
+                    break
+
+        for job in failed_jobs:
+            self._finish(job)
+        return task
+
+    def _leased_shard(self, simulation_id: str, index: int, worker_id: str) -> ShardTask:
+        job = self.jobs.get(simulation_id)
+        if job is None or job.status != "running" or not 0 <= index < len(job.shards):
+            raise LeaseLost()
+        shard = job.shards[index]
+        if shard.status != "leased" or shard.worker_id != worker_id:
+            raise LeaseLost()
+        return shard
+
+    def heartbeat(self, simulation_id: str, index: int, worker_id: str, completed_rounds: int):
+        """上报进度并续租"""
+        with self._lock:
+            shard = self._leased_shard(simulation_id, index, worker_id)
+            shard.completed_rounds = min(max(0, completed_rounds), shard.rounds)
+            shard.lease_expires = self.clock() + self.lease_seconds
+
+    def complete(self, simulation_id: str, index: int, worker_id: str, partial: Dict[str, Any]):
+        """
+        提交分片的部分汇总
+
+        分片的种子固定，结果与由哪个节点运行无关：租约过期后被重新分配的分片，
+        原节点提交的结果同样接受；分片已完成时忽略重复提交。全部分片完成后合并结果。
+        """
+        with self._lock:
+            job = self.jobs.get(simulation_id)
+            if job is None or not 0 <= index < len(job.shards):
+                raise LeaseLost()
+            shard = job.shards[index]
+            if shard.status == "completed":
+                return
+            if job.status != "running":
+                raise LeaseLost()
+            validate_partial(partial, shard.rounds)
+            shard.status = "completed"
+            shard.worker_id = worker_id
+            shard.partial = partial
+            shard.completed_rounds = shard.rounds
+            finished = all(s.status == "completed" for s in job.shards)
+            if finished:
+                job.status = "completed"
+
+        if finished:
+            self._finish(job)
+
+    def fail(self, simulation_id: str, index: int, worker_id: str, error: str):
+        """工作节点报告分片失败：重新排队，超过重试次数时任务失败"""
+        with self._lock:
+            shard = self._leased_shard(simulation_id, index, worker_id)
+            job = self.jobs[simulation_id]
+            shard.error = error
+            shard.completed_rounds = 0
+            if shard.attempts >= self.max_attempts:
+                job.status = "error"
+                job.error_message = f"分片 {index} 失败 {shard.attempts} 次: {error}"
+                failed = True
+            else:
+                shard.status = "pending"
+                shard.worker_id = None
+                failed = False
+
+        if failed:
+            self._finish(job)
+
+    def _finish(self, job: ClusterJob):
+        end_time = datetime.now()
+        result = SimulationResult(
+            simulation_id=job.simulation_id,
+            game_config_id=job.game_config_id,
+            start_time=job.start_time,
+            end_time=end_time,
+            duration=(end_time - job.start_time).total_seconds(),
+            status=job.status,
+            game_name=job.game_name,
+            simulation_rounds=job.total_rounds if job.status == "completed" else 0,
+            summary=merge_partials(job.config, [s.partial for s in job.shards]) if job.status == "completed" else None,
+            error_message=job.error_message
+        )
+        if self.on_finished is not None:
+            self.on_finished(job, result)
+
+    def discard(self, simulation_id: str):
+        with self._lock:
+            self.jobs.pop(simulation_id, None)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in list(self.jobs.values())]
+
+
+# 全局协调者实例（完成回调由 API 层设置）
+coordinator = ClusterCoordinator(settings.CLUSTER_LEASE_SECONDS, settings.CLUSTER_MAX_ATTEMPTS)
@@ -0,0 +1,117 @@
+"""
+分布式模拟工作节点
+
+循环向协调者领取分片、运行并提交部分汇总（python -m app.cli worker --coordinator URL）。
+运行期间按租约时长的四分之一上报进度续租；协调者返回租约失效时放弃当前分片。
+"""
+
+import logging
+import socket
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..core.sharding import run_partial_shard
+
+logger = logging.getLogger(__name__)
+
+
+CLUSTER_API_PREFIX = "/api/v1/cluster"
+
+
+class ShardAbandoned(Exception):
+    """协调者收回了分片的租约"""
+
+
+class ClusterWorker:
+    """
+    工作节点
+
+    Args:
+        client: 指向协调者的 HTTP 客户端（base_url 为协调者地址，测试中可传入 TestClient）
+        poll_interval: 没有任务时的轮询间隔（秒）
+        max_idle: 连续空闲超过该秒数时退出（None 表示一直运行）
+    """
+
+    def __init__(self, client: httpx.Client, worker_id: Optional[str] = None,
+                 poll_interval: float = 1.0, max_idle: Optional[float] = None):
+        self.client = client
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.max_idle = max_idle
+        self.completed_shards = 0
+        self.should_stop = False
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        return self.client.post(CLUSTER_API_PREFIX + path, json=payload)
+
+    def run(self) -> int:
+        """运行直到空闲超时或停止，返回完成的分片数"""
+        idle_since = time.monotonic()
+        while not self.should_stop:
+            try:
+                response = self._post("/lease", {"worker_id": self.worker_id})
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.warning(f"领取分片失败: {e}")
+                response = None
+
+            if response is None or response.status_code == 204:
+                if self.max_idle is not None and time.monotonic() - idle_since >= self.max_idle:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            self.run_task(response.json())
+            idle_since = time.monotonic()
+        return self.completed_shards
+
+    def run_task(self, task: Dict[str, Any]):
+        """运行一个分片并提交结果"""
+        simulation_id = task["simulation_id"]
+        shard_path = f"/jobs/{simulation_id}/shards/{task['shard_index']}"
+        heartbeat_interval = task["lease_seconds"] / 4
+        state = {"completed": 0, "last_heartbeat": time.monotonic()}
+
+        def progress(rounds: int):
+            state["completed"] += rounds
+            now = time.monotonic()
+            if now - state["last_heartbeat"] < heartbeat_interval:
+                return
+            state["last_heartbeat"] = now
+            try:
+                response = self._post(f"{shard_path}/heartbeat",
+                                      {"worker_id": self.worker_id, "completed_rounds": state["completed"]})
+            except httpx.HTTPError as e:
+                # 暂时无法连接协调者时继续运行，租约过期前恢复即可
+                logger.warning(f"上报进度失败: {e}")
+                return
+            if response.status_code == 409:
+                raise ShardAbandoned()
+
+        logger.info(f"开始运行模拟 {simulation_id} 的分片 {task['shard_index']}（{task['rounds']} 轮）")
+        try:
+            partial = run_partial_shard(task["config"], task["rounds"], task["seed"], progress=progress)
+        except ShardAbandoned:
+            logger.warning(f"模拟 {simulation_id} 的分片 {task['shard_index']} 租约已失效，放弃运行")
+            return
+        except Exception as e:
+            logger.error(f"模拟 {simulation_id} 的分片 {task['shard_index']} 运行失败: {e}")
+            try:
+                self._post(f"{shard_path}/fail", {"worker_id": self.worker_id, "error": str(e)})
+            except httpx.HTTPError:
+                pass
+            return
+
+        try:
+            response = self._post(f"{shard_path}/complete", {"worker_id": self.worker_id, "partial": partial})
+        except httpx.HTTPError as e:
+            # 租约过期后分片会重新分配
+            logger.warning(f"提交分片结果失败: {e}")
+            return
+        if response.status_code == 200:
+            self.completed_shards += 1
+        else:
+            logger.warning(f"提交分片结果失败: {response.status_code} {response.text}")
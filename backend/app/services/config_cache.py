@@ -0,0 +1,119 @@
+"""
+游戏配置内存缓存
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..models.game_config import GameConfiguration
+from ..core.config import settings
+
+
+class CachedConfig:
+    """缓存的配置条目：原始配置数据 + 延迟验证的 GameConfiguration"""
+
+    __slots__ = ("name", "config_data", "updated_at", "loaded_at", "_game_config")
+
+    def __init__(self, name: str, config_data: Dict[str, Any], updated_at: Optional[str] = None):
+        self.name = name
+        self.config_data = config_data
+        self.updated_at = updated_at or config_data.get("updated_at")
+        self.loaded_at = time.monotonic()
+        self._game_config: Optional[GameConfiguration] = None
+
+    @property
+    def game_config(self) -> GameConfiguration:
+        """验证后的配置对象（首次访问时验证，之后复用）"""
+        if self._game_config is None:
+            config_data = dict(self.config_data)
+            config_data["id"] = config_data.get("id") or self.name
+            self._game_config = GameConfiguration(**config_data)
+        return self._game_config
+
+
+class ConfigCache:
+    """
+    按 (配置名, updated_at) 命中的配置缓存
+
+    保存/删除配置时需调用 invalidate()；TTL 用于兜底其他节点对数据库的修改。
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedConfig]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, updated_at: Optional[str] = None) -> Optional[CachedConfig]:
+        """
+        获取缓存条目
+
+        Args:
+            name: 配置名称
+            updated_at: 期望的更新时间（提供时必须与缓存一致才命中）
+
+        Returns:
+            缓存条目，未命中返回None
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                expired = self.ttl_seconds and time.monotonic() - entry.loaded_at > self.ttl_seconds
+                if expired or (updated_at is not None and entry.updated_at != updated_at):
+                    del self._entries[name]
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return entry
+
+    def put(self, name: str, config_data: Dict[str, Any], updated_at: Optional[str] = None) -> CachedConfig:
+        """
+        写入缓存条目
+
+        Args:
+            name: 配置名称
+            config_data: 原始配置数据
+            updated_at: 存储层记录的更新时间（默认取配置数据中的updated_at）
+        """
+        entry = CachedConfig(name, config_data, updated_at)
+        with self._lock:
+            self._entries[name] = entry
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, name: str):
+        """使指定配置的缓存失效"""
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# 全局配置缓存实例
+config_cache = ConfigCache(
+    max_entries=settings.CONFIG_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CONFIG_CACHE_TTL
+)
@@ -0,0 +1,196 @@
+"""
+基于文件的配置仓库（带索引）
+"""
+
+import json
+import os
+import tempfile
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FileConfigRepository:
+    """
+    文件配置仓库
+
+    每个配置保存为 <config_dir>/<name>.json，另维护一个小索引文件记录列表展示所需的
+    摘要信息（名称、显示名、类型、时间戳、文件mtime）。列出配置时读取索引并逐个stat配置文件；
+    目录mtime变化（有文件被外部增删）或有文件的mtime/大小变化（被原地修改）时，
+    仅重新解析变化的配置文件。
+    """
+
+    INDEX_FILENAME = ".index.json"
+    INDEX_VERSION = 1
+
+    def __init__(self, config_dir: str):
+        """
+        初始化仓库
+
+        Args:
+            config_dir: 配置文件目录
+        """
+        self.config_dir = config_dir
+        self.index_path = os.path.join(config_dir, self.INDEX_FILENAME)
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dir_mtime_ns: Optional[int] = None  # 索引对应的目录mtime
+
+    def path_for(self, name: str) -> str:
+        """配置文件路径"""
+        return os.path.join(self.config_dir, f"{name}.json")
+
+    def exists(self, name: str) -> bool:
+        """配置是否存在"""
+        return os.path.exists(self.path_for(name))
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """读取配置数据，不存在返回None"""
+        try:
+            with open(self.path_for(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, name: str, config_data: Dict[str, Any]):
+        """保存配置并更新索引"""
+        with self._lock:
+            entries = self._fresh_entries()
+            path = self.path_for(name)
+            self._atomic_write(path, config_data, indent=2)
+            entries[name] = self._summarize(name, config_data, os.stat(path))
+            self._write_index(entries)
+
+    def delete(self, name: str) -> bool:
+        """删除配置并更新索引，配置不存在返回False"""
+        with self._lock:
+            entries = self._fresh_entries()
+            try:
+                os.remove(self.path_for(name))
+            except FileNotFoundError:
+                return False
+            entries.pop(name, None)
+            self._write_index(entries)
+            return True
+
+    def list(self) -> List[Dict[str, Any]]:
+        """列出所有配置摘要（按更新时间倒序）"""
+        with self._lock:
+            entries = self._fresh_entries()
+            summaries = [
+                {key: value for key, value in entry.items() if key not in ("mtime_ns", "size")}
+                for entry in entries.values()
+            ]
+        summaries.sort(key=lambda item: item.get("updated_at") or "", reverse=True)
+        return summaries
+
+    def _fresh_entries(self) -> Dict[str, Dict[str, Any]]:
+        """获取最新的索引条目（必要时从磁盘加载或增量重建）"""
+        # 目录在首次访问时创建（不在构造时创建，导入API模块不写磁盘）
+        os.makedirs(self.config_dir, exist_ok=True)
+        dir_mtime_ns = os.stat(self.config_dir).st_mtime_ns
+
+        if self._entries is None:
+            self._load_index(dir_mtime_ns)
+
+        if self._entries is not None and self._dir_mtime_ns == dir_mtime_ns and self._files_unchanged():
+            return self._entries
+
+        self._rebuild()
+        return self._entries
+
+    def _files_unchanged(self) -> bool:
+        """索引中每个配置文件的mtime/大小是否与磁盘一致（原地修改文件不会改变目录mtime）"""
+        for name, entry in self._entries.items():
+            try:
+                stat = os.stat(self.path_for(name))
+            except OSError:
+                return False
+            if entry.get("mtime_ns") != stat.st_mtime_ns or entry.get("size") != stat.st_size:
+                return False
+        return True
+
+    def _load_index(self, dir_mtime_ns: int):
+        """从磁盘读取索引文件（索引写入后目录未变化才视为有效）"""
+        try:
+            if os.stat(self.index_path).st_mtime_ns < dir_mtime_ns:
+                return
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get("version") != self.INDEX_VERSION:
+                return
+            self._entries = index.get("entries", {})
+            self._dir_mtime_ns = dir_mtime_ns
+        except (OSError, ValueError):
+            self._entries = None
+            self._dir_mtime_ns = None
+
+    def _rebuild(self):
+        """增量重建索引：只解析新增或mtime/大小变化的配置文件"""
+        previous = self._entries or {}
+        entries = {}
+
+        with os.scandir(self.config_dir) as it:
+            for dir_entry in it:
+                filename = dir_entry.name
+                if filename.startswith('.') or not filename.endswith('.json') or not dir_entry.is_file():
+                    continue
+
+                name = filename[:-5]  # 移除.json后缀
+                stat = dir_entry.stat()
+                cached = previous.get(name)
+                if cached and cached.get("mtime_ns") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+                    entries[name] = cached
+                    continue
+
+                try:
+                    with open(dir_entry.path, 'r', encoding='utf-8') as f:
+                        config_data = json.load(f)
+                except Exception:
+                    # 跳过损坏的配置文件
+                    continue
+                entries[name] = self._summarize(name, config_data, stat)
+
+        self._write_index(entries)
+
+    def _write_index(self, entries: Dict[str, Dict[str, Any]]):
+        """写入索引文件，并记录写入后的目录mtime作为新鲜度基准"""
+        self._entries = entries
+        try:
+            self._atomic_write(self.index_path, {"version": self.INDEX_VERSION, "entries": entries})
+            # 替换文件会更新目录mtime，刷新索引mtime使其不早于目录mtime（供冷启动时判断）
+            os.utime(self.index_path)
+            self._dir_mtime_ns = os.stat(self.config_dir).st_mtime_ns
+        except OSError as e:
+            # 索引写入失败不影响配置本身，下次列出时重建
+            logger.warning(f"配置索引写入失败: {e}")
+            self._dir_mtime_ns = None
+
+    @staticmethod
+    def _summarize(name: str, config_data: Dict[str, Any], stat: os.stat_result) -> Dict[str, Any]:
+        """提取列表展示所需的摘要信息"""
+        game_rules = config_data.get("game_rules", {})
+        return {
+            "name": name,
+            "display_name": game_rules.get("name", name),
+            "description": game_rules.get("description", ""),
+            "game_type": game_rules.get("game_type", "unknown"),
+            "created_at": config_data.get("created_at"),
+            "updated_at": config_data.get("updated_at"),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size
+        }
+
+    def _atomic_write(self, path: str, data: Dict[str, Any], indent: Optional[int] = None):
+        """先写临时文件再替换，避免读到半写入的文件"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=indent)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -0,0 +1,157 @@
+"""
+多个模拟结果的对比
+
+只读取存储的汇总统计（总轮数、逐轮RTP均值和方差、各奖级汇总），不遍历轮次明细：
+- 汇总指标和各奖级统计按奖级对齐
+- 每对模拟的逐轮RTP均值差异做 Welch t 检验
+对比结果按 (模拟ID, 结果版本) 组合缓存。
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.simulation_result import SimulationResult
+from ..utils.helpers import welch_t_test
+from .report_store import result_version
+
+
+# 显著性水平
+SIGNIFICANCE_LEVEL = 0.05
+# 缓存的对比结果数
+COMPARE_CACHE_MAX_ENTRIES = 64
+
+# 参与对比的汇总指标
+SUMMARY_FIELDS = (
+    "total_rounds",
+    "total_players",
+    "total_bets",
+    "total_bet_amount",
+    "total_payout",
+    "average_rtp",
+    "rtp_variance",
+    "total_winners",
+    "winning_rate",
+    "initial_jackpot",
+    "final_jackpot",
+    "jackpot_hits",
+)
+
+
+def _run_overview(result: SimulationResult) -> Dict[str, Any]:
+    summary = result.summary
+    overview = {field: getattr(summary, field) for field in SUMMARY_FIELDS}
+    # 总派奖 / 总投注（与逐轮RTP均值不同，按投注金额加权）
+    overview["overall_rtp"] = (
+        summary.total_payout / summary.total_bet_amount if summary.total_bet_amount > 0 else 0.0
+    )
+    return {
+        "simulation_id": result.simulation_id,
+        "game_name": result.game_name,
+        "status": result.status,
+        "summary": overview
+    }
+
+
+def _align_levels(results: List[SimulationResult]) -> List[Dict[str, Any]]:
+    """按奖级等级对齐各模拟的奖级统计（某模拟没有该奖级时为None）"""
+    levels: Dict[int, List[Optional[Dict[str, Any]]]] = {}
+    for index, result in enumerate(results):
+        summary = result.summary
+        for stat in summary.prize_summary:
+            row = levels.setdefault(stat.level, [None] * len(results))
+            row[index] = {
+                "name": stat.name,
+                "winners_count": stat.winners_count,
+                "total_amount": stat.total_amount,
+                "probability": stat.probability,
+                "hit_rate": stat.winners_count / summary.total_players if summary.total_players > 0 else 0.0
+            }
+
+    aligned = []
+    for level in sorted(levels):
+        runs = levels[level]
+        baseline = runs[0]
+        for run in runs[1:]:
+            if run is not None and baseline is not None:
+                run["winners_diff"] = run["winners_count"] - baseline["winners_count"]
+                run["amount_diff"] = run["total_amount"] - baseline["total_amount"]
+                run["hit_rate_diff"] = run["hit_rate"] - baseline["hit_rate"]
+        aligned.append({"level": level, "runs": runs})
+    return aligned
+
+
+def _rtp_test(a: SimulationResult, b: SimulationResult) -> Dict[str, Any]:
+    """两次模拟逐轮RTP均值的 Welch t 检验（汇总中的方差为总体方差，换算为样本方差）"""
+    sa, sb = a.summary, b.summary
+    na, nb = sa.total_rounds, sb.total_rounds
+    var_a = sa.rtp_variance * na / (na - 1) if na > 1 else 0.0
+    var_b = sb.rtp_variance * nb / (nb - 1) if nb > 1 else 0.0
+    test = welch_t_test(sa.average_rtp, var_a, na, sb.average_rtp, var_b, nb)
+    # 非有限值（inf/NaN）不能输出为JSON
+    test = {key: value if value is None or math.isfinite(value) else None for key, value in test.items()}
+    return {
+        "a": a.simulation_id,
+        "b": b.simulation_id,
+        "rtp_a": sa.average_rtp,
+        "rtp_b": sb.average_rtp,
+        "difference": sa.average_rtp - sb.average_rtp,
+        **test,
+        "significant": test["p_value"] is not None and test["p_value"] < SIGNIFICANCE_LEVEL
+    }
+
+
+def compare_results(results: List[SimulationResult]) -> Dict[str, Any]:
+    """
+    对比多个模拟结果（第一个为基准）
+
+    Args:
+        results: 带汇总统计的模拟结果（至少两个）
+
+    Returns:
+        {"runs": 各模拟汇总, "levels": 对齐的奖级统计, "rtp_tests": 两两RTP检验}
+    """
+    return {
+        "baseline": results[0].simulation_id,
+        "significance_level": SIGNIFICANCE_LEVEL,
+        "runs": [_run_overview(result) for result in results],
+        "levels": _align_levels(results),
+        "rtp_tests": [_rtp_test(a, b) for a, b in combinations(results, 2)]
+    }
+
+
+class CompareCache:
+    """对比结果缓存（键为各模拟的 (ID, 结果版本)，任一结果变化即失效）"""
+
+    def __init__(self, max_entries: int = COMPARE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Tuple[str, str], ...], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compare(self, results: List[SimulationResult]) -> Dict[str, Any]:
+        key = tuple((result.simulation_id, result_version(result)) for result in results)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+
+        comparison = compare_results(results)
+        with self._lock:
+            self._entries[key] = comparison
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return comparison
+
+    def discard_simulation(self, simulation_id: str):
+        """移除包含指定模拟的对比结果"""
+        with self._lock:
+            for key in [k for k in self._entries if any(sid == simulation_id for sid, _ in k)]:
+                del self._entries[key]
+
+
+# 全局对比缓存实例
+compare_cache = CompareCache()
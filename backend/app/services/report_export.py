@@ -0,0 +1,364 @@
+"""
+模拟结果导出（Excel / CSV / Parquet / JSON）
+
+所有导出都直接来自存储的模拟结果，轮次明细逐行（或按批）写出，
+不构建完整的 DataFrame，百万轮的明细也不会在内存中再复制一份。
+汇总和趋势序列来自对轮次结果的单次遍历（ReportData），HTML / JSON / Excel 共用。
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..core.aggregation import reduce_rounds
+from ..models.simulation_result import RoundResult, SimulationResult
+
+
+# CSV 每次输出的行数
+CSV_CHUNK_ROWS = 5000
+# Parquet 每个行组（写入批次）的轮数
+PARQUET_BATCH_ROWS = 100_000
+# Excel 单个工作表的最大行数（含表头）
+EXCEL_MAX_ROWS = 1_048_576
+
+# 轮次明细的标量列：(列名, 中文表头)
+ROUND_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("round_number", "轮次"),
+    ("players_count", "玩家数"),
+    ("total_bets", "投注数"),
+    ("total_bet_amount", "投注金额"),
+    ("total_payout", "派奖金额"),
+    ("rtp", "RTP"),
+    ("jackpot_amount", "奖池金额"),
+    ("winners_count", "中奖人数"),
+    ("non_winners_count", "未中奖人数"),
+)
+
+
+def round_column_spec(round_results: Sequence[RoundResult]) -> List[Tuple[str, str]]:
+    """
+    轮次明细的列定义：[(列名, 中文表头)]
+
+    标量列之后是开奖号码，再之后每个奖级两列（level{等级}_winners / level{等级}_amount）。
+    """
+    columns = list(ROUND_FIELDS)
+    columns.append(("winning_numbers", "开奖号码"))
+    if round_results:
+        seen = set()
+        for index, stat in enumerate(round_results[0].prize_stats):
+            prefix = f"level{stat.level}" if stat.level not in seen else f"level{stat.level}_{index}"
+            seen.add(stat.level)
+            columns.append((f"{prefix}_winners", f"{stat.name}中奖人数"))
+            columns.append((f"{prefix}_amount", f"{stat.name}奖金"))
+    return columns
+
+
+def round_row(round_result: RoundResult, numbers_as_text: bool = True) -> list:
+    """一轮的明细行（列顺序与 round_column_spec 一致）"""
+    row = [getattr(round_result, name) for name, _ in ROUND_FIELDS]
+    numbers = round_result.winning_numbers or []
+    row.append(" ".join(str(n) for n in numbers) if numbers_as_text else numbers)
+    for stat in round_result.prize_stats:
+        row.append(stat.winners_count)
+        row.append(stat.total_amount)
+    return row
+
+
+def iter_round_rows(round_results: Sequence[RoundResult], numbers_as_text: bool = True) -> Iterator[list]:
+    """逐轮生成明细行（列顺序与 round_column_spec 一致）"""
+    for round_result in round_results:
+        yield round_row(round_result, numbers_as_text)
+
+
+def round_schema(names: Sequence[str], metadata: Optional[Dict[str, Any]] = None):
+    """
+    轮次明细列的 Arrow schema（Parquet 和 Arrow 输出共用）
+
+    metadata 的值应为字符串或字节（如JSON）。
+    """
+    import pyarrow as pa
+
+    fields = []
+    for name in names:
+        if name == "winning_numbers":
+            fields.append(pa.field(name, pa.list_(pa.int32())))
+        elif name in ("rtp", "total_bet_amount", "total_payout", "jackpot_amount") or name.endswith("_amount"):
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.int64()))
+    return pa.schema(fields, metadata=metadata)
+
+
+class ReportData:
+    """
+    报告数据：单次遍历轮次结果得到的累计统计和趋势序列
+
+    全局和各奖级统计都来自同一次聚合；初始奖池、头奖中出次数等
+    无法从轮次结果推出的字段取自存储的汇总（没有汇总时为None）。
+    """
+
+    __slots__ = ("result", "totals", "columns")
+
+    def __init__(self, result: SimulationResult):
+        self.result = result
+        self.totals, self.columns = reduce_rounds(result.round_results)
+
+    def levels(self) -> List[Tuple[int, str]]:
+        """奖级顺序：[(奖级, 名称)]"""
+        if self.result.summary is not None:
+            return [(stat.level, stat.name) for stat in self.result.summary.prize_summary]
+        if self.result.round_results:
+            return [(stat.level, stat.name) for stat in self.result.round_results[0].prize_stats]
+        return []
+
+    def overview(self) -> Dict[str, Any]:
+        """全局统计（字段与 SimulationSummary 一致，不含各奖级汇总）"""
+        totals = self.totals
+        summary = self.result.summary
+        final_jackpot: Optional[float] = summary.final_jackpot if summary else totals.final_jackpot
+        return {
+            "total_rounds": totals.rounds,
+            "total_players": totals.players,
+            "total_bets": totals.bets,
+            "total_bet_amount": totals.bet_amount,
+            "total_payout": totals.payout,
+            "average_rtp": totals.rtp_mean,
+            "rtp_variance": totals.rtp_variance,
+            "total_winners": totals.winners,
+            "total_non_winners": totals.non_winners,
+            "winning_rate": (totals.winners / totals.players) if totals.players > 0 else 0.0,
+            "initial_jackpot": summary.initial_jackpot if summary else None,
+            "final_jackpot": final_jackpot,
+            "jackpot_hits": summary.jackpot_hits if summary else None,
+            "theoretical_rtp": summary.theoretical_rtp if summary else None,
+            "rtp_deviation": summary.rtp_deviation if summary else None,
+        }
+
+    def prizes(self) -> List[Dict[str, Any]]:
+        """
+        各奖级统计
+
+        probability 为平均理论中奖概率，hit_rate 为实际中奖人数占总玩家数的比例。
+        """
+        totals = self.totals
+        prizes = []
+        for stat in totals.prize_statistics(self.levels()):
+            prize = stat.model_dump(mode="json")
+            prize["hit_rate"] = (stat.winners_count / totals.players) if totals.players > 0 else 0.0
+            prizes.append(prize)
+        return prizes
+
+    def rtp_percent(self) -> List[float]:
+        """逐轮RTP（百分比）"""
+        return [rtp * 100 for rtp in self.columns.rtps]
+
+
+def summary_rows(data: ReportData) -> List[Tuple[str, Any]]:
+    """汇总统计表：[(指标, 数值)]"""
+    result = data.result
+    rows: List[Tuple[str, Any]] = [
+        ("模拟ID", result.simulation_id),
+        ("游戏名称", result.game_name),
+        ("状态", result.status),
+        ("开始时间", result.start_time.isoformat() if result.start_time else None),
+        ("结束时间", result.end_time.isoformat() if result.end_time else None),
+        ("耗时（秒）", result.duration),
+    ]
+    if data.totals.rounds:
+        overview = data.overview()
+        rows += [
+            ("总轮数", overview["total_rounds"]),
+            ("总玩家数", overview["total_players"]),
+            ("总投注数", overview["total_bets"]),
+            ("总投注金额", overview["total_bet_amount"]),
+            ("总派奖金额", overview["total_payout"]),
+            ("平均RTP", overview["average_rtp"]),
+            ("RTP方差", overview["rtp_variance"]),
+            ("总中奖人数", overview["total_winners"]),
+            ("总未中奖人数", overview["total_non_winners"]),
+            ("中奖率", overview["winning_rate"]),
+            ("初始奖池", overview["initial_jackpot"]),
+            ("最终奖池", overview["final_jackpot"]),
+            ("头奖中出次数", overview["jackpot_hits"]),
+        ]
+    return rows
+
+
+def prize_rows(data: ReportData) -> List[list]:
+    """奖级统计表（不含表头）"""
+    return [
+        [prize["level"], prize["name"], prize["winners_count"], prize["total_amount"], prize["probability"]]
+        for prize in data.prizes()
+    ]
+
+
+PRIZE_HEADER = ["奖级", "名称", "中奖人数", "总奖金", "中奖概率"]
+
+
+def build_json_report(result: SimulationResult) -> Dict[str, Any]:
+    """JSON报告：汇总、奖级统计和RTP趋势"""
+    data = ReportData(result)
+    rounds = data.columns.round_numbers
+    return {
+        "simulation_id": result.simulation_id,
+        "generate_time": datetime.now().isoformat(),
+        "game_name": result.game_name,
+        "status": result.status,
+        "start_time": result.start_time.isoformat() if result.start_time else None,
+        "end_time": result.end_time.isoformat() if result.end_time else None,
+        "duration": result.duration,
+        "summary": data.overview() if data.totals.rounds else None,
+        "prize_statistics": data.prizes(),
+        "charts": {
+            "rtp_trend": {
+                "type": "line",
+                "data": {"x": rounds, "y": data.rtp_percent()}
+            },
+            "jackpot_trend": {
+                "type": "line",
+                "data": {"x": rounds, "y": data.columns.jackpots}
+            }
+        }
+    }
+
+
+def build_charts(result: SimulationResult) -> List[Dict[str, Any]]:
+    """结果页图表（Plotly trace + 布局）"""
+    data = ReportData(result)
+    rounds = data.columns.round_numbers
+    prizes = data.prizes()
+    return [
+        {
+            "chart_type": "line",
+            "title": "RTP变化趋势",
+            "data": {
+                "x": rounds,
+                "y": data.rtp_percent(),
+                "type": "scatter",
+                "mode": "lines",
+                "name": "RTP"
+            },
+            "config": {
+                "layout": {
+                    "xaxis": {"title": "轮次"},
+                    "yaxis": {"title": "RTP (%)"}
+                }
+            }
+        },
+        {
+            "chart_type": "bar",
+            "title": "奖级分布",
+            "data": {
+                "x": [prize["name"] for prize in prizes],
+                "y": [prize["winners_count"] for prize in prizes],
+                "type": "bar"
+            },
+            "config": {
+                "layout": {
+                    "xaxis": {"title": "奖级"},
+                    "yaxis": {"title": "中奖人数"}
+                }
+            }
+        },
+        {
+            "chart_type": "line",
+            "title": "奖池变化趋势",
+            "data": {
+                "x": rounds,
+                "y": data.columns.jackpots,
+                "type": "scatter",
+                "mode": "lines",
+                "name": "奖池"
+            },
+            "config": {
+                "layout": {
+                    "xaxis": {"title": "轮次"},
+                    "yaxis": {"title": "奖池金额"}
+                }
+            }
+        }
+    ]
+
+
+def iter_csv(result: SimulationResult, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    """轮次明细CSV（按块输出文本）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in round_column_spec(result.round_results)])
+
+    pending = 0
+    for row in iter_round_rows(result.round_results):
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def write_excel(result: SimulationResult, path: str):
+    """
+    写入Excel报告（openpyxl 只写模式，逐行写出）
+
+    工作表：汇总统计、奖级统计、轮次明细（超过单表行数上限时续写到 轮次明细2、3…）
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    data = ReportData(result)
+
+    sheet = workbook.create_sheet("汇总统计")
+    sheet.append(["指标", "数值"])
+    for row in summary_rows(data):
+        sheet.append(list(row))
+
+    sheet = workbook.create_sheet("奖级统计")
+    sheet.append(PRIZE_HEADER)
+    for row in prize_rows(data):
+        sheet.append(row)
+
+    header = [title for _, title in round_column_spec(result.round_results)]
+    sheet_index = 1
+    sheet = workbook.create_sheet("轮次明细")
+    sheet.append(header)
+    rows_in_sheet = 1
+    for row in iter_round_rows(result.round_results):
+        if rows_in_sheet >= EXCEL_MAX_ROWS:
+            sheet_index += 1
+            sheet = workbook.create_sheet(f"轮次明细{sheet_index}")
+            sheet.append(header)
+            rows_in_sheet = 1
+        sheet.append(row)
+        rows_in_sheet += 1
+
+    workbook.save(path)
+
+
+def write_parquet(result: SimulationResult, path: str, batch_rows: int = PARQUET_BATCH_ROWS):
+    """
+    写入轮次明细Parquet（按批写入行组）
+
+    汇总统计以JSON保存在文件元数据的 "summary" 键中。
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from .serialization import dumps
+
+    names = [name for name, _ in round_column_spec(result.round_results)]
+    metadata = {"summary": dumps(result.summary.model_dump(mode="json") if result.summary else None)}
+    schema = round_schema(names, metadata)
+
+    with pq.ParquetWriter(path, schema) as writer:
+        batch: List[list] = [[] for _ in names]
+        for row in iter_round_rows(result.round_results, numbers_as_text=False):
+            for values, value in zip(batch, row):
+                values.append(value)
+            if len(batch[0]) >= batch_rows:
+                writer.write_batch(pa.record_batch(batch, schema=schema))
+                batch = [[] for _ in names]
+        if batch[0] or not result.round_results:
+            writer.write_batch(pa.record_batch(batch, schema=schema))
@@ -0,0 +1,167 @@
+"""
+HTML报告渲染
+
+使用 Jinja2 模板渲染自包含的HTML报告：
+- 趋势序列按点数预算降采样，报告大小与模拟轮数无关
+- 内联 plotly 包自带的固定版本 plotly.js，不依赖CDN，离线可用
+- 按模拟ID缓存渲染结果，结果未变化时直接复用
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..models.simulation_result import SimulationResult
+from ..utils.helpers import downsample_series
+from .report_export import ReportData
+
+if TYPE_CHECKING:
+    from jinja2 import Environment
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+_environment: Optional["Environment"] = None
+_plotly_bundle: Optional[Tuple[str, str]] = None
+_init_lock = threading.Lock()
+
+
+def get_environment() -> "Environment":
+    """模板环境（首次使用时创建，Jinja2 也在此时导入）"""
+    global _environment
+    if _environment is None:
+        with _init_lock:
+            if _environment is None:
+                from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+                _environment = Environment(
+                    loader=FileSystemLoader(TEMPLATES_DIR),
+                    autoescape=select_autoescape(["html"])
+                )
+    return _environment
+
+
+def get_plotly_bundle() -> Tuple[str, str]:
+    """plotly 包自带的 plotly.min.js 及其版本（首次使用时读取）"""
+    global _plotly_bundle
+    if _plotly_bundle is None:
+        with _init_lock:
+            if _plotly_bundle is None:
+                from plotly.offline import get_plotlyjs, get_plotlyjs_version
+                _plotly_bundle = (get_plotlyjs(), get_plotlyjs_version())
+    return _plotly_bundle
+
+
+def report_version(result: SimulationResult, max_points: int) -> Tuple[Any, ...]:
+    """报告版本标记：结果内容或渲染参数变化时不同"""
+    return (
+        result.status,
+        len(result.round_results),
+        result.end_time.isoformat() if result.end_time else None,
+        max_points,
+    )
+
+
+def _series(x, y, max_points: int) -> Dict[str, Any]:
+    sampled_x, sampled_y = downsample_series(x, y, max_points)
+    return {
+        "x": sampled_x,
+        "y": sampled_y,
+        "total_points": len(y),
+        "downsampled": len(sampled_y) < len(y)
+    }
+
+
+def build_report_context(result: SimulationResult, max_points: int) -> Dict[str, Any]:
+    """构建模板上下文（汇总、奖级统计和趋势序列来自同一次聚合）"""
+    data = ReportData(result)
+    overview = data.overview()
+    rounds = data.columns.round_numbers
+
+    prizes = []
+    for prize in data.prizes():
+        prizes.append({
+            "level": prize["level"],
+            "name": prize["name"],
+            "label": f"{prize['level']}等奖",
+            "winners_count": prize["winners_count"],
+            "total_amount": prize["total_amount"],
+            "probability": prize["hit_rate"]
+        })
+
+    plotly_js, plotly_version = get_plotly_bundle()
+    return {
+        "simulation_id": result.simulation_id,
+        "generate_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "game_name": result.game_name,
+        "status": result.status,
+        "summary": {
+            "total_rounds": overview["total_rounds"],
+            "total_bet_amount": overview["total_bet_amount"],
+            "total_payout": overview["total_payout"],
+            "average_rtp": overview["average_rtp"],
+            "final_jackpot": overview["final_jackpot"] or 0.0,
+            "total_winners": overview["total_winners"],
+        },
+        "prizes": prizes,
+        "rtp_series": _series(rounds, data.rtp_percent(), max_points),
+        "jackpot_series": _series(rounds, data.columns.jackpots, max_points),
+        "plotly_js": plotly_js,
+        "plotly_version": plotly_version,
+    }
+
+
+def render_html_report(result: SimulationResult, max_points: Optional[int] = None) -> str:
+    """渲染HTML报告"""
+    max_points = max_points or settings.REPORT_MAX_POINTS
+    template = get_environment().get_template("report.html")
+    return template.render(**build_report_context(result, max_points))
+
+
+class RenderedReportCache:
+    """按模拟ID缓存渲染好的报告（版本标记不一致时视为未命中）"""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple[Any, ...], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, simulation_id: str, version: Tuple[Any, ...]) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(simulation_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(simulation_id)
+            return entry[1]
+
+    def put(self, simulation_id: str, version: Tuple[Any, ...], html: str):
+        with self._lock:
+            self._entries[simulation_id] = (version, html)
+            self._entries.move_to_end(simulation_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, simulation_id: str):
+        with self._lock:
+            self._entries.pop(simulation_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局报告缓存实例（每份报告包含约5MB的 plotly.js，条目数不宜过多）
+report_cache = RenderedReportCache(settings.REPORT_CACHE_MAX_ENTRIES)
+
+
+def get_html_report(result: SimulationResult, max_points: Optional[int] = None) -> str:
+    """获取HTML报告（优先使用缓存）"""
+    max_points = max_points or settings.REPORT_MAX_POINTS
+    version = report_version(result, max_points)
+    html = report_cache.get(result.simulation_id, version)
+    if html is None:
+        html = render_html_report(result, max_points)
+        report_cache.put(result.simulation_id, version, html)
+    return html
@@ -0,0 +1,269 @@
+"""
+报告构建工作池与磁盘缓存
+
+报告的汇总、渲染和写文件都在独立的工作线程池中执行，不占用事件循环。
+已完成模拟的报告按 (模拟ID, 格式, 结果版本) 缓存在 REPORTS_DIR 下，
+重复下载只是一次文件发送；运行中的快照每轮都在变化，写入临时目录，发送后删除。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from ..core.compiled_game import content_hash
+from ..core.config import settings
+from ..models.simulation_result import SimulationResult
+from . import report_export
+from .report_render import get_html_report
+
+logger = logging.getLogger(__name__)
+
+
+# 导出文件的媒体类型
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# 报告格式：格式 -> (文件扩展名, 媒体类型)
+REPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "html": ("html", "text/html; charset=utf-8"),
+    "json": ("json", "application/json"),
+    "excel": ("xlsx", EXCEL_MEDIA_TYPE),
+    "csv": ("csv", "text/csv; charset=utf-8"),
+    "parquet": ("parquet", PARQUET_MEDIA_TYPE),
+}
+
+# 写入中的文件后缀（完成后原子重命名）
+PARTIAL_SUFFIX = ".partial"
+
+
+def result_version(result: SimulationResult) -> str:
+    """结果版本：结果内容或报告参数变化时不同"""
+    return content_hash([
+        result.status,
+        len(result.round_results),
+        result.end_time.isoformat() if result.end_time else None,
+        settings.REPORT_MAX_POINTS,
+    ])[:16]
+
+
+def _write_html(result: SimulationResult, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(get_html_report(result))
+
+
+def _write_json(result: SimulationResult, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report_export.build_json_report(result), f, ensure_ascii=False, indent=2)
+
+
+def _write_csv(result: SimulationResult, path: str):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in report_export.iter_csv(result):
+            f.write(chunk)
+
+
+WRITERS: Dict[str, Callable[[SimulationResult, str], None]] = {
+    "html": _write_html,
+    "json": _write_json,
+    "excel": report_export.write_excel,
+    "csv": _write_csv,
+    "parquet": report_export.write_parquet,
+}
+
+
+class ReportStore:
+    """
+    报告文件存储
+
+    - 工作线程池按需创建，同一报告并发请求只构建一次
+    - 缓存文件先写入 .partial 再原子重命名，不会读到写了一半的文件
+    - 同一模拟同一格式只保留最新版本
+    """
+
+    def __init__(self, reports_dir: str, temp_dir: str, workers: int = 2,
+                 temp_max_age: float = 3600.0):
+        self.reports_dir = reports_dir
+        self.temp_dir = temp_dir
+        self.workers = workers
+        self.temp_max_age = temp_max_age
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._last_reap = 0.0
+        self._queued = 0  # 已提交但尚未开始执行的任务数
+        self._queued_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """报告构建线程池（首次使用时创建）"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="report"
+                    )
+        return self._executor
+
+    def queue_depth(self) -> int:
+        """已提交但尚未开始执行的任务数"""
+        return self._queued
+
+    def submit(self, func: Callable, *args) -> Future:
+        """提交到报告线程池（记录等待执行的任务数）"""
+        executor = self.executor
+
+        def task():
+            with self._queued_lock:
+                self._queued -= 1
+            return func(*args)
+
+        with self._queued_lock:
+            self._queued += 1
+        try:
+            future = executor.submit(task)
+        except Exception:
+            with self._queued_lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(self._on_cancelled)
+        return future
+
+    def _on_cancelled(self, future: Future):
+        """取消的任务不会执行，不再计入等待数"""
+        if future.cancelled():
+            with self._queued_lock:
+                self._queued -= 1
+
+    async def run(self, func: Callable, *args):
+        """在报告线程池中执行"""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def cache_path(self, simulation_id: str, format: str, version: str) -> str:
+        extension, _ = REPORT_FORMATS[format]
+        return os.path.join(self.reports_dir, simulation_id, f"{format}-{version}.{extension}")
+
+    async def get_file(self, result: SimulationResult, format: str) -> Tuple[str, bool]:
+        """
+        获取报告文件
+
+        Returns:
+            (文件路径, 是否为临时文件)；临时文件由调用方在发送后删除
+        """
+        self.maybe_reap()
+
+        if result.status == "running":
+            extension, _ = REPORT_FORMATS[format]
+            return await self.run(self._build_temp, result, format, extension), True
+
+        path = self.cache_path(result.simulation_id, format, result_version(result))
+        if os.path.exists(path):
+            return path, False
+
+        with self._lock:
+            future = self._pending.get(path)
+            if future is None:
+                future = self.submit(self._build_cached, result, format, path)
+                self._pending[path] = future
+                future.add_done_callback(lambda _: self._forget(path))
+        return await asyncio.wrap_future(future), False
+
+    def _forget(self, path: str):
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def _build_temp(self, result: SimulationResult, format: str, extension: str) -> str:
+        os.makedirs(self.temp_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=f".{extension}", dir=self.temp_dir)
+        os.close(fd)
+        try:
+            WRITERS[format](result, path)
+        except Exception:
+            remove_file(path)
+            raise
+        return path
+
+    def _build_cached(self, result: SimulationResult, format: str, path: str) -> str:
+        if os.path.exists(path):
+            return path
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        partial = f"{path}.{threading.get_ident()}{PARTIAL_SUFFIX}"
+        try:
+            WRITERS[format](result, partial)
+            os.replace(partial, path)
+        except Exception:
+            remove_file(partial)
+            raise
+
+        # 删除同一格式的旧版本
+        prefix = f"{format}-"
+        for name in os.listdir(directory):
+            old = os.path.join(directory, name)
+            if name.startswith(prefix) and old != path and not name.endswith(PARTIAL_SUFFIX):
+                remove_file(old)
+        return path
+
+    def discard(self, simulation_id: str):
+        """删除模拟的全部缓存报告（结果被删除时调用）"""
+        shutil.rmtree(os.path.join(self.reports_dir, simulation_id), ignore_errors=True)
+
+    def maybe_reap(self):
+        """距上次清理超过 temp_max_age 的一半时，在报告线程池中清理过期文件（不等待完成）"""
+        now = time.time()
+        if now - self._last_reap >= self.temp_max_age / 2:
+            self._last_reap = now
+            self.submit(self.reap)
+
+    def reap(self) -> int:
+        """
+        清理过期文件：临时目录中超过 temp_max_age 的文件，
+        以及报告目录中中断写入遗留的 .partial 文件
+
+        Returns:
+            删除的文件数
+        """
+        cutoff = time.time() - self.temp_max_age
+        removed = 0
+        candidates = []
+        if os.path.isdir(self.temp_dir):
+            candidates += [os.path.join(self.temp_dir, name) for name in os.listdir(self.temp_dir)]
+        if os.path.isdir(self.reports_dir):
+            for root, _, files in os.walk(self.reports_dir):
+                candidates += [os.path.join(root, name) for name in files if name.endswith(PARTIAL_SUFFIX)]
+
+        for path in candidates:
+            try:
+                if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"清理过期报告文件 {removed} 个")
+        return removed
+
+
+def remove_file(path: str):
+    """删除文件（不存在时忽略）"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# 全局报告存储实例
+report_store = ReportStore(
+    settings.REPORTS_DIR,
+    settings.TEMP_DIR,
+    workers=settings.REPORT_WORKERS,
+    temp_max_age=settings.TEMP_FILE_MAX_AGE
+)
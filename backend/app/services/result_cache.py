@@ -0,0 +1,85 @@
+"""
+固定种子模拟的结果缓存
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ..models.game_config import GameConfiguration
+from ..core.compiled_game import compile_game, content_hash
+from ..core.simulation_engine import ENGINE_VERSION
+
+
+def result_cache_key(game_config: GameConfiguration) -> Optional[str]:
+    """
+    计算结果缓存键
+
+    只有固定种子的模拟结果可复现，未设置种子时返回None（不缓存）。
+    键由游戏规则、模拟参数的规范化内容哈希和引擎版本组成。
+    """
+    if game_config.simulation_config.seed is None:
+        return None
+    return content_hash({
+        "engine_version": ENGINE_VERSION,
+        "game": compile_game(game_config).content_hash
+    })
+
+
+class ResultCache:
+    """
+    内容寻址的结果缓存：缓存键 -> 模拟ID
+
+    结果本身仍保存在模拟结果存储中，这里只记录相同配置已完成（或正在运行）的模拟。
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """获取缓存键对应的模拟ID"""
+        with self._lock:
+            simulation_id = self._entries.get(key)
+            if simulation_id is not None:
+                self._entries.move_to_end(key)
+            return simulation_id
+
+    def put(self, key: str, simulation_id: str):
+        """记录缓存键对应的模拟ID"""
+        with self._lock:
+            self._entries[key] = simulation_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_lookup(self, hit: bool):
+        """记录命中统计"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def discard(self, key: str):
+        """移除缓存键"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_simulation(self, simulation_id: str):
+        """移除指向指定模拟的所有缓存键（结果被删除时调用）"""
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v == simulation_id]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计"""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# 全局结果缓存实例
+result_cache = ResultCache()
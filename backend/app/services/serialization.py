@@ -0,0 +1,243 @@
+"""
+模拟结果序列化与内容协商
+
+支持的格式：
+- json: orjson 编码（未安装时退回标准库 json），轮次结果分块流式编码，可 gzip 压缩
+- msgpack: MessagePack（需要 msgpack）
+- arrow: Apache Arrow IPC 流，轮次结果按列存储（需要 pyarrow）
+"""
+
+import gzip
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+from ..models.simulation_result import RoundResult, SimulationResult
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# 格式名 -> 媒体类型
+FORMAT_MEDIA_TYPES = {
+    "json": JSON_MEDIA_TYPE,
+    "msgpack": MSGPACK_MEDIA_TYPE,
+    "arrow": ARROW_MEDIA_TYPE,
+}
+
+# Accept 头中可识别的媒体类型 -> 格式名
+_ACCEPT_FORMATS = {
+    JSON_MEDIA_TYPE: "json",
+    MSGPACK_MEDIA_TYPE: "msgpack",
+    "application/msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+    ARROW_MEDIA_TYPE: "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+    "application/*": "json",
+    "*/*": "json",
+}
+
+# 流式编码时每块包含的轮次数
+ROUND_CHUNK_SIZE = 1000
+
+class UnsupportedFormatError(ValueError):
+    """请求的格式不受支持或缺少对应的依赖"""
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    选择响应格式
+
+    显式的 format 参数优先，否则按 Accept 头的 q 值选择第一个支持的格式；
+    未提供 Accept 时使用 json。
+
+    Raises:
+        UnsupportedFormatError: 没有可接受的格式
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in FORMAT_MEDIA_TYPES:
+            raise UnsupportedFormatError(f"不支持的格式: {requested}")
+        return requested
+
+    if not accept:
+        return "json"
+
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        fields = [field.strip() for field in part.split(";")]
+        media_type = fields[0].lower()
+        quality = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0 and media_type in _ACCEPT_FORMATS:
+            candidates.append((-quality, position, _ACCEPT_FORMATS[media_type]))
+
+    if not candidates:
+        raise UnsupportedFormatError(f"不支持的 Accept: {accept}")
+    return min(candidates)[2]
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """客户端是否接受 gzip 编码"""
+    if not accept_encoding:
+        return False
+    for part in accept_encoding.split(","):
+        fields = [field.strip() for field in part.split(";")]
+        if fields[0].lower() == "gzip":
+            return "q=0" not in fields[1:]
+    return False
+
+
+def dumps(data: Any) -> bytes:
+    """编码为JSON字节串（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    """gzip 压缩"""
+    return gzip.compress(data, compresslevel=6)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """流式 gzip 压缩"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def round_to_dict(round_result: RoundResult) -> Dict[str, Any]:
+    """轮次结果转为字典（与 model_dump(mode="json") 一致，但不经过 pydantic 序列化）"""
+    return {
+        "round_number": round_result.round_number,
+        "players_count": round_result.players_count,
+        "total_bets": round_result.total_bets,
+        "total_bet_amount": round_result.total_bet_amount,
+        "total_payout": round_result.total_payout,
+        "rtp": round_result.rtp,
+        "jackpot_amount": round_result.jackpot_amount,
+        "prize_stats": [
+            {
+                "level": stat.level,
+                "name": stat.name,
+                "winners_count": stat.winners_count,
+                "total_amount": stat.total_amount,
+                "probability": stat.probability
+            }
+            for stat in round_result.prize_stats
+        ],
+        "winning_numbers": round_result.winning_numbers,
+        "winners_count": round_result.winners_count,
+        "non_winners_count": round_result.non_winners_count
+    }
+
+
+def result_header(result: SimulationResult) -> Dict[str, Any]:
+    """结果中除轮次结果以外的部分"""
+    return result.model_dump(mode="json", exclude={"round_results"})
+
+
+def iter_result_json(result: SimulationResult, chunk_size: int = ROUND_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    流式编码完整结果为JSON
+
+    先输出结果头，再按块输出轮次结果，避免一次性构建整个结果字典和字符串。
+    """
+    header = dumps(result_header(result))
+    # 去掉结果头的结尾 "}"，追加轮次结果数组
+    yield header[:-1] + b',"round_results":['
+
+    rounds = result.round_results
+    for start in range(0, len(rounds), chunk_size):
+        chunk = dumps([round_to_dict(r) for r in rounds[start:start + chunk_size]])[1:-1]
+        yield (b"," + chunk) if start else chunk
+    yield b"]}"
+
+
+def result_to_msgpack(result: SimulationResult) -> bytes:
+    """编码完整结果为 MessagePack"""
+    msgpack = _require("msgpack")
+    data = result_header(result)
+    data["round_results"] = [round_to_dict(r) for r in result.round_results]
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def data_to_msgpack(data: Any) -> bytes:
+    """编码任意JSON兼容数据为 MessagePack"""
+    msgpack = _require("msgpack")
+    return msgpack.packb(data, use_bin_type=True, default=str)
+
+
+def round_columns(round_results: List[RoundResult]) -> Dict[str, list]:
+    """轮次结果按列展开（列定义见 report_export.round_column_spec，开奖号码为列表列）"""
+    from .report_export import round_column_spec, iter_round_rows
+
+    names = [name for name, _ in round_column_spec(round_results)]
+    columns: Dict[str, list] = {name: [] for name in names}
+    lists = [columns[name] for name in names]
+    for row in iter_round_rows(round_results, numbers_as_text=False):
+        for values, value in zip(lists, row):
+            values.append(value)
+    return columns
+
+
+def columns_to_arrow(columns: Dict[str, list], metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    列数据编码为 Arrow IPC 流
+
+    metadata 以JSON形式保存在 schema 元数据的 "metadata" 键中。
+    """
+    pa = _require("pyarrow")
+    table = pa.table(columns)
+    if metadata is not None:
+        table = table.replace_schema_metadata({"metadata": dumps(metadata)})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def result_to_arrow(result: SimulationResult) -> bytes:
+    """编码完整结果为 Arrow IPC 流（轮次结果为列，其余部分为 schema 元数据）"""
+    return columns_to_arrow(round_columns(result.round_results), result_header(result))
+
+
+def chart_to_arrow(payload: Dict[str, Any]) -> bytes:
+    """
+    编码图表数据为 Arrow IPC 流
+
+    rtp_trend / jackpot_trend 为列（round 列为轮次），其余字段（奖级分布、汇总等）为 schema 元数据。
+    """
+    chart_data = dict(payload.get("chart_data") or {})
+    rtp_trend = chart_data.pop("rtp_trend", [])
+    jackpot_trend = chart_data.pop("jackpot_trend", [])
+    first_round = chart_data.get("from_round", 1)
+    rounds = chart_data.pop("round_labels", None) or list(range(first_round, first_round + len(rtp_trend)))
+
+    metadata = dict(payload)
+    metadata["chart_data"] = chart_data
+    return columns_to_arrow({"round": rounds, "rtp": rtp_trend, "jackpot": jackpot_trend}, metadata)
+
+
+def _require(module_name: str):
+    """导入可选依赖，缺失时视为不支持的格式"""
+    try:
+        return __import__(module_name)
+    except ImportError:
+        raise UnsupportedFormatError(f"服务端未安装 {module_name}，不支持该格式")
@@ -4,8 +4,8 @@
 
 import math
 import random
-import numpy as np
-from typing import List, Dict, Any, Optional
+import sys
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 
@@ -218,10 +218,13 @@ def convert_to_native_types(obj: Any) -> Any:
     Returns:
         转换后的对象
     """
-    if isinstance(obj, (np.int64, np.int32, np.int16, np.int8)):
-        return int(obj)
-    if isinstance(obj, (np.float64, np.float32)):
-        return float(obj)
+    # NumPy 尚未导入时不可能出现 NumPy 类型，不为此导入 NumPy
+    np = sys.modules.get("numpy")
+    if np is not None:
+        if isinstance(obj, (np.int64, np.int32, np.int16, np.int8)):
+            return int(obj)
+        if isinstance(obj, (np.float64, np.float32)):
+            return float(obj)
     if isinstance(obj, dict):
         return {key: convert_to_native_types(value) for key, value in obj.items()}
     if isinstance(obj, list):
@@ -249,3 +252,149 @@ def estimate_simulation_time(rounds: int, players_range: tuple, bets_range: tupl
     estimated_seconds = total_operations / 1_000_000
     
     return max(1.0, estimated_seconds)  # 至少1秒
+
+
+def downsample_series(x: List[float], y: List[float], max_points: int) -> Tuple[List[float], List[float]]:
+    """
+    按点数预算对序列降采样（分桶保留每桶的最小值和最大值）
+
+    保留首尾点和每个桶内的极值，折线的峰谷形状不会因降采样而被抹平。
+
+    Args:
+        x: 横坐标序列
+        y: 纵坐标序列
+        max_points: 输出的最大点数（至少为4）
+
+    Returns:
+        降采样后的 (x, y)
+    """
+    n = len(y)
+    if n <= max_points:
+        return list(x), list(y)
+
+    import numpy as np
+
+    values = np.asarray(y, dtype=float)
+    buckets = max(1, (max(max_points, 4) - 2) // 2)
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+
+    indices = [0]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        segment = values[start:end]
+        low = start + int(np.argmin(segment))
+        high = start + int(np.argmax(segment))
+        indices.extend((low, high) if low <= high else (high, low))
+    indices.append(n - 1)
+
+    # 去掉桶内最小值与最大值相同的重复点
+    indices = sorted(set(indices))
+    return [x[i] for i in indices], [y[i] for i in indices]
+
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    """不完全Beta函数的连分式展开（Lentz算法）"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 301):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 3e-14:
+            break
+    return h
+
+
+def regularized_incomplete_beta(a: float, b: float, x: float) -> float:
+    """
+    正则化不完全Beta函数 I_x(a, b)
+
+    Args:
+        a, b: 形状参数（大于0）
+        x: 取值 [0, 1]
+
+    Returns:
+        I_x(a, b)
+    """
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    )
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - front * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def student_t_two_sided_p(t: float, df: float) -> float:
+    """
+    t 分布的双侧 p 值 P(|T| >= |t|)
+
+    自由度很大时 t 分布与标准正态分布无实际差别，直接使用正态近似。
+
+    Args:
+        t: t 统计量
+        df: 自由度
+
+    Returns:
+        双侧 p 值
+    """
+    if math.isinf(t):
+        return 0.0
+    if df > 1e5:
+        return math.erfc(abs(t) / math.sqrt(2.0))
+    return regularized_incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+
+
+def welch_t_test(mean1: float, var1: float, n1: int,
+                 mean2: float, var2: float, n2: int) -> Dict[str, Optional[float]]:
+    """
+    Welch t 检验（两组方差不必相等）
+
+    Args:
+        mean1, var1, n1: 第一组的均值、样本方差（无偏）和样本数
+        mean2, var2, n2: 第二组的均值、样本方差（无偏）和样本数
+
+    Returns:
+        {"t": t统计量, "df": Welch-Satterthwaite 自由度, "p_value": 双侧p值, "std_error": 均值差的标准误}
+        任一组样本数少于2时各项为None；两组都没有波动且均值不同时t为None（无穷大，不能输出为JSON）
+    """
+    if n1 < 2 or n2 < 2:
+        return {"t": None, "df": None, "p_value": None, "std_error": None}
+
+    # 浮点误差可能使方差略小于0
+    se1 = max(var1, 0.0) / n1
+    se2 = max(var2, 0.0) / n2
+    std_error = math.sqrt(se1 + se2)
+    diff = mean1 - mean2
+    if std_error == 0.0:
+        # 两组都没有波动：均值相同则无差异，不同则差异确定
+        return {
+            "t": 0.0 if diff == 0 else None,
+            "df": float(n1 + n2 - 2),
+            "p_value": 1.0 if diff == 0 else 0.0,
+            "std_error": 0.0
+        }
+
+    t = diff / std_error
+    df = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+    return {"t": t, "df": df, "p_value": student_t_two_sided_p(t, df), "std_error": std_error}
+
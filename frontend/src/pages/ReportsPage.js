@@ -129,6 +129,22 @@ const ReportsPage = () => {
       >
         下载JSON
       </Menu.Item>
+      <Menu.Item
+        key="csv"
+        icon={<FileExcelOutlined />}
+        onClick={() => handleDownloadReport(record.simulation_id, 'csv')}
+        disabled={record.status !== 'completed'}
+      >
+        下载CSV明细
+      </Menu.Item>
+      <Menu.Item
+        key="parquet"
+        icon={<FileTextOutlined />}
+        onClick={() => handleDownloadReport(record.simulation_id, 'parquet')}
+        disabled={record.status !== 'completed'}
+      >
+        下载Parquet明细
+      </Menu.Item>
     </Menu>
   );
 
@@ -238,6 +254,20 @@ const ReportsPage = () => {
       description: '原始数据格式，便于程序处理',
       icon: <FilePdfOutlined style={{ fontSize: '24px', color: '#722ed1' }} />,
       features: ['原始数据', '程序友好', '结构化']
+    },
+    {
+      key: 'csv',
+      name: 'CSV明细',
+      description: '逐轮明细数据，流式导出',
+      icon: <FileExcelOutlined style={{ fontSize: '24px', color: '#faad14' }} />,
+      features: ['逐轮数据', '通用格式', '大数据量']
+    },
+    {
+      key: 'parquet',
+      name: 'Parquet明细',
+      description: '列式存储的逐轮明细，便于数据分析工具读取',
+      icon: <FileTextOutlined style={{ fontSize: '24px', color: '#13c2c2' }} />,
+      features: ['列式存储', '体积小', 'pandas/Arrow直接读取']
     }
   ];
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import {
   Card,
   Button,
@@ -39,12 +39,31 @@ const { Option } = Select;
 const { TabPane } = Tabs;
 const { Panel } = Collapse;
 
+// 推送连接连续失败的次数上限（超过后退回轮询）
+const MAX_STREAM_ERRORS = 3;
+
+// 将增量图表数据（from_round 起的新数据点）合并到已有图表数据，重复的轮次以新数据为准
+const mergeChartDelta = (chart, delta) => {
+  const keep = delta.from_round - 1;
+  const rtpTrend = (chart?.rtp_trend || []).slice(0, keep).concat(delta.rtp_trend);
+  const jackpotTrend = (chart?.jackpot_trend || []).slice(0, keep).concat(delta.jackpot_trend);
+  const { from_round, to_round, ...aggregates } = delta;
+  return {
+    ...chart,
+    ...aggregates,
+    rtp_trend: rtpTrend,
+    jackpot_trend: jackpotTrend,
+    round_labels: rtpTrend.map((_, index) => index + 1)
+  };
+};
+
 const SimulationPage = () => {
   const [configs, setConfigs] = useState([]);
   const [selectedConfig, setSelectedConfig] = useState(null);
   const [simulation, setSimulation] = useState(null);
   const [progress, setProgress] = useState(null);
   const [realtimeData, setRealtimeData] = useState(null);
+  const chartRoundsRef = useRef(0); // 图表中已有的轮次数（增量请求的 since_round）
   const [loading, setLoading] = useState(false);
   const [activeTab, setActiveTab] = useState('existing'); // 'existing' 或 'new'
   const [configForm] = Form.useForm();
@@ -60,16 +79,27 @@ const SimulationPage = () => {
 
 
 
+  // 合并增量实时数据（只追加新数据点，不重绘整个序列）
+  const applyRealtimeData = useCallback((data) => {
+    setRealtimeData(prev => {
+      const chartData = mergeChartDelta(prev?.chart_data, data.chart_data);
+      chartRoundsRef.current = chartData.rtp_trend.length;
+      return { ...data, chart_data: chartData };
+    });
+  }, []);
+
   const fetchRealtimeData = useCallback(async () => {
     if (!simulation) return;
 
     try {
-      const response = await axios.get(`/api/v1/simulation/realtime-data/${simulation.simulation_id}`);
-      setRealtimeData(response.data);
+      const response = await axios.get(`/api/v1/simulation/realtime-data/${simulation.simulation_id}`, {
+        params: { since_round: chartRoundsRef.current }
+      });
+      applyRealtimeData(response.data);
     } catch (error) {
       console.error('获取实时数据失败:', error);
     }
-  }, [simulation]);
+  }, [simulation, applyRealtimeData]);
 
   const fetchProgress = useCallback(async () => {
     if (!simulation) return;
@@ -92,25 +122,71 @@ const SimulationPage = () => {
     fetchConfigs();
   }, []);
 
+  // 推送的进度事件：更新进度并追加图表数据点
+  const applyProgressEvent = useCallback((event) => {
+    const { delta, ...progressData } = event;
+    setProgress(progressData);
+    if (!delta) return;
+
+    applyRealtimeData({
+      simulation_id: event.simulation_id,
+      status: event.status,
+      current_round: event.current_round,
+      chart_data: delta
+    });
+  }, [applyRealtimeData]);
+
   useEffect(() => {
     let progressInterval;
     let dataInterval;
+    let eventSource;
 
-    if (simulation && (simulation.status === 'running' || simulation.status === 'started')) {
+    // 退回轮询（浏览器不支持或推送连接失败时）
+    const startPolling = () => {
+      if (progressInterval) return;
       // 每秒更新进度
       progressInterval = setInterval(fetchProgress, 1000);
       // 每2秒更新实时数据
       dataInterval = setInterval(fetchRealtimeData, 2000);
+    };
+
+    if (simulation && (simulation.status === 'running' || simulation.status === 'started')) {
+      if (typeof EventSource !== 'undefined') {
+        // 服务端推送：引擎每隔若干轮推送一次增量进度
+        eventSource = new EventSource(`/api/v1/simulation/stream/${simulation.simulation_id}`);
+        eventSource.addEventListener('progress', (e) => applyProgressEvent(JSON.parse(e.data)));
+        eventSource.addEventListener('completed', (e) => {
+          eventSource.close();
+          setProgress(JSON.parse(e.data));
+          setSimulation(prev => ({ ...prev, status: 'completed' }));
+        });
+        // 连接断开时由浏览器自动重连（带 Last-Event-ID，服务端只补发缺失的数据点），
+        // 连接被关闭或连续多次失败后才退回轮询
+        let streamErrors = 0;
+        eventSource.onopen = () => {
+          streamErrors = 0;
+        };
+        eventSource.onerror = () => {
+          streamErrors += 1;
+          if (eventSource.readyState === EventSource.CLOSED || streamErrors >= MAX_STREAM_ERRORS) {
+            eventSource.close();
+            startPolling();
+          }
+        };
+      } else {
+        startPolling();
+      }
     } else if (simulation && simulation.status === 'completed') {
       // 模拟完成后，获取一次最终的实时数据
       fetchRealtimeData();
     }
 
     return () => {
+      if (eventSource) eventSource.close();
       if (progressInterval) clearInterval(progressInterval);
       if (dataInterval) clearInterval(dataInterval);
     };
-  }, [simulation, fetchProgress, fetchRealtimeData]);
+  }, [simulation, fetchProgress, fetchRealtimeData, applyProgressEvent]);
 
   const handleStartSimulation = async () => {
     if (!selectedConfig) {
@@ -120,19 +196,18 @@ const SimulationPage = () => {
 
     setLoading(true);
     try {
-      // 加载配置详情
-      const configResponse = await axios.get(`/api/v1/config/load/${selectedConfig}`);
-      const config = configResponse.data.config;
-
-      // 启动模拟
+      // 按名称启动模拟（后端使用缓存的已验证配置）
+      const configInfo = configs.find(c => c.name === selectedConfig);
       const simulationResponse = await axios.post('/api/v1/simulation/start', {
-        game_config: config.game_rules,
-        simulation_config: config.simulation_config
+        config_name: selectedConfig,
+        config_updated_at: configInfo?.updated_at || null
       });
 
+      chartRoundsRef.current = 0;
+      setRealtimeData(null);
       setSimulation(simulationResponse.data);
       setProgress({ progress_percentage: 0, current_round: 0 });
-      message.success('模拟已启动');
+      message.success(simulationResponse.data.cached ? '已复用相同配置和种子的模拟结果' : '模拟已启动');
     } catch (error) {
       message.error('启动模拟失败: ' + (error.response?.data?.detail || error.message));
     } finally {
@@ -179,9 +254,11 @@ const SimulationPage = () => {
         simulation_config: simulationConfig
       });
 
+      chartRoundsRef.current = 0;
+      setRealtimeData(null);
       setSimulation(simulationResponse.data);
       setProgress({ progress_percentage: 0, current_round: 0 });
-      message.success('模拟已启动');
+      message.success(simulationResponse.data.cached ? '已复用相同配置和种子的模拟结果' : '模拟已启动');
     } catch (error) {
       if (error.errorFields) {
         message.error('请检查配置表单中的错误');
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+测试分析接口（逐轮分布、奖池周期）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.api.simulation import simulation_results
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "分布分析测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 80,
+        "players_range": [10, 20],
+        "bets_range": [1, 2]
+    }
+}
+
+
+def test_distributions_endpoint(api_client):
+    """分布统计随模拟增量维护，保存在结果中"""
+    simulation_id = api_client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+    result = simulation_results[simulation_id]
+
+    response = api_client.get(f"/api/v1/analytics/{simulation_id}/distributions")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["completed_rounds"] == 80
+    distributions = data["distributions"]
+    assert sorted(distributions) == ["jackpot", "payout", "players", "rtp"]
+
+    rtps = [r.rtp for r in result.round_results]
+    rtp = distributions["rtp"]
+    assert rtp["count"] == 80
+    assert (rtp["min"], rtp["max"]) == (min(rtps), max(rtps))
+    assert rtp["min"] <= rtp["quantiles"]["p5"] <= rtp["quantiles"]["p50"] <= rtp["quantiles"]["p95"] <= rtp["max"]
+
+    # 玩家数每个取值一箱
+    players = distributions["players"]["histogram"]
+    assert len(players["counts"]) == 11
+    assert players["counts"][5] == sum(1 for r in result.round_results if r.players_count == 15)
+
+    filtered = api_client.get(f"/api/v1/analytics/{simulation_id}/distributions?metrics=rtp,players").json()
+    assert sorted(filtered["distributions"]) == ["players", "rtp"]
+    assert api_client.get(f"/api/v1/analytics/{simulation_id}/distributions?metrics=bogus").status_code == 400
+    assert api_client.get("/api/v1/analytics/unknown/distributions").status_code == 404
+
+
+def test_jackpot_cycles_endpoint(api_client):
+    """奖池周期统计随结果保存，阶段时长覆盖全部轮次"""
+    simulation_id = api_client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+    result = simulation_results[simulation_id]
+
+    response = api_client.get(f"/api/v1/analytics/{simulation_id}/jackpot-cycles")
+    assert response.status_code == 200
+    cycles = response.json()["jackpot_cycles"]
+    assert cycles["enabled"] is True
+
+    hits = [r.round_number for r in result.round_results if r.prize_stats[0].winners_count > 0]
+    assert cycles["completed_cycles"] == len(hits)
+    assert [c["hit_round"] for c in cycles["recent_cycles"]] == hits[-100:]
+    phases = cycles["time_in_phase"]
+    assert phases["return_phase_rounds"] + phases["post_return_rounds"] == 80
+
+    assert api_client.get("/api/v1/analytics/unknown/jackpot-cycles").status_code == 404
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_analytics.py")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+测试分布式模拟协调（分片租约、部分汇总合并、失败重试）
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import pytest
+
+from app.api.simulation import simulation_results
+from app.core import sharding
+from app.core.compiled_game import parse_game_config
+from app.core.sharding import plan_shards, run_shard, run_partial_shard, merge_shards
+from app.services.cluster import ClusterCoordinator, LeaseLost
+from app.services.cluster_worker import ClusterWorker
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "分布式测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 300.0}
+    },
+    "simulation_config": {
+        "rounds": 300,
+        "players_range": [1, 5],
+        "bets_range": [1, 2],
+        "seed": 21
+    }
+}
+
+
+def game_config():
+    return parse_game_config({"game_rules": REQUEST["game_config"], "simulation_config": REQUEST["simulation_config"]})
+
+
+def test_workers_merge_partial_summaries(api_client):
+    """工作节点运行全部分片，合并的汇总与本地分片运行一致"""
+    response = api_client.post("/api/v1/cluster/jobs?shards=3", json=REQUEST)
+    assert response.status_code == 200
+    simulation_id = response.json()["simulation_id"]
+
+    workers = [ClusterWorker(api_client, worker_id=f"w{i}", poll_interval=0.0, max_idle=0.0) for i in range(2)]
+    assert workers[0].run() == 3
+    assert workers[1].run() == 0
+
+    job = api_client.get(f"/api/v1/cluster/jobs/{simulation_id}").json()
+    assert job["status"] == "completed" and job["completed_rounds"] == 300
+
+    result = api_client.get(f"/api/v1/simulation/result/{simulation_id}").json()
+    config = game_config().model_dump(mode="json")
+    shards = plan_shards(300, 3, 21)
+    expected = merge_shards(config, [run_shard(config, s["rounds"], s["seed"]) for s in shards],
+                            simulation_id, datetime.now()).summary
+
+    summary = result["summary"]
+    assert summary["total_rounds"] == expected.total_rounds
+    assert summary["total_bet_amount"] == pytest.approx(expected.total_bet_amount)
+    assert summary["total_payout"] == pytest.approx(expected.total_payout)
+    assert summary["average_rtp"] == pytest.approx(expected.average_rtp)
+    assert summary["rtp_variance"] == pytest.approx(expected.rtp_variance)
+    assert summary["jackpot_hits"] == expected.jackpot_hits
+    assert [p["winners_count"] for p in summary["prize_summary"]] == [p.winners_count for p in expected.prize_summary]
+
+    assert api_client.post("/api/v1/cluster/lease", json={"worker_id": "w0"}).status_code == 204
+
+
+def test_partial_shard_keeps_no_round_results(monkeypatch):
+    """部分汇总的分片不保存轮次结果，汇总与保存轮次结果时一致"""
+    engines = []
+    engine_class = sharding.UniversalSimulationEngine
+
+    def tracked_engine(*args, **kwargs):
+        engines.append(engine_class(*args, **kwargs))
+        return engines[-1]
+
+    monkeypatch.setattr(sharding, "UniversalSimulationEngine", tracked_engine)
+    config = game_config().model_dump(mode="json")
+    partial = run_partial_shard(config, 50, 3)
+
+    [engine] = engines
+    assert engine.round_results == [] and engine.totals.rounds == 50
+    assert partial == sharding._run_engine(config, 50, 3, None).totals.to_dict()
+
+
+def test_expired_leases_and_failures():
+    """租约过期后重新分配，重复提交被忽略，超过重试次数任务失败"""
+    now = [0.0]
+    finished = []
+    coordinator = ClusterCoordinator(lease_seconds=10.0, max_attempts=2,
+                                     on_finished=lambda job, result: finished.append(result),
+                                     clock=lambda: now[0])
+    job = coordinator.submit(game_config(), 2)
+
+    first = coordinator.lease("a")
+    second = coordinator.lease("b")
+    assert (first["shard_index"], second["shard_index"]) == (0, 1)
+    assert coordinator.lease("c") is None
+
+    # 节点 a 失联，租约过期后分片 0 交给节点 c
+    now[0] = 11.0
+    coordinator.heartbeat(job.simulation_id, 1, "b", 50)
+    retry = coordinator.lease("c")
+    assert retry["shard_index"] == 0 and retry["seed"] == first["seed"]
+    with pytest.raises(LeaseLost):
+        coordinator.heartbeat(job.simulation_id, 0, "a", 10)
+
+    partial = run_partial_shard(job.config, retry["rounds"], retry["seed"])
+    coordinator.complete(job.simulation_id, 0, "a", partial)  # 原节点晚到的结果同样有效
+    coordinator.complete(job.simulation_id, 0, "c", partial)  # 重复提交被忽略
+    with pytest.raises(ValueError):
+        coordinator.complete(job.simulation_id, 1, "b", dict(partial, rtp=[1, 0.0, 0.0]))
+
+    coordinator.fail(job.simulation_id, 1, "b", "内存不足")
+    assert coordinator.lease("b")["shard_index"] == 1
+    coordinator.fail(job.simulation_id, 1, "b", "内存不足")
+    assert job.status == "error"
+    assert finished[0].status == "error" and "内存不足" in finished[0].error_message
+
+
+def test_expired_leases_exhaust_attempts():
+    """分片的租约反复过期，达到重试次数后不再分配，任务失败"""
+    now = [0.0]
+    finished = []
+    coordinator = ClusterCoordinator(lease_seconds=10.0, max_attempts=2,
+                                     on_finished=lambda job, result: finished.append(result),
+                                     clock=lambda: now[0])
+    job = coordinator.submit(game_config(), 1)
+
+    assert coordinator.lease("a")["shard_index"] == 0
+    now[0] = 11.0
+    assert coordinator.lease("b")["shard_index"] == 0
+    now[0] = 22.0
+    assert coordinator.lease("c") is None
+
+    assert job.status == "error"
+    assert job.shards[0].attempts == 2
+    assert "租约过期" in job.error_message
+    assert [result.status for result in finished] == ["error"]
+    assert coordinator.lease("c") is None
+    assert len(finished) == 1
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_cluster.py")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+测试自包含、降采样的HTML报告
+"""
+
+import sys
+import os
+import json
+import re
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.api.simulation import simulation_results
+from app.services import report_render
+from app.utils.helpers import downsample_series
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "HTML报告测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 60,
+        "players_range": [10, 20],
+        "bets_range": [1, 2]
+    }
+}
+
+
+def test_downsample_keeps_extremes_within_budget():
+    """降采样不超过点数预算，保留首尾点和极值"""
+    x = list(range(100_000))
+    y = [(i % 997) * 0.001 for i in x]
+    y[12345] = 50.0
+    y[54321] = -50.0
+
+    sampled_x, sampled_y = downsample_series(x, y, 500)
+    assert len(sampled_y) <= 500
+    assert sampled_x[0] == 0 and sampled_x[-1] == 99_999
+    assert sampled_x == sorted(sampled_x)
+    assert 50.0 in sampled_y and -50.0 in sampled_y
+
+    assert downsample_series([1, 2, 3], [4, 5, 6], 500) == ([1, 2, 3], [4, 5, 6])
+
+
+def test_html_report_is_self_contained_and_bounded(api_client):
+    """报告内联 plotly.js，不引用CDN，趋势线点数受预算限制"""
+    simulation_id = api_client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+    result = simulation_results[simulation_id]
+
+    html = report_render.render_html_report(result, max_points=20)
+    assert "<script src=" not in html.replace("'", '"')
+    _, plotly_version = report_render.get_plotly_bundle()
+    assert f"plotly.js {plotly_version}" in html
+
+    rtp_x = json.loads(re.search(r"x: (\[[^\]]*\]),\s*y: \[[^\]]*\],\s*type: 'scatter',\s*mode: 'lines',\s*name: 'RTP'", html).group(1))
+    assert len(rtp_x) <= 20
+    assert "降采样为" in html
+    assert "HTML报告测试" in html
+
+    response = api_client.get(f"/api/v1/reports/generate/{simulation_id}?format=html")
+    assert response.headers["content-type"].startswith("text/html")
+    assert "二等奖" in response.text
+
+    assert api_client.get("/api/v1/reports/generate/unknown?format=html").status_code == 404
+
+
+def test_rendered_report_cached_per_simulation(api_client, monkeypatch):
+    """同一结果只渲染一次，删除结果后清除缓存"""
+    simulation_id = api_client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+
+    calls = []
+    render = report_render.render_html_report
+    monkeypatch.setattr(report_render, "render_html_report",
+                        lambda result, max_points=None: calls.append(1) or render(result, max_points))
+
+    first = api_client.get(f"/api/v1/reports/download/{simulation_id}?format=html")
+    second = api_client.get(f"/api/v1/reports/download/{simulation_id}?format=html")
+    assert first.status_code == 200
+    assert "attachment" in first.headers["content-disposition"]
+    assert len(calls) == 1
+    assert first.text.split("生成时间")[0] == second.text.split("生成时间")[0]
+
+    api_client.delete(f"/api/v1/simulation/result/{simulation_id}")
+    assert report_render.report_cache.get(simulation_id, ()) is None
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_html_report.py")
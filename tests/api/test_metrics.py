@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测试 /metrics 指标端点
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.api.simulation import running_simulations
+from app.core.metrics import request_latency, db_fallbacks
+
+
+GAME_RULES = {
+    "game_type": "lottery",
+    "name": "指标测试",
+    "number_range": [1, 10],
+    "selection_count": 3,
+    "ticket_price": 2.0,
+    "prize_levels": [
+        {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 0.5},
+        {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 1.0}
+    ],
+    "jackpot": {"enabled": True, "initial_amount": 100.0, "contribution_rate": 0.1}
+}
+
+SIMULATION_CONFIG = {"rounds": 30, "players_range": [5, 10], "bets_range": [1, 2], "seed": 21}
+
+
+def metric_value(text: str, sample: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"指标不存在: {sample}")
+
+
+def test_metrics_endpoint(api_client, simulate_sync):
+    """运行中模拟的吞吐、保存的结果、请求延迟和数据库回退次数"""
+    response = api_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    stored_before = metric_value(response.text, "numerical_stored_results")
+
+    # 已完成的模拟
+    simulation_id = api_client.post("/api/v1/simulation/start", json={
+        "game_config": GAME_RULES,
+        "simulation_config": SIMULATION_CONFIG
+    }).json()["simulation_id"]
+    route = "/api/v1/simulation/progress/{simulation_id}"
+    progress_requests = request_latency.count("GET", route)
+    api_client.get(f"/api/v1/simulation/progress/{simulation_id}")
+    assert request_latency.count("GET", route) == progress_requests + 1
+
+    # 数据库不可用时列出配置回退到文件
+    fallbacks = db_fallbacks.value("list_configs")
+    api_client.get("/api/v1/config/list")
+    assert db_fallbacks.value("list_configs") == fallbacks + 1
+
+    # 运行中的模拟
+    engine = simulate_sync(GAME_RULES, SIMULATION_CONFIG)
+    running_simulations[engine.simulation_id] = engine
+    try:
+        text = api_client.get("/metrics").text
+    finally:
+        running_simulations.pop(engine.simulation_id, None)
+
+    labels = f'{{simulation_id="{engine.simulation_id}",game="指标测试"}}'
+    assert metric_value(text, "numerical_simulation_rounds_per_second" + labels) > 0
+    assert metric_value(text, "numerical_simulation_tickets_per_second" + labels) > 0
+    assert metric_value(text, "numerical_active_simulations") >= 1
+    assert metric_value(text, "numerical_stored_results") == stored_before + 1
+    assert metric_value(text, "numerical_stored_results_bytes") > 0
+    assert metric_value(text, 'numerical_queue_depth{queue="cluster_shards"}') >= 0
+    assert metric_value(text, 'numerical_db_fallback_total{operation="list_configs"}') >= 1
+    assert metric_value(text, f'numerical_http_request_duration_seconds_count{{method="GET",route="{route}"}}') >= 1
+
+
+def test_route_labels_use_route_templates(api_client):
+    """路由标签取路由模板，与路径参数值相同的路径段不被替换"""
+    cases = [
+        ("/api/v1/simulation/result/result", "/api/v1/simulation/result/{simulation_id}"),
+        ("/api/v1/simulation/status/v1", "/api/v1/simulation/status/{simulation_id}"),
+        ("/api/v1/simulation/status/simulation", "/api/v1/simulation/status/{simulation_id}"),
+        ("/health", "/health"),
+    ]
+    for path, route in cases:
+        before = request_latency.count("GET", route)
+        api_client.get(path)
+        assert request_latency.count("GET", route) == before + 1, path
+
+    assert request_latency.count("GET", "/api/{simulation_id}/simulation/status/{simulation_id}") == 0
+    unmatched = request_latency.count("GET", "<unmatched>")
+    api_client.get("/api/v1/no-such-route")
+    assert request_latency.count("GET", "<unmatched>") == unmatched + 1
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_metrics.py")
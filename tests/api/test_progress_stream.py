@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+测试模拟进度推送（SSE / WebSocket）
+"""
+
+import sys
+import os
+import json
+import asyncio
+import threading
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.api import simulation as simulation_api
+from app.core.events import SimulationEventHub, make_event, RESYNC, END_OF_STREAM
+from app.core.simulation_engine import UniversalSimulationEngine
+from app.core.compiled_game import parse_game_config
+
+
+CONFIG = {
+    "game_rules": {
+        "game_type": "lottery",
+        "name": "进度推送测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 25,
+        "players_range": [10, 20],
+        "bets_range": [1, 2],
+        "seed": 99
+    }
+}
+
+
+def test_hub_fan_out_overflow_and_close():
+    """同一事件分发给所有订阅者，队列溢出时改为重新同步，关闭时发送最终事件"""
+    async def scenario():
+        hub = SimulationEventHub(max_queue=2)
+        first = hub.subscribe("sim")
+        second = hub.subscribe("sim")
+        assert hub.subscriber_count("sim") == 2
+
+        message = make_event("progress", {"current_round": 1})
+        # 从模拟线程发布
+        publisher = threading.Thread(target=hub.publish, args=("sim", message))
+        publisher.start()
+        publisher.join()
+        assert await first.get(timeout=1) is message
+        assert await second.get(timeout=1) is message
+
+        # 消费过慢：积压被丢弃，先收到重新同步标记
+        for i in range(3):
+            hub.publish("sim", make_event("progress", {"current_round": i}))
+        await asyncio.sleep(0)
+        assert await first.get(timeout=1) is RESYNC
+
+        hub.close("sim", make_event("completed", {"status": "completed"}))
+        await asyncio.sleep(0)
+        events = []
+        while True:
+            event = await second.get(timeout=1)
+            if event is END_OF_STREAM:
+                break
+            events.append(event.event)
+        assert events[-1] == "completed"
+        assert not hub.has_subscribers("sim")
+
+    asyncio.run(scenario())
+
+
+def test_engine_events_cover_all_rounds():
+    """引擎按间隔回调，增量数据点连续覆盖所有轮次，统计与汇总一致"""
+    engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+    deltas = []
+    engine.set_event_callback(lambda e, since: deltas.append(e.build_progress(since)["delta"]), 10)
+
+    for round_num in range(1, 26):
+        engine.current_round = round_num
+        engine.record_round(engine.simulate_round(round_num))
+    engine.flush_events()
+
+    assert [(d["from_round"], d["to_round"]) for d in deltas] == [(1, 10), (11, 20), (21, 25)]
+    rtps = [rtp for d in deltas for rtp in d["rtp_trend"]]
+    assert rtps == [r.rtp for r in engine.round_results]
+
+    stats = engine.build_progress()["real_time_stats"]
+    summary = engine._generate_summary()
+    assert stats["completed_rounds"] == 25
+    assert stats["total_players"] == summary.total_players
+    assert stats["total_winners"] == summary.total_winners
+    assert abs(stats["total_payout"] - summary.total_payout) < 1e-6
+    assert stats["prize_stats"][2]["winners_count"] == summary.prize_summary[1].winners_count
+    assert len(stats["recent_rtps"]) == 20
+
+
+def test_live_event_stream_snapshot_then_deltas():
+    """订阅运行中的模拟：先收到快照，再收到增量，结束时收到完成事件"""
+    engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+    engine.set_event_callback(simulation_api.publish_progress_event, 5)
+    simulation_id = engine.simulation_id
+    simulation_api.running_simulations[simulation_id] = engine
+
+    async def scenario():
+        events = simulation_api.simulation_events(simulation_id)
+        snapshot = json.loads((await events.__anext__()).data)
+        assert snapshot["delta"]["from_round"] == 1
+        assert snapshot["delta"]["rtp_trend"] == []
+
+        def run():
+            for round_num in range(1, 11):
+                engine.current_round = round_num
+                engine.record_round(engine.simulate_round(round_num))
+            del simulation_api.running_simulations[simulation_id]
+            simulation_api.event_hub.close(simulation_id, make_event("completed", {"status": "completed"}))
+
+        threading.Thread(target=run).start()
+        received = [message async for message in events]
+        return received
+
+    received = asyncio.run(scenario())
+    assert [m.event for m in received] == ["progress", "progress", "completed"]
+    second = json.loads(received[1].data)
+    assert (second["delta"]["from_round"], second["delta"]["to_round"]) == (6, 10)
+    assert second["real_time_stats"]["completed_rounds"] == 10
+
+
+def test_stream_endpoints_for_completed_simulation(api_client):
+    """已完成的模拟：SSE 和 WebSocket 直接发送完成事件"""
+    request = {"game_config": CONFIG["game_rules"], "simulation_config": dict(CONFIG["simulation_config"], seed=None)}
+    simulation_id = api_client.post("/api/v1/simulation/start", json=request).json()["simulation_id"]
+
+    response = api_client.get(f"/api/v1/simulation/stream/{simulation_id}")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    lines = response.text.strip().split("\n")
+    assert lines[0] == "event: completed"
+    data = json.loads(lines[1][len("data: "):])
+    assert data["status"] == "completed"
+    assert data["final_summary"]["total_rounds"] == 25
+
+    with api_client.websocket_connect(f"/api/v1/simulation/ws/{simulation_id}") as websocket:
+        message = websocket.receive_json()
+        assert message["event"] == "completed"
+        assert message["data"]["simulation_id"] == simulation_id
+
+    assert api_client.get("/api/v1/simulation/stream/unknown").status_code == 404
+
+
+def test_realtime_data_since_round(api_client):
+    """since_round 只返回新增数据点和最新汇总"""
+    request = {"game_config": CONFIG["game_rules"], "simulation_config": dict(CONFIG["simulation_config"], seed=None)}
+    simulation_id = api_client.post("/api/v1/simulation/start", json=request).json()["simulation_id"]
+    url = f"/api/v1/simulation/realtime-data/{simulation_id}"
+
+    full = api_client.get(url).json()["chart_data"]
+    assert len(full["rtp_trend"]) == 25
+    assert "from_round" not in full
+
+    delta = api_client.get(url, params={"since_round": 20}).json()["chart_data"]
+    assert (delta["from_round"], delta["to_round"]) == (21, 25)
+    assert delta["rtp_trend"] == full["rtp_trend"][20:]
+    assert delta["round_labels"] == [21, 22, 23, 24, 25]
+    assert delta["summary"] == full["summary"]
+    assert delta["prize_distribution"] == full["prize_distribution"]
+
+    assert api_client.get(url, params={"since_round": 100}).json()["chart_data"]["rtp_trend"] == []
+    assert api_client.get(url, params={"since_round": -1}).status_code == 422
+
+
+def test_stream_resumes_from_last_event_id():
+    """重连时按 Last-Event-ID / since_round 只补发缺失的数据点"""
+    engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+    simulation_id = engine.simulation_id
+    for round_num in range(1, 8):
+        engine.current_round = round_num
+        engine.record_round(engine.simulate_round(round_num))
+    simulation_api.running_simulations[simulation_id] = engine
+
+    async def first_event(since_round):
+        events = simulation_api.simulation_events(simulation_id, since_round)
+        try:
+            return await events.__anext__()
+        finally:
+            await events.aclose()
+
+    try:
+        message = asyncio.run(first_event(5))
+    finally:
+        del simulation_api.running_simulations[simulation_id]
+
+    assert message.id == "7"
+    delta = json.loads(message.data)["delta"]
+    assert (delta["from_round"], delta["to_round"]) == (6, 7)
+    assert delta["rtp_trend"] == [r.rtp for r in engine.round_results[5:]]
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_progress_stream.py")
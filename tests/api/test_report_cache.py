@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+测试报告线程池构建、磁盘缓存和临时文件清理
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from fastapi.testclient import TestClient
+
+from app.api.simulation import simulation_results
+from app.services import report_store as store_module
+from app.services.report_store import report_store
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "报告缓存测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 15,
+        "players_range": [10, 20],
+        "bets_range": [1, 2]
+    }
+}
+
+
+def count_builds(monkeypatch, format):
+    calls = []
+    writer = store_module.WRITERS[format]
+
+    def counting(result, path):
+        calls.append(threading.current_thread().name)
+        writer(result, path)
+
+    monkeypatch.setitem(store_module.WRITERS, format, counting)
+    return calls
+
+
+def test_repeated_downloads_reuse_cached_file(api_client, monkeypatch, tmp_path):
+    """相同结果版本只构建一次，之后直接发送缓存文件；删除结果时清除缓存"""
+    calls = count_builds(monkeypatch, "excel")
+    simulation_id = api_client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+
+    first = api_client.get(f"/api/v1/reports/download/{simulation_id}?format=excel")
+    second = api_client.get(f"/api/v1/reports/download/{simulation_id}?format=excel")
+    assert first.status_code == 200
+    assert first.content == second.content
+    assert first.headers["content-disposition"].startswith("attachment")
+    assert len(calls) == 1
+    assert calls[0].startswith("report")
+
+    cached = os.listdir(tmp_path / "reports" / simulation_id)
+    assert len(cached) == 1 and cached[0].startswith("excel-") and cached[0].endswith(".xlsx")
+
+    inline = api_client.get(f"/api/v1/reports/generate/{simulation_id}?format=json")
+    assert inline.json()["summary"]["total_rounds"] == 15
+    assert inline.headers["content-disposition"].startswith("inline")
+    assert api_client.get(f"/api/v1/reports/generate/{simulation_id}?format=pdf").status_code == 400
+
+    api_client.delete(f"/api/v1/simulation/result/{simulation_id}")
+    assert not (tmp_path / "reports" / simulation_id).exists()
+
+
+def test_concurrent_requests_build_once(api_client, monkeypatch):
+    """同一报告的并发请求共享一次构建"""
+    simulation_id = api_client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+    result = simulation_results[simulation_id]
+
+    calls = []
+
+    def slow_writer(result, path):
+        calls.append(path)
+        time.sleep(0.2)
+        with open(path, "w") as f:
+            f.write("ok")
+
+    monkeypatch.setitem(store_module.WRITERS, "csv", slow_writer)
+
+    async def fetch_all():
+        return await asyncio.gather(*[report_store.get_file(result, "csv") for _ in range(4)])
+
+    paths = asyncio.run(fetch_all())
+    assert len(calls) == 1
+    assert len({path for path, _ in paths}) == 1
+    assert not any(temporary for _, temporary in paths)
+    assert not [name for name in os.listdir(os.path.dirname(paths[0][0])) if name.endswith(".partial")]
+
+
+def test_running_snapshot_uses_temp_file(api_client, tmp_path):
+    """运行中快照不进入磁盘缓存，发送后删除临时文件"""
+    simulation_id = api_client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+    snapshot = simulation_results[simulation_id].model_copy(update={"status": "running"})
+
+    path, temporary = asyncio.run(report_store.get_file(snapshot, "csv"))
+    assert temporary
+    assert os.path.dirname(path) == str(tmp_path / "temp")
+    assert not (tmp_path / "reports").exists()
+
+
+def test_reap_removes_stale_files(isolated_app, tmp_path):
+    """清理过期临时文件和中断写入遗留的 .partial 文件"""
+    temp_dir = tmp_path / "temp"
+    partial_dir = tmp_path / "reports" / "sim"
+    temp_dir.mkdir()
+    partial_dir.mkdir(parents=True)
+
+    old = time.time() - report_store.temp_max_age - 10
+    stale = [temp_dir / "old.xlsx", partial_dir / "csv-abc.csv.1.partial"]
+    fresh = [temp_dir / "new.xlsx", partial_dir / "csv-abc.csv"]
+    for path in stale + fresh:
+        path.write_text("x")
+    for path in stale + [partial_dir / "csv-abc.csv"]:
+        os.utime(path, (old, old))
+
+    assert report_store.reap() == 2
+    assert not any(path.exists() for path in stale)
+    assert all(path.exists() for path in fresh)
+
+
+def test_queue_depth_and_background_reap(monkeypatch, tmp_path):
+    """等待数只计尚未开始的任务；定期清理在报告线程池中执行，不阻塞请求"""
+    store = store_module.ReportStore(str(tmp_path / "reports"), str(tmp_path / "temp"), workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    futures = [store.submit(blocker)]
+    started.wait(5)
+    futures += [store.submit(lambda: None) for _ in range(2)]
+    assert store.queue_depth() == 2
+    futures[-1].cancel()
+    assert store.queue_depth() == 1
+
+    reaped = []
+    monkeypatch.setattr(store, "reap", lambda: reaped.append(threading.current_thread().name))
+    store.maybe_reap()
+    assert reaped == []  # 排在阻塞任务之后，maybe_reap 立即返回
+    assert store.queue_depth() == 2
+
+    release.set()
+    store.executor.shutdown(wait=True)
+    assert reaped and reaped[0].startswith("report")
+    assert store.queue_depth() == 0
+
+
+def test_startup_reaps_in_report_pool(isolated_app, monkeypatch):
+    """应用启动时的过期文件清理在报告线程池中执行，不在事件循环中遍历目录"""
+    reaped = threading.Event()
+    threads = []
+
+    def reap():
+        threads.append(threading.current_thread().name)
+        reaped.set()
+        return 0
+
+    monkeypatch.setattr("app.database.test_connection", lambda: False)
+    monkeypatch.setattr(report_store, "reap", reap)
+    monkeypatch.setattr(report_store, "_last_reap", 0.0)
+    with TestClient(isolated_app) as client:
+        assert client.get("/health").status_code == 200
+
+    assert reaped.wait(5)
+    assert threads[0].startswith("report")
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_report_cache.py")
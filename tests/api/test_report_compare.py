@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+测试多模拟对比接口（汇总对齐与 Welch t 检验）
+"""
+
+import sys
+import os
+import copy
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import pytest
+
+from app.api.simulation import simulation_results
+from app.services.report_compare import compare_cache
+from app.utils.helpers import student_t_two_sided_p, welch_t_test
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "对比测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 50,
+        "players_range": [10, 20],
+        "bets_range": [1, 2]
+    }
+}
+
+
+def start(client, fixed_prize=5.0, extra_level=False):
+    request = copy.deepcopy(REQUEST)
+    request["game_config"]["prize_levels"][1]["fixed_prize"] = fixed_prize
+    if extra_level:
+        request["game_config"]["prize_levels"].append(
+            {"level": 3, "name": "三等奖", "match_condition": 1, "fixed_prize": 1.0}
+        )
+    return client.post("/api/v1/simulation/start", json=request).json()["simulation_id"]
+
+
+def test_student_t_p_values():
+    """t 分布双侧 p 值与临界值表一致"""
+    assert student_t_two_sided_p(1.0, 1) == pytest.approx(0.5)
+    assert student_t_two_sided_p(2.228, 10) == pytest.approx(0.05, abs=1e-4)
+    assert student_t_two_sided_p(2.776, 4) == pytest.approx(0.05, abs=1e-4)
+    assert student_t_two_sided_p(1.96, 1e6) == pytest.approx(0.05, abs=1e-4)
+
+    test = welch_t_test(0.5, 0.04, 50, 0.58, 0.16, 80)
+    assert test["df"] == pytest.approx(123.088, abs=1e-3)
+    assert test["p_value"] == pytest.approx(0.1331, abs=1e-4)
+    assert welch_t_test(0.5, 0.0, 1, 0.5, 0.0, 10)["p_value"] is None
+
+
+def test_compare_aligns_levels_and_tests_rtp(api_client):
+    """按奖级对齐，两两检验RTP，缺少的奖级为None"""
+    base = start(api_client)
+    richer = start(api_client, fixed_prize=50.0, extra_level=True)
+
+    response = api_client.get(f"/api/v1/reports/compare?ids={base},{richer}")
+    assert response.status_code == 200
+    comparison = response.json()
+
+    assert comparison["baseline"] == base
+    assert [run["simulation_id"] for run in comparison["runs"]] == [base, richer]
+    assert comparison["runs"][0]["summary"]["average_rtp"] == simulation_results[base].summary.average_rtp
+
+    levels = {level["level"]: level["runs"] for level in comparison["levels"]}
+    assert sorted(levels) == [1, 2, 3]
+    assert levels[3][0] is None and levels[3][1]["name"] == "三等奖"
+    second = simulation_results[richer].summary.prize_summary[1]
+    assert levels[2][1]["winners_diff"] == second.winners_count - levels[2][0]["winners_count"]
+
+    [rtp_test] = comparison["rtp_tests"]
+    assert (rtp_test["a"], rtp_test["b"]) == (base, richer)
+    assert rtp_test["difference"] < 0
+    assert 0.0 <= rtp_test["p_value"] <= 1.0
+    assert rtp_test["significant"] == (rtp_test["p_value"] < 0.05)
+
+
+def test_compare_constant_rtp_runs(api_client):
+    """逐轮RTP恒定且均值不同：t 为None（不输出无穷大），差异显著"""
+
+    def start_constant(fixed_prize):
+        # 号码池只有2个号码且全选：每注都中二等奖，逐轮RTP恒定
+        request = {
+            "game_config": {
+                "game_type": "lottery",
+                "name": "恒定RTP",
+                "number_range": [1, 2],
+                "selection_count": 2,
+                "ticket_price": 10.0,
+                "prize_levels": [
+                    {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": fixed_prize}
+                ],
+                "jackpot": {"enabled": False}
+            },
+            "simulation_config": {"rounds": 5, "players_range": [1, 3], "bets_range": [1, 2]}
+        }
+        return api_client.post("/api/v1/simulation/start", json=request).json()["simulation_id"]
+
+    low, high = start_constant(5.0), start_constant(8.0)
+    response = api_client.get(f"/api/v1/reports/compare?ids={low},{high}")
+    assert response.status_code == 200
+
+    [rtp_test] = response.json()["rtp_tests"]
+    assert rtp_test["rtp_a"] == pytest.approx(0.5) and rtp_test["rtp_b"] == pytest.approx(0.8)
+    assert rtp_test["std_error"] == 0.0
+    assert rtp_test["t"] is None
+    assert rtp_test["p_value"] == 0.0
+    assert rtp_test["significant"] is True
+
+    assert welch_t_test(0.5, 0.0, 5, 0.5, 0.0, 5)["t"] == 0.0
+    assert welch_t_test(0.5, 0.0, 5, 0.5, 0.0, 5)["p_value"] == 1.0
+
+
+def test_compare_cached_and_validated(api_client):
+    """相同结果组合复用缓存，参数错误返回400/404"""
+    ids = [start(api_client) for _ in range(3)]
+
+    first = compare_cache.get_or_compare([simulation_results[i] for i in ids])
+    assert compare_cache.get_or_compare([simulation_results[i] for i in ids]) is first
+    assert len(first["rtp_tests"]) == 3
+
+    query = "&".join(f"ids={i}" for i in ids)
+    assert api_client.get(f"/api/v1/reports/compare?{query}").json()["rtp_tests"] == first["rtp_tests"]
+
+    assert api_client.get(f"/api/v1/reports/compare?ids={ids[0]}").status_code == 400
+    assert api_client.get(f"/api/v1/reports/compare?ids={ids[0]},{ids[0]}").status_code == 400
+    assert api_client.get(f"/api/v1/reports/compare?ids={ids[0]},unknown").status_code == 404
+
+    api_client.delete(f"/api/v1/simulation/result/{ids[2]}")
+    assert api_client.get(f"/api/v1/reports/compare?{query}").status_code == 404
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_report_compare.py")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+测试基于真实模拟结果的报告导出（JSON / Excel / CSV / Parquet / 图表）
+"""
+
+import sys
+import os
+import io
+import csv
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+from app.api.simulation import simulation_results
+from app.services import report_export
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "导出测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 12,
+        "players_range": [10, 20],
+        "bets_range": [1, 2]
+    }
+}
+
+
+def start(client):
+    simulation_id = client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+    return simulation_id, simulation_results[simulation_id]
+
+
+def test_json_report_and_charts_use_real_result(api_client):
+    """JSON报告和图表来自存储的结果，未知模拟返回404"""
+    simulation_id, result = start(api_client)
+
+    report = api_client.get(f"/api/v1/reports/generate/{simulation_id}?format=json").json()
+    assert report["summary"]["total_rounds"] == 12
+    assert report["summary"]["total_payout"] == result.summary.total_payout
+    assert [p["name"] for p in report["prize_statistics"]] == ["一等奖", "二等奖"]
+    assert report["charts"]["rtp_trend"]["data"]["y"] == [r.rtp * 100 for r in result.round_results]
+
+    charts = api_client.get(f"/api/v1/reports/charts/{simulation_id}").json()["charts"]
+    assert charts[0]["data"]["x"] == list(range(1, 13))
+    assert charts[1]["data"]["y"] == [s.winners_count for s in result.summary.prize_summary]
+
+    assert api_client.get("/api/v1/reports/charts/unknown").status_code == 404
+    assert api_client.get("/api/v1/reports/generate/unknown?format=json").status_code == 404
+
+
+def test_csv_export_streams_rows(api_client):
+    """CSV逐轮明细，分块输出"""
+    simulation_id, result = start(api_client)
+
+    response = api_client.get(f"/api/v1/reports/download/{simulation_id}?format=csv")
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][:3] == ["round_number", "players_count", "total_bets"]
+    assert "level2_winners" in rows[0]
+    assert len(rows) == 13
+    assert float(rows[5][rows[0].index("rtp")]) == result.round_results[4].rtp
+
+    # 小块大小时拼接结果不变
+    assert "".join(report_export.iter_csv(result, chunk_rows=5)) == response.text
+
+
+def test_excel_and_parquet_exports(api_client, tmp_path):
+    """Excel 三个工作表与 Parquet 行组内容来自真实结果"""
+    simulation_id, result = start(api_client)
+
+    response = api_client.get(f"/api/v1/reports/download/{simulation_id}?format=excel")
+    workbook = load_workbook(io.BytesIO(response.content), read_only=True)
+    assert workbook.sheetnames == ["汇总统计", "奖级统计", "轮次明细"]
+    summary = {row[0]: row[1] for row in workbook["汇总统计"].iter_rows(min_row=2, values_only=True)}
+    assert summary["总轮数"] == 12
+    assert summary["总派奖金额"] == result.summary.total_payout
+    assert len(list(workbook["轮次明细"].iter_rows(values_only=True))) == 13
+
+    response = api_client.get(f"/api/v1/reports/download/{simulation_id}?format=parquet")
+    path = tmp_path / "rounds.parquet"
+    path.write_bytes(response.content)
+    table = pq.read_table(path)
+    assert table.num_rows == 12
+    assert table.column("jackpot_amount").to_pylist() == [r.jackpot_amount for r in result.round_results]
+    assert table.column("winning_numbers").to_pylist()[0] == result.round_results[0].winning_numbers
+
+    # 小批量写入多个行组
+    report_export.write_parquet(result, str(tmp_path / "batched.parquet"), batch_rows=5)
+    assert pq.ParquetFile(tmp_path / "batched.parquet").num_row_groups == 3
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_report_exports.py")
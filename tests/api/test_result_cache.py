@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+测试固定种子模拟的结果缓存
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.simulation_engine import UniversalSimulationEngine
+from app.core.compiled_game import parse_game_config
+from app.services.result_cache import result_cache_key
+
+
+def make_request(seed):
+    return {
+        "game_config": {
+            "game_type": "lottery",
+            "name": "结果缓存测试",
+            "number_range": [1, 10],
+            "selection_count": 3,
+            "ticket_price": 10.0,
+            "prize_levels": [
+                {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+                {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+            ],
+            "jackpot": {"enabled": True, "initial_amount": 1000.0}
+        },
+        "simulation_config": {
+            "rounds": 5,
+            "players_range": [10, 20],
+            "bets_range": [1, 2],
+            "seed": seed
+        }
+    }
+
+
+def test_seeded_engines_are_reproducible():
+    """相同种子的引擎结果一致，且互不影响"""
+    request = make_request(7)
+    game_config = parse_game_config({
+        "game_rules": request["game_config"],
+        "simulation_config": request["simulation_config"]
+    })
+    first = UniversalSimulationEngine(game_config)
+    second = UniversalSimulationEngine(game_config)
+
+    rounds_first = [first.simulate_round(i).model_dump() for i in range(1, 4)]
+    rounds_second = [second.simulate_round(i).model_dump() for i in range(1, 4)]
+    assert rounds_first == rounds_second
+
+
+def test_cache_key_requires_seed():
+    """未设置种子的配置不缓存，种子不同键不同"""
+    def key(seed):
+        request = make_request(seed)
+        return result_cache_key(parse_game_config({
+            "game_rules": request["game_config"],
+            "simulation_config": request["simulation_config"]
+        }))
+
+    assert key(None) is None
+    assert key(1) != key(2)
+    assert key(1) == key(1)
+
+
+def test_start_reuses_completed_seeded_run(api_client):
+    """相同种子的模拟直接返回已有结果，force=true 时重新运行"""
+    request = make_request(20250101)
+
+    first = api_client.post("/api/v1/simulation/start", json=request).json()
+    assert first["cached"] is False
+    assert api_client.get(f"/api/v1/simulation/status/{first['simulation_id']}").json()["status"] == "completed"
+
+    second = api_client.post("/api/v1/simulation/start", json=request).json()
+    assert second["cached"] is True
+    assert second["simulation_id"] == first["simulation_id"]
+    assert second["status"] == "completed"
+    assert second["result"]["summary"]["total_rounds"] == 5
+
+    forced = api_client.post("/api/v1/simulation/start?force=true", json=request).json()
+    assert forced["cached"] is False
+    assert forced["simulation_id"] != first["simulation_id"]
+
+    # 删除结果后不再命中已删除的模拟
+    api_client.delete(f"/api/v1/simulation/result/{forced['simulation_id']}")
+    api_client.delete(f"/api/v1/simulation/result/{first['simulation_id']}")
+    third = api_client.post("/api/v1/simulation/start", json=request).json()
+    assert third["cached"] is False
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_result_cache.py")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+测试结果接口的内容协商（JSON / gzip / MessagePack / Arrow）
+"""
+
+import sys
+import os
+import gzip
+import json
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import msgpack
+import pyarrow as pa
+
+from app.api.simulation import simulation_results
+from app.services.serialization import negotiate_format, iter_result_json, UnsupportedFormatError
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "序列化测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 30,
+        "players_range": [10, 20],
+        "bets_range": [1, 2]
+    }
+}
+
+
+def start(client):
+    simulation_id = client.post("/api/v1/simulation/start", json=REQUEST).json()["simulation_id"]
+    return simulation_id, simulation_results[simulation_id]
+
+
+def test_negotiate_format():
+    """format 参数优先，Accept 按 q 值选择"""
+    assert negotiate_format(None) == "json"
+    assert negotiate_format("*/*") == "json"
+    assert negotiate_format("application/x-msgpack, application/json;q=0.5") == "msgpack"
+    assert negotiate_format("application/json;q=0.5, application/vnd.apache.arrow.stream") == "arrow"
+    assert negotiate_format("application/json", "arrow") == "arrow"
+    for accept, requested in (("text/csv", None), (None, "xml")):
+        try:
+            negotiate_format(accept, requested)
+            assert False, "应拒绝不支持的格式"
+        except UnsupportedFormatError:
+            pass
+
+
+def test_streamed_json_matches_model_dump(api_client):
+    """分块流式编码的JSON与 pydantic 序列化结果一致"""
+    _, result = start(api_client)
+    expected = result.model_dump(mode="json")
+
+    streamed = json.loads(b"".join(iter_result_json(result, chunk_size=7)))
+    assert streamed == expected
+
+
+def test_result_content_negotiation(api_client):
+    """结果接口按 Accept / Accept-Encoding 返回不同编码"""
+    simulation_id, result = start(api_client)
+    url = f"/api/v1/simulation/result/{simulation_id}"
+    expected = result.model_dump(mode="json")
+
+    response = api_client.get(url, headers={"Accept-Encoding": "identity"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected
+
+    # httpx 会自动解压，这里读取原始字节验证 gzip
+    with api_client.stream("GET", url, headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert json.loads(gzip.decompress(raw)) == expected
+
+    response = api_client.get(url, headers={"Accept": "application/x-msgpack"})
+    assert response.headers["content-type"] == "application/x-msgpack"
+    assert msgpack.unpackb(response.content) == expected
+
+    response = api_client.get(url, params={"format": "arrow"})
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 30
+    assert table.column("rtp").to_pylist() == [r.rtp for r in result.round_results]
+    assert table.column("level2_winners").to_pylist() == [r.prize_stats[1].winners_count for r in result.round_results]
+    metadata = json.loads(table.schema.metadata[b"metadata"])
+    assert metadata["summary"] == expected["summary"]
+
+    assert api_client.get(url, headers={"Accept": "text/csv"}).status_code == 406
+
+
+def test_chart_content_negotiation(api_client):
+    """图表接口支持 Arrow（轮次为列，汇总为元数据）"""
+    simulation_id, result = start(api_client)
+    url = f"/api/v1/simulation/realtime-data/{simulation_id}"
+
+    response = api_client.get(url, params={"format": "arrow", "since_round": 25})
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("round").to_pylist() == [26, 27, 28, 29, 30]
+    assert table.column("jackpot").to_pylist() == [r.jackpot_amount for r in result.round_results[25:]]
+    metadata = json.loads(table.schema.metadata[b"metadata"])
+    assert metadata["chart_data"]["summary"]["total_rounds"] == 30
+
+    response = api_client.get(url, headers={"Accept": "application/msgpack"})
+    assert len(msgpack.unpackb(response.content)["chart_data"]["rtp_trend"]) == 30
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_result_serialization.py")
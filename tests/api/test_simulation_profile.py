@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+测试模拟性能剖析（options.profile=true 和 /reports/profile）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.config import settings
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "性能剖析测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 300.0, "contribution_rate": 0.2}
+    },
+    "simulation_config": {
+        "rounds": 100,
+        "players_range": [300, 500],
+        "bets_range": [1, 3],
+        "seed": 7
+    }
+}
+
+
+def test_profile_download(api_client, monkeypatch):
+    """开启剖析的模拟完成后可下载 folded 调用栈，包含引擎热路径"""
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL", 0.001)
+
+    response = api_client.post("/api/v1/simulation/start", json={**REQUEST, "options": {"profile": True}})
+    assert response.status_code == 200
+    simulation_id = response.json()["simulation_id"]
+
+    response = api_client.get(f"/api/v1/reports/profile/{simulation_id}")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["content-disposition"].endswith('.folded"')
+
+    lines = response.text.splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("app.core.simulation_engine:simulate_round" in line for line in lines)
+
+    # 删除结果时一并删除剖析结果
+    api_client.delete(f"/api/v1/simulation/result/{simulation_id}")
+    assert api_client.get(f"/api/v1/reports/profile/{simulation_id}").status_code == 404
+
+
+def test_profile_not_recorded_by_default(api_client):
+    """未开启剖析的模拟没有剖析结果"""
+    response = api_client.post("/api/v1/simulation/start", json=REQUEST)
+    simulation_id = response.json()["simulation_id"]
+
+    response = api_client.get(f"/api/v1/reports/profile/{simulation_id}")
+    assert response.status_code == 404
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_simulation_profile.py")
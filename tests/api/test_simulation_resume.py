@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+测试从检查点继续模拟（/simulation/resume）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import asyncio
+
+import pytest
+
+from app.api import simulation as simulation_api
+from app.api.simulation import running_simulations, run_simulation_task, simulation_results
+from app.core.checkpoint import CheckpointError
+from app.core.compiled_game import parse_game_config
+from app.core.simulation_engine import UniversalSimulationEngine
+
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "继续模拟测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 300.0, "contribution_rate": 0.2}
+    },
+    "simulation_config": {
+        "rounds": 40,
+        "players_range": [1, 5],
+        "bets_range": [1, 2],
+        "seed": 11
+    }
+}
+
+
+def make_engine():
+    return UniversalSimulationEngine(parse_game_config({
+        "game_rules": REQUEST["game_config"],
+        "simulation_config": REQUEST["simulation_config"]
+    }))
+
+
+def test_resume_matches_uninterrupted_run(api_client):
+    """中途的检查点继续运行后，结果与同一种子的完整运行一致"""
+    store = simulation_api.checkpoint_store
+
+    # 模拟在第25轮之后中断的运行
+    engine = make_engine()
+    for round_num in range(1, 26):
+        engine.current_round = round_num
+        engine.record_round(engine.simulate_round(round_num))
+    store.save(engine)
+    simulation_id = engine.simulation_id
+
+    response = api_client.post(f"/api/v1/simulation/resume/{simulation_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "resumed"
+    resumed = simulation_results[simulation_id]
+    assert resumed.status == "completed"
+    assert len(resumed.round_results) == 40
+
+    reference_id = api_client.post("/api/v1/simulation/start?force=true", json=REQUEST).json()["simulation_id"]
+    reference = simulation_results[reference_id]
+    assert resumed.round_results == reference.round_results
+    assert resumed.summary == reference.summary
+    assert resumed.analytics == reference.analytics
+
+    # 完成后删除检查点
+    assert not store.exists(simulation_id)
+    assert store.list() == []
+    assert api_client.post(f"/api/v1/simulation/resume/{simulation_id}").status_code == 404
+
+
+def test_interval_checkpoint_resumes_interrupted_run(api_client, monkeypatch):
+    """运行中按轮数间隔写入的检查点：中途出错后从最近的检查点继续，结果与完整运行一致"""
+    store = simulation_api.checkpoint_store
+    monkeypatch.setattr("app.core.config.settings.CHECKPOINT_INTERVAL_ROUNDS", 10)
+    monkeypatch.setattr("app.core.config.settings.CHECKPOINT_INTERVAL_SECONDS", 0.0)
+    monkeypatch.setattr("app.core.config.settings.PROGRESS_EVENT_INTERVAL", 5)
+    crashed = []
+
+    def crash_once(engine, since_round):
+        # 第25轮时模拟进程中断（第20轮的检查点已写入）
+        if engine.current_round == 25 and not crashed:
+            crashed.append(engine.current_round)
+            raise RuntimeError("模拟中断")
+
+    monkeypatch.setattr("app.api.simulation.publish_progress_event", crash_once)
+
+    simulation_id = api_client.post("/api/v1/simulation/start?force=true", json=REQUEST).json()["simulation_id"]
+    assert simulation_results[simulation_id].status == "error"
+    assert len(store.load(simulation_id)[1]) == 20
+
+    response = api_client.post(f"/api/v1/simulation/resume/{simulation_id}")
+    assert response.status_code == 200
+    assert "第 20 轮" in response.json()["message"]
+    resumed = simulation_results[simulation_id]
+    assert resumed.status == "completed"
+    assert not store.exists(simulation_id)
+
+    reference = simulation_results[
+        api_client.post("/api/v1/simulation/start?force=true", json=REQUEST).json()["simulation_id"]
+    ]
+    assert resumed.round_results == reference.round_results
+    assert resumed.summary == reference.summary
+
+
+def test_stopped_run_keeps_checkpoint(api_client, monkeypatch):
+    """停止的模拟保留最终检查点，可以继续运行到完成"""
+    store = simulation_api.checkpoint_store
+    monkeypatch.setattr("app.core.config.settings.PROGRESS_EVENT_INTERVAL", 15)
+
+    def stop_after_first_event(engine, since_round):
+        engine.should_stop = True
+
+    monkeypatch.setattr("app.api.simulation.publish_progress_event", stop_after_first_event)
+
+    engine = make_engine()
+    simulation_id = engine.simulation_id
+    running_simulations[simulation_id] = engine
+    asyncio.run(run_simulation_task(simulation_id, engine))
+
+    assert simulation_results[simulation_id].status == "stopped"
+    assert len(store.load(simulation_id)[1]) == 15
+    assert store.list() == [simulation_id]
+
+    monkeypatch.setattr("app.api.simulation.publish_progress_event", lambda engine, since_round: None)
+    assert api_client.post(f"/api/v1/simulation/resume/{simulation_id}").status_code == 200
+    assert simulation_results[simulation_id].status == "completed"
+    assert len(simulation_results[simulation_id].round_results) == 40
+    assert not store.exists(simulation_id)
+
+
+def test_resume_with_missing_round_log(api_client):
+    """轮次日志缺失的检查点返回409"""
+    store = simulation_api.checkpoint_store
+    engine = make_engine()
+    engine.record_round(engine.simulate_round(1))
+    store.save(engine)
+    os.remove(os.path.join(store.root, engine.simulation_id, "rounds.log"))
+
+    with pytest.raises(CheckpointError):
+        store.load(engine.simulation_id)
+    response = api_client.post(f"/api/v1/simulation/resume/{engine.simulation_id}")
+    assert response.status_code == 409
+
+
+def test_resume_rejects_incompatible_checkpoint(api_client, monkeypatch):
+    """引擎版本不同的检查点返回409"""
+    store = simulation_api.checkpoint_store
+    with monkeypatch.context() as patch:
+        patch.setattr("app.core.simulation_engine.ENGINE_VERSION", "0.0.0")
+        engine = make_engine()
+        engine.record_round(engine.simulate_round(1))
+        store.save(engine)
+
+    response = api_client.post(f"/api/v1/simulation/resume/{engine.simulation_id}")
+    assert response.status_code == 409
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/api/test_simulation_resume.py")
@@ -0,0 +1,93 @@
+"""
+性能基准测试的公共数据
+
+游戏规模：10选3（小）、42选6（标准）、42选6 + 大量玩家。
+大规模轮次数据由少量真实轮次重复引用构成（只用于计时，不占用成比例的内存）。
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.compiled_game import parse_game_config
+from app.core.simulation_engine import UniversalSimulationEngine
+
+
+PRIZE_LEVELS_10_3 = [
+    {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 0.5},
+    {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+]
+
+PRIZE_LEVELS_42_6 = [
+    {"level": 1, "name": "一等奖", "match_condition": 6, "prize_percentage": 0.6},
+    {"level": 2, "name": "二等奖", "match_condition": 5, "fixed_prize": 1000.0},
+    {"level": 3, "name": "三等奖", "match_condition": 4, "fixed_prize": 50.0},
+    {"level": 4, "name": "四等奖", "match_condition": 3, "fixed_prize": 5.0}
+]
+
+GAMES = {
+    "10c3": ([1, 10], 3, PRIZE_LEVELS_10_3, [10, 20]),
+    "42c6": ([1, 42], 6, PRIZE_LEVELS_42_6, [10, 20]),
+    "42c6-large": ([1, 42], 6, PRIZE_LEVELS_42_6, [500, 1000])
+}
+
+
+def game_config(game: str, rounds: int = 1000, seed: int = 2025):
+    number_range, selection_count, prize_levels, players_range = GAMES[game]
+    return parse_game_config({
+        "game_rules": {
+            "game_type": "lottery",
+            "name": f"基准测试 {game}",
+            "number_range": number_range,
+            "selection_count": selection_count,
+            "ticket_price": 2.0,
+            "prize_levels": prize_levels,
+            "jackpot": {"enabled": True, "initial_amount": 100000.0, "contribution_rate": 0.15}
+        },
+        "simulation_config": {
+            "rounds": rounds,
+            "players_range": players_range,
+            "bets_range": [1, 5],
+            "seed": seed
+        }
+    })
+
+
+def run_engine(game: str, rounds: int) -> UniversalSimulationEngine:
+    """同步运行引擎 rounds 轮"""
+    engine = UniversalSimulationEngine(game_config(game, rounds))
+    for round_num in range(1, rounds + 1):
+        engine.current_round = round_num
+        engine.record_round(engine.simulate_round(round_num))
+    return engine
+
+
+def repeated_rounds(sample, count: int):
+    """由样本轮次重复引用构成 count 轮"""
+    return [sample[i % len(sample)] for i in range(count)]
+
+
+def make_result(engine: UniversalSimulationEngine, rounds: int):
+    """由样本引擎构造 rounds 轮的已完成模拟结果"""
+    from datetime import datetime
+    from app.core.aggregation import reduce_rounds
+    from app.models.simulation_result import SimulationResult
+
+    sample = UniversalSimulationEngine(engine.game_config)
+    sample.round_results = repeated_rounds(engine.round_results, rounds)
+    sample.totals, _ = reduce_rounds(sample.round_results)
+    now = datetime.now()
+    return SimulationResult(
+        simulation_id=f"benchmark-{rounds}",
+        game_config_id=engine.game_config.id,
+        start_time=now,
+        end_time=now,
+        duration=0.0,
+        status="completed",
+        game_name=engine.game_config.game_rules.name,
+        simulation_rounds=rounds,
+        round_results=sample.round_results,
+        summary=sample._generate_summary()
+    )
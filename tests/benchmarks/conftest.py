@@ -0,0 +1,20 @@
+"""
+性能基准测试的公共夹具
+
+结果按 pytest-benchmark 的JSON格式保存用于趋势对比（见 tests/README.md）。
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+
+from bench_support import run_engine
+
+
+@pytest.fixture(scope="session")
+def sample_engine():
+    """42选6 运行1000轮的引擎（提供样本轮次）"""
+    return run_engine("42c6", 1000)
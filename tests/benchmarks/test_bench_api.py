@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+进度接口延迟基准：N 个客户端同时轮询运行中模拟的进度（进程内 ASGI 调用）
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.api.simulation import running_simulations
+
+from bench_support import run_engine
+
+
+@pytest.fixture(scope="module")
+def running_engine():
+    """注册为运行中的模拟（已完成2000轮）"""
+    engine = run_engine("42c6", 2000)
+    engine.is_running = True
+    running_simulations[engine.simulation_id] = engine
+    try:
+        yield engine
+    finally:
+        running_simulations.pop(engine.simulation_id, None)
+
+
+@pytest.mark.parametrize("pollers", [1, 10, 50])
+def test_progress_concurrent_pollers(benchmark, running_engine, pollers):
+    """一次计时 = pollers 个并发的 GET /progress 全部返回"""
+    url = f"/api/v1/simulation/progress/{running_engine.simulation_id}"
+
+    async def poll():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await asyncio.gather(*(client.get(url) for _ in range(pollers)))
+
+    responses = benchmark(lambda: asyncio.run(poll()))
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[0].json()["current_round"] == 2000
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/benchmarks --benchmark-json=benchmark.json")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+引擎吞吐基准：单轮模拟（不同游戏规模）和汇总生成（1e5 / 1e6 轮）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+
+from app.core.aggregation import reduce_rounds
+from app.core.simulation_engine import UniversalSimulationEngine
+
+from bench_support import GAMES, game_config, repeated_rounds
+
+
+@pytest.mark.parametrize("game", list(GAMES))
+def test_simulate_round(benchmark, game):
+    """单轮模拟（含增量统计）"""
+    engine = UniversalSimulationEngine(game_config(game))
+    state = {"round": 0}
+
+    def simulate():
+        state["round"] += 1
+        engine.current_round = state["round"]
+        engine.record_round(engine.simulate_round(state["round"]))
+
+    benchmark(simulate)
+    assert engine.totals.rounds == len(engine.round_results)
+
+
+@pytest.mark.parametrize("rounds", [100_000, 1_000_000])
+def test_generate_summary_incremental(benchmark, sample_engine, rounds):
+    """引擎汇总：使用增量累计（与轮数无关）"""
+    engine = UniversalSimulationEngine(game_config("42c6"))
+    engine.round_results = repeated_rounds(sample_engine.round_results, rounds)
+    engine.totals, _ = reduce_rounds(engine.round_results)
+
+    summary = benchmark(engine._generate_summary)
+    assert summary.total_rounds == rounds
+
+
+@pytest.mark.parametrize("rounds", [100_000, 1_000_000])
+def test_generate_summary_reaggregate(benchmark, sample_engine, rounds):
+    """引擎汇总：轮次结果未经增量记录时单次重新聚合"""
+    engine = UniversalSimulationEngine(game_config("42c6"))
+    engine.round_results = repeated_rounds(sample_engine.round_results, rounds)
+
+    summary = benchmark.pedantic(engine._generate_summary, rounds=3, iterations=1)
+    assert summary.total_rounds == rounds
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/benchmarks --benchmark-json=benchmark.json")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+报告生成基准：JSON / HTML / Parquet（10000轮的模拟结果）
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+
+from app.services.report_export import build_json_report, write_parquet
+from app.services.report_render import render_html_report
+
+from bench_support import make_result
+
+
+REPORT_ROUNDS = 10_000
+
+
+@pytest.fixture(scope="module")
+def report_result(sample_engine):
+    return make_result(sample_engine, REPORT_ROUNDS)
+
+
+def test_json_report(benchmark, report_result):
+    report = benchmark(build_json_report, report_result)
+    assert report
+
+
+def test_html_report(benchmark, report_result):
+    html = benchmark(render_html_report, report_result)
+    assert "<html" in html
+
+
+def test_parquet_report(benchmark, report_result, tmp_path):
+    path = str(tmp_path / "report.parquet")
+    benchmark(write_parquet, report_result, path)
+    assert os.path.getsize(path) > 0
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/benchmarks --benchmark-json=benchmark.json")
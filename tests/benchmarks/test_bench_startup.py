@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+服务启动时间基准（容器重启、扩容时新实例可用前的耗时）
+
+- 导入 app.main：在新的解释器进程中计时，不导入 NumPy、Jinja2 和 MySQL 驱动，不创建目录
+- 应用启动：数据库不可达（连接测试一直阻塞）时 lifespan 启动不等待数据库
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import json
+import subprocess
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app
+
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+# 只在实际使用时才导入的重型依赖
+LAZY_MODULES = ("numpy", "jinja2", "pymysql", "pandas", "pyarrow", "plotly")
+
+IMPORT_SCRIPT = f"""
+import json, os, sys
+import app.main
+print(json.dumps({{
+    "loaded": [name for name in {LAZY_MODULES!r} if name in sys.modules],
+    "files": os.listdir(".")
+}}))
+"""
+
+
+def test_import_app_main(benchmark, tmp_path):
+    """一次计时 = 新进程导入 app.main（工作目录为空目录）"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+
+    def import_app():
+        completed = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT], cwd=tmp_path, env=env,
+            capture_output=True, text=True, check=True
+        )
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    report = benchmark.pedantic(import_app, rounds=3, iterations=1)
+    assert report["loaded"] == []
+    assert report["files"] == []
+
+
+def test_startup_with_unreachable_db(benchmark, monkeypatch):
+    """一次计时 = 应用启动、响应一次 /health、关闭；数据库连接测试在响应前一直阻塞"""
+    timings = []
+
+    def start_and_serve():
+        released = threading.Event()
+        # 模拟不可达的数据库：连接测试阻塞到请求处理完成后才返回失败
+        monkeypatch.setattr(database, "test_connection", lambda: released.wait(10) and False)
+        started = time.perf_counter()
+        with TestClient(app) as client:
+            try:
+                timings.append(time.perf_counter() - started)
+                response = client.get("/health")
+            finally:
+                # 关闭时会等待线程池中的连接测试结束
+                released.set()
+        return response
+
+    response = benchmark.pedantic(start_and_serve, rounds=3, iterations=1)
+    assert response.status_code == 200
+    # 启动不等待数据库连接测试（阻塞10秒）
+    assert max(timings) < 5
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/benchmarks/test_bench_startup.py")
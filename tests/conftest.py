@@ -0,0 +1,105 @@
+"""
+测试公共夹具：在进程内运行API和模拟引擎（不需要启动服务）
+
+- api_client: TestClient，后台任务在请求返回前同步执行，/simulation/start 返回时模拟已完成
+- asgi_client: 创建 httpx.AsyncClient（ASGI 传输），用于 asyncio.run 中的并发请求
+- simulate_sync: 确定性的同步引擎运行器，可逐轮观察引擎状态（替代轮询进度接口）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+
+@pytest.fixture
+def isolated_app(tmp_path, monkeypatch):
+    """
+    隔离的应用状态
+
+    模拟不暂停；不连接数据库（配置保存到临时目录）；检查点、报告文件和临时文件写入
+    临时目录（tmp_path 下的 checkpoints、reports、temp）；测试中产生的模拟结果在结束后清理。
+    """
+    from app.main import app
+    from app.api import simulation as simulation_api
+    from app.core.config import settings
+    from app.core.checkpoint import CheckpointStore
+    from app.services.config_cache import config_cache
+    from app.services.config_repository import FileConfigRepository
+    from app.services.report_store import report_store
+
+    monkeypatch.setattr(settings, "SIMULATION_PACE_SECONDS", 0.0)
+    monkeypatch.setattr("app.api.config.db_available", lambda: False)
+    monkeypatch.setattr("app.api.config.config_repository", FileConfigRepository(str(tmp_path / "configs")))
+    monkeypatch.setattr("app.api.simulation.checkpoint_store", CheckpointStore(str(tmp_path / "checkpoints")))
+    monkeypatch.setattr(report_store, "reports_dir", str(tmp_path / "reports"))
+    monkeypatch.setattr(report_store, "temp_dir", str(tmp_path / "temp"))
+    config_cache.clear()
+
+    existing = set(simulation_api.simulation_results)
+    try:
+        yield app
+    finally:
+        for simulation_id in set(simulation_api.simulation_results) - existing:
+            simulation_api.simulation_results.pop(simulation_id, None)
+            simulation_api.simulation_profiles.pop(simulation_id, None)
+        config_cache.clear()
+
+
+@pytest.fixture
+def api_client(isolated_app):
+    """进程内API客户端"""
+    from fastapi.testclient import TestClient
+
+    return TestClient(isolated_app)
+
+
+@pytest.fixture
+def asgi_client(isolated_app):
+    """返回创建 httpx.AsyncClient 的函数（需在事件循环中使用）"""
+    import httpx
+
+    def create():
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=isolated_app), base_url="http://testserver")
+
+    return create
+
+
+def run_engine_sync(game_rules: Dict[str, Any], simulation_config: Dict[str, Any],
+                    on_round: Optional[Callable[[Any, Any], None]] = None):
+    """
+    同步运行模拟引擎
+
+    Args:
+        game_rules: 游戏规则（与 /simulation/start 请求中的 game_config 相同）
+        simulation_config: 模拟配置（指定 seed 时结果确定）
+        on_round: on_round(engine, round_result)，每轮记录后调用
+
+    Returns:
+        运行完成的引擎
+    """
+    from app.core.compiled_game import parse_game_config
+    from app.core.simulation_engine import UniversalSimulationEngine
+
+    engine = UniversalSimulationEngine(parse_game_config({
+        "game_rules": game_rules,
+        "simulation_config": simulation_config
+    }))
+    for round_num in range(1, engine.sim_config.rounds + 1):
+        engine.current_round = round_num
+        round_result = engine.simulate_round(round_num)
+        engine.record_round(round_result)
+        if on_round is not None:
+            on_round(engine, round_result)
+    return engine
+
+
+@pytest.fixture
+def simulate_sync():
+    """确定性的同步引擎运行器（见 run_engine_sync）"""
+    return run_engine_sync
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+测试轮次结果的单次聚合（引擎汇总与各格式报告共用）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import numpy as np
+import pytest
+from datetime import datetime
+
+from app.core.aggregation import SummaryAccumulator, reduce_rounds
+from app.core.compiled_game import parse_game_config
+from app.core.simulation_engine import UniversalSimulationEngine
+from app.models.simulation_result import SimulationResult
+from app.services import report_export, report_render
+
+
+CONFIG = {
+    "game_rules": {
+        "game_type": "lottery",
+        "name": "聚合测试彩票",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 20.0},
+            {"level": 3, "name": "三等奖", "match_condition": 1, "fixed_prize": 2.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 1000.0}
+    },
+    "simulation_config": {
+        "rounds": 40,
+        "players_range": [20, 40],
+        "bets_range": [1, 3],
+        "seed": 2024
+    }
+}
+
+
+def run_engine():
+    engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+    for round_number in range(1, 41):
+        engine.current_round = round_number
+        engine.record_round(engine.simulate_round(round_number))
+    return engine
+
+
+def naive_level_totals(round_results, level):
+    winners = sum(stat.winners_count for r in round_results for stat in r.prize_stats if stat.level == level)
+    amount = sum(stat.total_amount for r in round_results for stat in r.prize_stats if stat.level == level)
+    return winners, amount
+
+
+def test_reduce_rounds_matches_per_level_scans():
+    """单次聚合结果与按奖级逐轮扫描一致"""
+    engine = run_engine()
+    totals, columns = reduce_rounds(engine.round_results)
+
+    assert totals.rounds == 40
+    assert totals.players == sum(r.players_count for r in engine.round_results)
+    assert totals.payout == sum(r.total_payout for r in engine.round_results)
+    assert totals.winners == sum(r.winners_count for r in engine.round_results)
+    for level in (1, 2, 3):
+        assert (totals.level_winners[level], totals.level_amounts[level]) == \
+            naive_level_totals(engine.round_results, level)
+    assert columns.round_numbers == list(range(1, 41))
+    assert columns.jackpots == [r.jackpot_amount for r in engine.round_results]
+
+
+def test_engine_summary_uses_shared_reducer():
+    """引擎汇总（增量统计或重新聚合）与逐轮计算一致"""
+    engine = run_engine()
+    summary = engine._generate_summary()
+    rtps = [r.rtp for r in engine.round_results]
+
+    assert summary.total_rounds == 40
+    assert summary.average_rtp == pytest.approx(float(np.mean(rtps)), rel=1e-12)
+    assert summary.rtp_variance == pytest.approx(float(np.var(rtps)), rel=1e-9)
+    for stat in summary.prize_summary:
+        assert (stat.winners_count, stat.total_amount) == naive_level_totals(engine.round_results, stat.level)
+
+    # 轮次结果未经 record_round 记录时重新聚合
+    engine.totals.rounds = 0
+    assert engine._generate_summary() == summary
+
+
+def test_accumulator_merge_is_associative():
+    """分段累计按顺序合并（任意结合方式）与整体累计一致，JSON形式可无损往返"""
+    engine = run_engine()
+    rounds = engine.round_results
+    whole, _ = reduce_rounds(rounds)
+    parts = [reduce_rounds(rounds[start:end])[0] for start, end in ((0, 7), (7, 25), (25, 40))]
+
+    left = SummaryAccumulator().merge(parts[0]).merge(parts[1]).merge(parts[2])
+    right = SummaryAccumulator().merge(parts[0]).merge(
+        SummaryAccumulator().merge(parts[1]).merge(parts[2]))
+    for merged in (left, right):
+        assert (merged.rounds, merged.players, merged.winners) == (whole.rounds, whole.players, whole.winners)
+        assert dict(merged.level_winners) == dict(whole.level_winners)
+        assert merged.rtp_histogram.counts == whole.rtp_histogram.counts
+        assert merged.rtp_mean == pytest.approx(whole.rtp_mean, rel=1e-12)
+        assert merged.rtp_variance == pytest.approx(whole.rtp_variance, rel=1e-9)
+        assert merged.final_jackpot == rounds[-1].jackpot_amount
+
+    restored = SummaryAccumulator.from_dict(left.to_dict())
+    assert restored.to_dict() == left.to_dict()
+    with pytest.raises(ValueError):
+        SummaryAccumulator.from_dict({"rounds": 1})
+
+
+def test_report_formats_share_aggregate():
+    """HTML / JSON / Excel 的汇总和奖级统计一致"""
+    engine = run_engine()
+    result = SimulationResult(
+        simulation_id="aggregation-test",
+        game_config_id="aggregation",
+        start_time=datetime.now(),
+        status="completed",
+        game_name="聚合测试彩票",
+        simulation_rounds=40,
+        round_results=engine.round_results,
+        summary=engine._generate_summary()
+    )
+
+    data = report_export.ReportData(result)
+    overview = data.overview()
+    assert overview == result.summary.model_dump(exclude={"prize_summary"})
+
+    json_report = report_export.build_json_report(result)
+    assert json_report["summary"] == overview
+    assert [p["winners_count"] for p in json_report["prize_statistics"]] == \
+        [s.winners_count for s in result.summary.prize_summary]
+
+    rows = dict(report_export.summary_rows(data))
+    assert rows["总玩家数"] == result.summary.total_players
+    assert [row[2] for row in report_export.prize_rows(data)] == \
+        [s.winners_count for s in result.summary.prize_summary]
+
+    context = report_render.build_report_context(result, max_points=100)
+    assert context["summary"]["total_winners"] == result.summary.total_winners
+    assert context["prizes"][1]["probability"] == \
+        result.summary.prize_summary[1].winners_count / result.summary.total_players
+
+    # 没有存储汇总时仍可从轮次结果得到全部统计
+    partial = result.model_copy(update={"summary": None, "status": "error"})
+    assert report_export.ReportData(partial).prizes() == data.prizes()
+
+
+if __name__ == "__main__":
+    test_reduce_rounds_matches_per_level_scans()
+    test_engine_summary_uses_shared_reducer()
+    test_accumulator_merge_is_associative()
+    test_report_formats_share_aggregate()
+    print("✅ 聚合测试通过")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+测试模拟检查点：中途保存、恢复后继续运行与不中断运行逐位一致
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.checkpoint import CheckpointStore
+from app.core.compiled_game import parse_game_config
+from app.core.simulation_engine import UniversalSimulationEngine
+
+
+CONFIG = {
+    "game_rules": {
+        "game_type": "lottery",
+        "name": "检查点测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {
+            "enabled": True,
+            "initial_amount": 300.0,
+            "contribution_rate": 0.2,
+            "post_return_contribution_rate": 0.4,
+            "return_rate": 0.3
+        }
+    },
+    "simulation_config": {
+        "rounds": 400,
+        "players_range": [1, 5],
+        "bets_range": [1, 2],
+        "seed": 7
+    }
+}
+
+
+def run_rounds(engine, until_round):
+    for round_num in range(len(engine.round_results) + 1, until_round + 1):
+        engine.current_round = round_num
+        engine.record_round(engine.simulate_round(round_num))
+
+
+def test_resume_is_bit_identical():
+    """多次检查点后恢复，继续运行的结果与不中断运行完全相同"""
+    reference = UniversalSimulationEngine(parse_game_config(CONFIG))
+    reference_result = asyncio.run(reference.run_simulation())
+    assert reference.jackpot_hits_count > 0
+
+    with tempfile.TemporaryDirectory() as root:
+        store = CheckpointStore(root)
+        engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+        engine.set_checkpoint_callback(store.save, interval_rounds=50)
+        run_rounds(engine, 270)
+        # 最后一次检查点之后的轮次丢失（模拟进程中途退出）
+        assert engine.checkpoint_rounds == 250
+
+        resumed = store.restore(engine.simulation_id)
+        assert len(resumed.round_results) == 250
+        resumed.set_checkpoint_callback(store.save, interval_rounds=50)
+        result = asyncio.run(resumed.run_simulation())
+
+        assert result.simulation_id == engine.simulation_id
+        assert result.round_results == reference_result.round_results
+        assert result.summary == reference_result.summary
+        assert result.analytics == reference_result.analytics
+        assert resumed.jackpot_pool == reference.jackpot_pool
+        assert resumed.funding_pool == reference.funding_pool
+        assert resumed.total_returned_amount == reference.total_returned_amount
+        assert resumed.rng.getstate() == reference.rng.getstate()
+
+        # 运行结束时保存最终检查点，恢复得到完整结果
+        final = store.restore(engine.simulation_id)
+        assert final.round_results == reference_result.round_results
+
+
+def test_partial_log_write_is_ignored():
+    """状态文件之后追加的残留轮次在读取和下次保存时被截掉"""
+    with tempfile.TemporaryDirectory() as root:
+        store = CheckpointStore(root)
+        engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+        run_rounds(engine, 20)
+        store.save(engine)
+
+        with open(os.path.join(root, engine.simulation_id, "rounds.log"), "ab") as f:
+            f.write(b"\x80partial")
+        state, encoded = store.load(engine.simulation_id)
+        assert len(encoded) == state["logged_rounds"] == 20
+
+        run_rounds(engine, 30)
+        store.save(engine)
+        assert len(store.load(engine.simulation_id)[1]) == 30
+
+        assert store.list() == [engine.simulation_id]
+        store.discard(engine.simulation_id)
+        assert store.list() == []
+
+
+if __name__ == "__main__":
+    test_resume_is_bit_identical()
+    test_partial_log_write_is_ignored()
+    print("✅ 检查点测试通过")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+测试命令行批量模拟（分片规划、单进程与多进程运行、列式输出）
+"""
+
+import sys
+import os
+import json
+import asyncio
+from datetime import datetime
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app import cli
+from app.cli import main
+from app.core.compiled_game import parse_game_config
+from app.core.sharding import plan_shards, derive_seed, run_shard, merge_shards
+from app.core.simulation_engine import UniversalSimulationEngine
+
+
+CONFIG = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "命令行测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 300.0}
+    },
+    "simulation_config": {
+        "rounds": 100,
+        "players_range": [1, 5],
+        "bets_range": [1, 2],
+        "seed": 5
+    }
+}
+
+
+def test_plan_shards():
+    """轮数平均拆分，单分片沿用基础种子"""
+    shards = plan_shards(10, 3, seed=42)
+    assert [s["rounds"] for s in shards] == [4, 3, 3]
+    assert [s["seed"] for s in shards] == [derive_seed(42, i) for i in range(3)]
+    assert len({s["seed"] for s in shards}) == 3
+    assert plan_shards(10, 1, seed=42) == [{"index": 0, "rounds": 10, "seed": 42}]
+    assert len(plan_shards(2, 8, seed=1)) == 2
+
+
+def test_simulate_single_worker_matches_engine(tmp_path, capsys):
+    """单进程结果与同一种子的引擎模拟一致，汇总输出到 stdout"""
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(CONFIG, ensure_ascii=False), encoding="utf-8")
+    out = tmp_path / "result.parquet"
+
+    assert main(["simulate", str(config_path), "--rounds", "60", "--out", str(out), "--quiet"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+
+    engine = UniversalSimulationEngine(parse_game_config({
+        "game_rules": CONFIG["game_config"],
+        "simulation_config": dict(CONFIG["simulation_config"], rounds=60)
+    }))
+    expected = asyncio.run(engine.run_simulation())
+    assert summary == expected.summary.model_dump(mode="json")
+
+    table = pq.read_table(out)
+    assert table.num_rows == 60
+    assert table.column("rtp").to_pylist() == [r.rtp for r in expected.round_results]
+
+
+def test_simulate_workers_are_reproducible(tmp_path, capsys):
+    """多进程分片：轮次连续编号，相同种子结果可重现"""
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(CONFIG, ensure_ascii=False), encoding="utf-8")
+
+    outputs = []
+    for name in ("a.csv", "b.csv"):
+        assert main(["simulate", str(config_path), "--workers", "2", "--out", str(tmp_path / name), "--quiet"]) == 0
+        outputs.append((json.loads(capsys.readouterr().out), (tmp_path / name).read_text(encoding="utf-8")))
+
+    (summary, csv_text), (summary_again, csv_again) = outputs
+    assert summary == summary_again and csv_text == csv_again
+    assert summary["total_rounds"] == 100
+    rows = csv_text.strip().splitlines()[1:]
+    assert [int(row.split(",")[0]) for row in rows] == list(range(1, 101))
+
+    assert main(["simulate", str(config_path), "--out", str(tmp_path / "x.xlsx"), "--quiet"]) == 1
+
+
+def test_shards_stream_rounds_without_keeping_them(tmp_path, capsys, monkeypatch):
+    """分片逐轮回调轮次结果，合并结果不含轮次结果；Arrow 输出按块写入且轮次连续"""
+    config = parse_game_config({
+        "game_rules": CONFIG["game_config"], "simulation_config": CONFIG["simulation_config"]
+    }).model_dump(mode="json")
+    streamed = []
+    shard = run_shard(config, 30, 7, on_round=streamed.append)
+    assert shard["rounds"] == 30 and shard["summary"].rounds == 30
+    assert [r.round_number for r in streamed] == list(range(1, 31))
+
+    merged = merge_shards(config, [shard, run_shard(config, 20, 8)], "merged", datetime.now())
+    assert merged.round_results == [] and merged.simulation_rounds == 50
+    assert merged.summary.total_rounds == 50
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(CONFIG, ensure_ascii=False), encoding="utf-8")
+    out = tmp_path / "result.arrow"
+    monkeypatch.setattr(cli, "SPOOL_CHUNK_ROWS", 7)  # 每个分片写出多块
+    assert main(["simulate", str(config_path), "--workers", "3", "--out", str(out), "--quiet"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+
+    table = pa.ipc.open_stream(out.read_bytes()).read_all()
+    assert table.column("round_number").to_pylist() == list(range(1, 101))
+    header = json.loads(table.schema.metadata[b"metadata"])
+    assert header["summary"] == summary and header["simulation_rounds"] == 100
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/core/test_cli.py")
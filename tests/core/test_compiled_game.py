@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+测试编译后的游戏配置
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.compiled_game import compile_game, parse_game_config
+from app.core.simulation_engine import UniversalSimulationEngine
+
+
+CONFIG = {
+    "game_rules": {
+        "game_type": "lottery",
+        "name": "编译测试彩票",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 50.0},
+            {"level": 3, "name": "重复二等奖", "match_condition": 2, "fixed_prize": 1.0}
+        ],
+        "jackpot": {
+            "enabled": True,
+            "initial_amount": 1000.0,
+            "contribution_rate": 0.15,
+            "post_return_contribution_rate": 0.35,
+            "return_rate": 0.7,
+            "jackpot_fixed_prize": 150.0
+        }
+    },
+    "simulation_config": {
+        "rounds": 5,
+        "players_range": [20, 40],
+        "bets_range": [1, 3],
+        "seed": 12345
+    }
+}
+
+
+def test_parse_and_compile_cached_by_content():
+    """相同内容只验证和编译一次"""
+    game_config = parse_game_config(CONFIG)
+    assert parse_game_config(dict(CONFIG)) is game_config
+
+    compiled = compile_game(game_config)
+    assert compile_game(parse_game_config(CONFIG)) is compiled
+    assert compiled.content_hash
+
+
+def test_compiled_prize_levels():
+    """奖级按匹配数索引，同一匹配数取第一个奖级"""
+    compiled = compile_game(parse_game_config(CONFIG))
+
+    assert compiled.number_pool == tuple(range(1, 11))
+    assert compiled.contribution_rate == 0.15
+    assert compiled.jackpot_fixed_prize == 150.0
+    assert compiled.prize_level_by_match[2].name == "二等奖"
+    assert compiled.prize_level_by_match[0] is None
+    assert [level.level if level else None for level in compiled.prize_level_by_match] == [None, None, 2, 1]
+    assert compiled.prize_level_by_match[3].prize_percentage == 1.0
+    assert compiled.prize_level_by_match[3].probability == 1.0 / 8
+
+
+def test_engine_uses_compiled_game():
+    """引擎的资金分配和奖金计算使用编译后的配置"""
+    engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+    assert engine.compiled is compile_game(engine.game_config)
+
+    info = engine.process_ticket_contribution(10.0)
+    assert info['jackpot_contribution'] == 10.0 * 0.15
+    assert info['seller_return'] == 10.0 * 0.7
+    assert info['return_phase_completed'] is False
+
+    assert engine.calculate_prize(2, {2: 3}) == 50.0
+    assert engine.calculate_prize(5, {5: 1}) == 0.0
+
+    result = engine.simulate_round(1)
+    assert [stat.name for stat in result.prize_stats] == ["一等奖", "二等奖", "重复二等奖"]
+    assert result.winners_count + result.non_winners_count == result.players_count
+
+
+if __name__ == "__main__":
+    test_parse_and_compile_cached_by_content()
+    test_compiled_prize_levels()
+    test_engine_uses_compiled_game()
+    print("✅ 编译配置测试通过")
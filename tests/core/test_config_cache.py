@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+测试配置缓存及失效逻辑
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.services.config_cache import ConfigCache
+from app.services.config_repository import FileConfigRepository
+from app.api import config as config_api
+from app.database import db_circuit
+
+
+TEST_CONFIG = {
+    "game_rules": {
+        "game_type": "lottery",
+        "name": "缓存测试彩票",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "fixed_prize": 100.0}
+        ]
+    },
+    "simulation_config": {
+        "rounds": 10,
+        "players_range": [10, 20],
+        "bets_range": [1, 2],
+        "seed": 1
+    },
+    "updated_at": "2025-01-01T00:00:00"
+}
+
+
+def test_cache_hit_and_updated_at_mismatch():
+    """按名称命中，updated_at 不一致时失效"""
+    cache = ConfigCache(max_entries=2, ttl_seconds=0)
+    entry = cache.put("demo", TEST_CONFIG)
+
+    assert cache.get("demo") is entry
+    assert cache.get("demo", "2025-01-01T00:00:00") is entry
+    assert cache.get("demo", "2025-02-02T00:00:00") is None
+    assert cache.get("demo") is None
+
+
+def test_game_config_validated_once():
+    """已验证的配置对象在多次启动间复用"""
+    cache = ConfigCache()
+    entry = cache.put("demo", TEST_CONFIG)
+
+    game_config = entry.game_config
+    assert game_config.id == "demo"
+    assert cache.get("demo").game_config is game_config
+
+
+def test_cache_evicts_least_recently_used():
+    """超过容量时淘汰最久未使用的条目"""
+    cache = ConfigCache(max_entries=2, ttl_seconds=0)
+    cache.put("a", TEST_CONFIG)
+    cache.put("b", TEST_CONFIG)
+    cache.get("a")
+    cache.put("c", TEST_CONFIG)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_resolve_config_uses_cache_until_invalidated(tmp_path, monkeypatch):
+    """resolve_config 只在缓存失效后重新读取文件"""
+    monkeypatch.setattr(config_api, "config_repository", FileConfigRepository(str(tmp_path)))
+    monkeypatch.setattr(config_api, "config_cache", ConfigCache())
+    # 熔断数据库，直接使用文件存储
+    for _ in range(db_circuit.failure_threshold):
+        db_circuit.record_failure("测试：数据库不可用")
+
+    try:
+        config_file = tmp_path / "demo.json"
+        config_file.write_text(json.dumps(TEST_CONFIG), encoding="utf-8")
+
+        first = config_api.resolve_config("demo", db=None)
+        config_file.unlink()
+        assert config_api.resolve_config("demo", db=None) is first
+
+        config_api.config_cache.invalidate("demo")
+        try:
+            config_api.resolve_config("demo", db=None)
+            assert False, "配置文件已删除，应返回404"
+        except config_api.HTTPException as e:
+            assert e.status_code == 404
+    finally:
+        db_circuit.reset()
+
+
+def test_save_invalidates_after_write(tmp_path, monkeypatch):
+    """保存过程中的并发读取不会把旧配置留在缓存中"""
+    repository = FileConfigRepository(str(tmp_path))
+    monkeypatch.setattr(config_api, "config_repository", repository)
+    monkeypatch.setattr(config_api, "config_cache", ConfigCache())
+    for _ in range(db_circuit.failure_threshold):
+        db_circuit.record_failure("测试：数据库不可用")
+
+    try:
+        repository.save("demo", TEST_CONFIG)
+        assert config_api.resolve_config("demo", db=None).config_data["game_rules"]["ticket_price"] == 10.0
+
+        updated = json.loads(json.dumps(TEST_CONFIG))
+        updated["game_rules"]["ticket_price"] = 20.0
+        save = repository.save
+
+        def save_with_concurrent_read(name, config_data):
+            # 写入前发生的并发读取会缓存旧配置
+            config_api.resolve_config(name, db=None)
+            save(name, config_data)
+
+        monkeypatch.setattr(repository, "save", save_with_concurrent_read)
+        asyncio.run(config_api.save_config(updated, "demo", db=None))
+
+        assert config_api.resolve_config("demo", db=None).config_data["game_rules"]["ticket_price"] == 20.0
+    finally:
+        db_circuit.reset()
+
+
+if __name__ == "__main__":
+    test_cache_hit_and_updated_at_mismatch()
+    test_game_config_validated_once()
+    test_cache_evicts_least_recently_used()
+    print("✅ 配置缓存测试通过")
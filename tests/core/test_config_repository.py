@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+测试带索引的文件配置仓库
+"""
+
+import sys
+import os
+import json
+import time
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.services.config_repository import FileConfigRepository
+
+# 文件系统时间戳精度（粗粒度时钟），外部修改需晚于索引写入才能被检测到
+FS_MTIME_GRANULARITY = 0.05
+
+
+def make_config(name, updated_at):
+    return {
+        "game_rules": {"game_type": "lottery", "name": name, "description": f"{name}描述"},
+        "simulation_config": {"rounds": 1},
+        "created_at": "2025-01-01T00:00:00",
+        "updated_at": updated_at
+    }
+
+
+def test_save_list_delete(tmp_path):
+    """保存/删除同步维护索引，列表按更新时间倒序"""
+    repo = FileConfigRepository(str(tmp_path))
+    repo.save("a", make_config("游戏A", "2025-01-01T00:00:00"))
+    repo.save("b", make_config("游戏B", "2025-01-02T00:00:00"))
+
+    configs = repo.list()
+    assert [c["name"] for c in configs] == ["b", "a"]
+    assert configs[0]["display_name"] == "游戏B"
+    assert configs[0]["game_type"] == "lottery"
+    assert "mtime_ns" not in configs[0]
+    assert repo.load("a")["game_rules"]["name"] == "游戏A"
+
+    assert repo.delete("a")
+    assert not repo.delete("a")
+    assert [c["name"] for c in repo.list()] == ["b"]
+    assert repo.load("a") is None
+
+
+def test_list_reads_index_without_parsing_configs(tmp_path, monkeypatch):
+    """索引新鲜时列出配置不解析配置文件"""
+    FileConfigRepository(str(tmp_path)).save("a", make_config("游戏A", "2025-01-01T00:00:00"))
+
+    # 新实例从磁盘索引冷启动
+    repo = FileConfigRepository(str(tmp_path))
+    monkeypatch.setattr(repo, "_rebuild", lambda: (_ for _ in ()).throw(AssertionError("不应重建索引")))
+    assert [c["name"] for c in repo.list()] == ["a"]
+
+
+def test_external_changes_trigger_incremental_rebuild(tmp_path):
+    """外部新增/删除/损坏文件时按mtime增量重建索引"""
+    repo = FileConfigRepository(str(tmp_path))
+    repo.save("a", make_config("游戏A", "2025-01-01T00:00:00"))
+    assert os.path.exists(tmp_path / FileConfigRepository.INDEX_FILENAME)
+    time.sleep(FS_MTIME_GRANULARITY)
+
+    (tmp_path / "external.json").write_text(
+        json.dumps(make_config("外部游戏", "2025-03-01T00:00:00")), encoding="utf-8"
+    )
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+
+    assert [c["name"] for c in repo.list()] == ["external", "a"]
+
+    time.sleep(FS_MTIME_GRANULARITY)
+    os.remove(tmp_path / "a.json")
+    assert [c["name"] for c in repo.list()] == ["external"]
+
+
+def test_in_place_edit_refreshes_entry(tmp_path):
+    """原地改写配置文件（目录mtime不变）后列表返回新的摘要"""
+    repo = FileConfigRepository(str(tmp_path))
+    repo.save("a", make_config("游戏A", "2025-01-01T00:00:00"))
+    repo.save("b", make_config("游戏B", "2025-01-02T00:00:00"))
+    assert [c["name"] for c in repo.list()] == ["b", "a"]
+    dir_mtime_ns = os.stat(tmp_path).st_mtime_ns
+    time.sleep(FS_MTIME_GRANULARITY)
+
+    with open(tmp_path / "a.json", "w", encoding="utf-8") as f:
+        json.dump(make_config("改名的游戏A", "2025-04-01T00:00:00"), f)
+    assert os.stat(tmp_path).st_mtime_ns == dir_mtime_ns
+
+    configs = repo.list()
+    assert [c["name"] for c in configs] == ["a", "b"]
+    assert configs[0]["display_name"] == "改名的游戏A"
+    assert configs[0]["updated_at"] == "2025-04-01T00:00:00"
+
+    # 从磁盘索引冷启动的新实例同样检测到改写
+    time.sleep(FS_MTIME_GRANULARITY)
+    with open(tmp_path / "b.json", "w", encoding="utf-8") as f:
+        json.dump(make_config("改名的游戏B", "2025-05-01T00:00:00"), f)
+    configs = FileConfigRepository(str(tmp_path)).list()
+    assert [c["display_name"] for c in configs] == ["改名的游戏B", "改名的游戏A"]
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        test_save_list_delete(__import__("pathlib").Path(d))
+    print("✅ 文件配置仓库测试通过")
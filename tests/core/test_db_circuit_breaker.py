@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试数据库熔断器
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_opens_after_threshold():
+    """连续失败达到阈值后熔断，冷却期内跳过访问"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown_seconds=30, clock=clock)
+
+    assert breaker.allow_request()
+    breaker.record_failure("timeout")
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure("timeout")
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    snapshot = breaker.snapshot()
+    assert snapshot["available"] is False
+    assert snapshot["last_error"] == "timeout"
+    assert snapshot["total_short_circuits"] == 1
+    assert snapshot["retry_in_seconds"] == 30
+
+
+def test_half_open_allows_single_trial():
+    """冷却期结束后只放行一次试探请求"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown_seconds=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10.0
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # 试探失败，重新熔断
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    # 再次冷却后试探成功，恢复
+    clock.now = 25.0
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_success_resets_failure_count():
+    """成功访问会清零连续失败次数"""
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown_seconds=10, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+
+if __name__ == "__main__":
+    test_circuit_opens_after_threshold()
+    test_half_open_allows_single_trial()
+    test_success_resets_failure_count()
+    print("✅ 熔断器测试通过")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+测试流式分布估计（直方图、P²分位数）
+"""
+
+import sys
+import os
+import random
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import numpy as np
+import pytest
+
+from app.core.estimators import DistributionEstimator, FixedHistogram, P2Quantile, quantile_label
+
+
+def test_p2_quantiles_track_exact_quantiles():
+    """P² 估计与精确分位数接近，少量样本时为精确值"""
+    rng = random.Random(7)
+    values = [rng.expovariate(1.0) for _ in range(20000)]
+    for p in (0.05, 0.5, 0.95, 0.99):
+        estimator = P2Quantile(p)
+        for value in values:
+            estimator.add(value)
+        exact = float(np.quantile(values, p))
+        assert estimator.value() == pytest.approx(exact, rel=0.03)
+
+    small = P2Quantile(0.5)
+    for value in (5.0, 1.0, 3.0):
+        small.add(value)
+    assert small.value() == 3.0
+    assert P2Quantile(0.5).value() is None
+    assert quantile_label(0.995) == "p99.5"
+
+
+def test_histograms_and_moments():
+    """线性/对数分箱、溢出计数与 Welford 均值方差"""
+    linear = FixedHistogram(0.0, 1.0, 4)
+    for value in (-0.1, 0.0, 0.3, 0.5, 0.99, 1.0):
+        linear.add(value)
+    assert linear.counts == [1, 1, 1, 1]
+    assert (linear.underflow, linear.overflow) == (1, 1)
+
+    log = FixedHistogram(1.0, 1000.0, 3, log=True)
+    for value in (0.0, 5.0, 50.0, 500.0):
+        log.add(value)
+    assert log.counts == [1, 1, 1]
+    assert log.underflow == 1
+    assert log.to_dict()["edges"] == pytest.approx([1.0, 10.0, 100.0, 1000.0])
+
+    merged = FixedHistogram(0.0, 1.0, 4)
+    merged.merge(linear)
+    assert merged.counts == linear.counts
+    with pytest.raises(ValueError):
+        merged.merge(log)
+
+    rng = random.Random(3)
+    values = [rng.gauss(1.0, 0.2) for _ in range(5000)]
+    estimator = DistributionEstimator(FixedHistogram(0.0, 5.0, 100))
+    for value in values:
+        estimator.add(value)
+    stats = estimator.to_dict()
+    assert stats["count"] == 5000
+    assert stats["mean"] == pytest.approx(np.mean(values))
+    assert stats["variance"] == pytest.approx(np.var(values))
+    assert (stats["min"], stats["max"]) == (min(values), max(values))
+    assert sum(stats["histogram"]["counts"]) + stats["histogram"]["underflow"] + stats["histogram"]["overflow"] == 5000
+    assert stats["quantiles"]["p50"] == pytest.approx(np.median(values), abs=0.01)
+
+
+if __name__ == "__main__":
+    test_p2_quantiles_track_exact_quantiles()
+    test_histograms_and_moments()
+    print("✅ 流式分布估计测试通过")
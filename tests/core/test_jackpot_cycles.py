@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+测试奖池周期追踪（开始轮次、中出轮次、返还完成轮次、奖池峰值）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.compiled_game import parse_game_config
+from app.core.jackpot_cycles import JackpotCycleTracker
+from app.core.simulation_engine import UniversalSimulationEngine
+
+
+CONFIG = {
+    "game_rules": {
+        "game_type": "lottery",
+        "name": "奖池周期测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {
+            "enabled": True,
+            "initial_amount": 300.0,
+            "contribution_rate": 0.2,
+            "post_return_contribution_rate": 0.4,
+            "return_rate": 0.3
+        }
+    },
+    "simulation_config": {
+        "rounds": 300,
+        "players_range": [1, 3],
+        "bets_range": [1, 1],
+        "seed": 99
+    }
+}
+
+
+def test_tracker_phases():
+    """手动驱动：阶段时长和未结束周期"""
+    tracker = JackpotCycleTracker(100.0)
+    tracker.observe_pool(150.0)
+    tracker.return_completed(3)
+    tracker.return_completed(4)  # 同一周期只记录第一次
+    tracker.hit(5, 220.0)
+    tracker.hit(7, 130.0)        # 返还未完成即中出
+
+    summary = tracker.summary(current_round=10)
+    assert summary["completed_cycles"] == 2
+    assert [c["length"] for c in summary["recent_cycles"]] == [5, 2]
+    assert summary["recent_cycles"][0]["return_completed_round"] == 3
+    assert summary["recent_cycles"][0]["peak_pool"] == 220.0
+    assert summary["recent_cycles"][1]["return_completed_round"] is None
+
+    phases = summary["time_in_phase"]
+    # 周期1：第一阶段3轮、第二阶段2轮；周期2：全部2轮在第一阶段；未结束周期 8~10 共3轮在第一阶段
+    assert (phases["return_phase_rounds"], phases["post_return_rounds"]) == (8, 2)
+    assert phases["cycles_without_return_completion"] == 1
+    assert summary["current_cycle"] == {"start_round": 8, "rounds": 3, "return_completed_round": None, "peak_pool": 100.0}
+    assert summary["cycle_length"]["histogram"]["counts"] == [0, 1, 0, 0, 1]
+
+    # 初始奖池为0时没有返还阶段
+    assert JackpotCycleTracker(0.0).summary(4)["time_in_phase"]["post_return_rounds"] == 4
+
+
+def test_engine_cycles_match_round_results():
+    """引擎记录的周期与轮次结果一致"""
+    engine = UniversalSimulationEngine(parse_game_config(CONFIG))
+    return_completed_rounds = []
+    for round_number in range(1, 301):
+        returned_before = engine.total_returned_amount
+        engine.record_round(engine.simulate_round(round_number))
+        if returned_before < engine.initial_jackpot_amount <= engine.total_returned_amount:
+            return_completed_rounds.append(round_number)
+
+    hit_rounds = [r.round_number for r in engine.round_results if r.prize_stats[0].winners_count > 0]
+    assert hit_rounds, "配置应产生头奖"
+
+    tracker = engine.jackpot_cycles
+    assert list(tracker.hits) == hit_rounds
+    assert list(tracker.starts) == [1] + [h + 1 for h in hit_rounds[:-1]]
+
+    summary = engine.build_analytics()["jackpot_cycles"]
+    phases = summary["time_in_phase"]
+    assert phases["return_phase_rounds"] + phases["post_return_rounds"] == 300
+
+    for start, hit, returned, peak in zip(tracker.starts, tracker.hits, tracker.return_rounds, tracker.peaks):
+        assert returned == -1 or start <= returned <= hit
+        # 周期内各轮结束时（中出轮重置前）的奖池不超过峰值
+        assert all(r.jackpot_amount <= peak for r in engine.round_results[start - 1:hit - 1])
+    # 未在中出轮完成的返还都被记录
+    recorded = {r for r in tracker.return_rounds if r >= 0}
+    if tracker.current_return_round >= 0:
+        recorded.add(tracker.current_return_round)
+    assert set(return_completed_rounds) <= recorded
+
+
+if __name__ == "__main__":
+    test_tracker_phases()
+    test_engine_cycles_match_round_results()
+    print("✅ 奖池周期测试通过")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+测试 Prometheus 指标的计数器、直方图和文本格式
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from app.core.metrics import Counter, Histogram, gauge_lines
+
+
+def test_histogram_buckets_are_cumulative():
+    """桶计数按上界累计（le 包含上界），最后一个桶为 +Inf"""
+    histogram = Histogram("test_latency_seconds", "测试", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+
+    lines = histogram.collect()
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{route="/a"} 4' in lines
+    assert 'test_latency_seconds_sum{route="/a"} 3.65' in lines
+    assert histogram.count("/a") == 4
+
+
+def test_counter_and_gauge_format():
+    """标签值转义，整数值不带小数点"""
+    counter = Counter("test_total", "测试", ("operation",))
+    counter.inc('say "hi"')
+    counter.inc('say "hi"', amount=2)
+    assert counter.collect()[1:] == ["# TYPE test_total counter", 'test_total{operation="say \\"hi\\""} 3']
+
+    lines = gauge_lines("test_gauge", "测试", [((), 1.5), ((("queue", "a"),), 0)])
+    assert lines[2:] == ["test_gauge 1.5", 'test_gauge{queue="a"} 0']
+
+
+if __name__ == "__main__":
+    test_histogram_buckets_are_cumulative()
+    test_counter_and_gauge_format()
+    print("✅ 指标格式测试通过")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+测试引擎各阶段耗时统计
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import tracemalloc
+
+import pytest
+
+from app.core.compiled_game import parse_game_config
+from app.core.phase_timings import PHASES, PhaseTimings
+from app.core.simulation_engine import UniversalSimulationEngine
+
+
+GAME_RULES = {
+    "game_type": "lottery",
+    "name": "阶段耗时测试",
+    "number_range": [1, 20],
+    "selection_count": 4,
+    "ticket_price": 2.0,
+    "prize_levels": [
+        {"level": 1, "name": "一等奖", "match_condition": 4, "prize_percentage": 0.8},
+        {"level": 2, "name": "二等奖", "match_condition": 3, "fixed_prize": 20.0},
+        {"level": 3, "name": "三等奖", "match_condition": 2, "fixed_prize": 2.0}
+    ],
+    "jackpot": {"enabled": True, "initial_amount": 1000.0, "contribution_rate": 0.2}
+}
+
+SIMULATION_CONFIG = {"rounds": 50, "players_range": [20, 60], "bets_range": [1, 4], "seed": 3}
+
+
+def make_engine(simulation_config, sample_interval):
+    engine = UniversalSimulationEngine(parse_game_config({
+        "game_rules": GAME_RULES,
+        "simulation_config": simulation_config
+    }))
+    engine.phase_timings = PhaseTimings(sample_interval)
+    return engine
+
+
+def test_engine_phase_timings(simulate_sync):
+    """每轮记录一次吞吐，按间隔采样各阶段耗时，各阶段占比之和为1"""
+    engine = simulate_sync(GAME_RULES, SIMULATION_CONFIG)
+    timings = engine.phase_timings.to_dict()
+
+    assert timings["rounds"] == SIMULATION_CONFIG["rounds"]
+    assert timings["tickets"] == sum(r.total_bets for r in engine.round_results)
+    # 第1、17、33、49轮采样
+    assert timings["sampled_rounds"] == 4
+    assert timings["sampled_tickets"] == sum(engine.round_results[i].total_bets for i in (0, 16, 32, 48))
+    assert set(timings["phases"]) == set(PHASES)
+    assert all(phase["seconds"] >= 0 for phase in timings["phases"].values())
+    assert sum(phase["share"] for phase in timings["phases"].values()) == pytest.approx(1.0)
+    assert timings["rng_share"] == timings["phases"]["ticket_generation"]["share"]
+    assert engine.build_progress()["phase_timings"]["rounds"] == SIMULATION_CONFIG["rounds"]
+
+
+def test_timed_rounds_match_untimed_rounds():
+    """逐注计时的采样轮次与普通轮次结果相同"""
+    timed = make_engine(SIMULATION_CONFIG, 1)
+    untimed = make_engine(SIMULATION_CONFIG, 10 ** 9)
+    for round_num in range(1, 21):
+        timed.record_round(timed.simulate_round(round_num))
+        untimed.record_round(untimed.simulate_round(round_num))
+
+    assert timed.round_results == untimed.round_results
+    assert timed.jackpot_pool == untimed.jackpot_pool
+    assert timed.phase_timings.sampled_rounds == 20
+    assert untimed.phase_timings.sampled_rounds == 1
+
+
+@pytest.mark.parametrize("sample_interval", [1, 10 ** 9])
+def test_round_does_not_keep_tickets(sample_interval):
+    """选号逐注生成后即丢弃，一轮的内存峰值与投注数无关"""
+    engine = make_engine(dict(SIMULATION_CONFIG, players_range=[2000, 2000], bets_range=[5, 5]), sample_interval)
+    engine.simulate_round(1)  # 预热（编译配置、奖级统计等一次性分配）
+
+    tracemalloc.start()
+    try:
+        engine.simulate_round(2)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # 保存10000注选号至少需要约1MB
+    assert peak < 200_000
+
+
+def test_phase_timings_in_status_and_progress(api_client):
+    """完成后的状态和进度响应包含各阶段耗时"""
+    response = api_client.post("/api/v1/simulation/start", json={
+        "game_config": GAME_RULES,
+        "simulation_config": SIMULATION_CONFIG
+    })
+    simulation_id = response.json()["simulation_id"]
+
+    status = api_client.get(f"/api/v1/simulation/status/{simulation_id}").json()
+    progress = api_client.get(f"/api/v1/simulation/progress/{simulation_id}").json()
+    assert status["phase_timings"]["rounds"] == SIMULATION_CONFIG["rounds"]
+    assert progress["phase_timings"] == status["phase_timings"]
+
+
+if __name__ == "__main__":
+    print("请使用 pytest 运行: python -m pytest tests/core/test_phase_timings.py")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+测试调用栈采样器（性能剖析）
+"""
+
+import sys
+import os
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import threading
+
+from app.core.profiling import StackSampler
+
+
+def busy_leaf(stop: threading.Event):
+    total = 0
+    while not stop.is_set():
+        total += sum(range(1000))
+    return total
+
+
+def busy_root(stop: threading.Event):
+    return busy_leaf(stop)
+
+
+def test_sampler_records_folded_stacks():
+    """采样结果为 folded 格式，根在前，计数之和等于采样次数"""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_root, args=(stop,))
+    worker.start()
+    try:
+        sampler = StackSampler(worker.ident, interval=0.001)
+        with sampler:
+            while sampler.samples < 20:
+                stop.wait(0.01)
+    finally:
+        stop.set()
+        worker.join()
+
+    lines = sampler.folded().splitlines()
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert sum(counts) == sampler.samples
+    assert counts == sorted(counts, reverse=True)
+    assert any(f"{__name__}:busy_root;{__name__}:busy_leaf" in line for line in lines)
+    assert sampler.duration > 0
+
+
+def test_sampler_ignores_finished_thread():
+    """目标线程不存在时不记录样本"""
+    worker = threading.Thread(target=lambda: None)
+    worker.start()
+    worker.join()
+
+    sampler = StackSampler(worker.ident)
+    sampler.sample()
+    assert sampler.samples == 0
+    assert sampler.folded() == ""
+
+
+if __name__ == "__main__":
+    test_sampler_records_folded_stacks()
+    test_sampler_ignores_finished_thread()
+    print("✅ 调用栈采样器测试通过")
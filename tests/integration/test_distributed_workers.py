@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+分布式模拟集成测试：本机启动协调者（uvicorn）和多个工作进程（python -m app.cli worker）
+"""
+
+import sys
+import os
+import socket
+import subprocess
+import time
+
+# 添加后端路径到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import httpx
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+REQUEST = {
+    "game_config": {
+        "game_type": "lottery",
+        "name": "分布式集成测试",
+        "number_range": [1, 10],
+        "selection_count": 3,
+        "ticket_price": 10.0,
+        "prize_levels": [
+            {"level": 1, "name": "一等奖", "match_condition": 3, "prize_percentage": 1.0},
+            {"level": 2, "name": "二等奖", "match_condition": 2, "fixed_prize": 5.0}
+        ],
+        "jackpot": {"enabled": True, "initial_amount": 300.0}
+    },
+    "simulation_config": {
+        "rounds": 4000,
+        "players_range": [1, 5],
+        "bets_range": [1, 2],
+        "seed": 8
+    }
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(condition, timeout: float, interval: float = 0.2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(interval)
+    return False
+
+
+def test_local_worker_processes():
+    """两个工作进程领取并完成4个分片，协调者合并结果"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    coordinator = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    workers = []
+    try:
+        assert wait_until(lambda: httpx.get(f"{base_url}/health").status_code == 200, timeout=60)
+
+        response = httpx.post(f"{base_url}/api/v1/cluster/jobs?shards=4", json=REQUEST)
+        simulation_id = response.json()["simulation_id"]
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, "-m", "app.cli", "worker", "--coordinator", base_url,
+                 "--worker-id", f"local-{i}", "--poll-interval", "0.2", "--max-idle", "3"],
+                cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            for i in range(2)
+        ]
+
+        job_url = f"{base_url}/api/v1/cluster/jobs/{simulation_id}"
+        assert wait_until(lambda: httpx.get(job_url).json()["status"] == "completed", timeout=120)
+
+        job = httpx.get(job_url).json()
+        assert job["completed_rounds"] == 4000
+        assert {shard["worker_id"] for shard in job["shards"]} <= {"local-0", "local-1"}
+
+        result = httpx.get(f"{base_url}/api/v1/simulation/result/{simulation_id}").json()
+        assert result["status"] == "completed"
+        assert result["summary"]["total_rounds"] == 4000
+
+        for worker in workers:
+            assert worker.wait(timeout=30) == 0
+    finally:
+        for process in workers + [coordinator]:
+            if process.poll() is None:
+                process.terminate()
+                process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    test_local_worker_processes()
+    print("✅ 分布式模拟集成测试通过")